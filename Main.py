@@ -1,19 +1,52 @@
 import streamlit as st
 
+import appends
+import filters
+import profiling
+import warmup
+from components import append_notice, append_watcher, filter_sidebar, profile_sidebar
+from figure_cache import figure_gauges
+from sleep_data import env_flag, ingest_mode, load_data
+
 st.set_page_config(
     page_title="Sleep Health and Life"
 )
 
+overview = st.Page('overview.py', title='Overview', icon=":material/dashboard:", default=True)
+
 objective1 = st.Page('objective1.py', title='Demographic', icon=":material/groups:")
 
 objective2 = st.Page('objective2.py', title='Comparison', icon=":material/balance:")
 
 objective3 = st.Page('objective3.py', title='Correlation', icon=":material/data_usage:")
 
+# Fill the data and aggregate caches in the background if serve.py has not already done so at boot (see warmup.py)
+warmup.start()
+
 pg = st.navigation(
     {
-        "Menu": [objective1, objective2, objective3]
+        "Menu": [overview, objective1, objective2, objective3]
     }
 )
 
+# Sidebar filters live in the entrypoint so the selection persists across pages;
+# every page reads it through filters.filtered_data. Streaming and DuckDB modes keep whole-file aggregates.
+if ingest_mode() == "memory":
+    data = load_data(columns=filters.INDEX_COLUMNS)
+    if not data.empty:
+        st.session_state[filters.SELECTION_KEY] = filter_sidebar(data)
+
+# Sessions poll for rows dropped into SLEEP_APPEND_DIR and rerun when the dataset grows
+if appends.append_dir():
+    append_notice()
+    append_watcher()
+
+# Section timings of this rerun (see profiling.py); /metrics is served when SLEEP_PROFILE_PORT is set
+profiling.start_exporter()
+profiling.begin_run()
 pg.run()
+spans = profiling.end_run(pg.title)
+
+# Per-section timings, live figure count and process memory, shown for load tests (SLEEP_DEBUG=1)
+if env_flag("SLEEP_DEBUG"):
+    profile_sidebar(spans, figure_gauges(), warmup.timings())
@@ -0,0 +1,153 @@
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import appends
+import sketches
+import sleep_data
+from binning import AGE_GROUPS, binned
+from correlation import CorrelationEngine
+
+
+# --- Age Groups used by the Comparison page (see binning.py) ---
+# '20-29' ... '50-59', plus '<20' and '60+' for ages outside AGE_BINS
+AGE_LABELS = AGE_GROUPS.labels()
+
+# (column, by) pairs whose counts the streaming and DuckDB summaries carry for the
+# chart pages' default views (see file_aggregates.py): Age per Gender, and Quality
+# of Sleep per Gender, Age and Occupation
+PAIR_COUNTS = [("Age", "Gender"), ("Gender", "Quality of Sleep"), ("Age", "Quality of Sleep"),
+               ("Occupation", "Quality of Sleep")]
+
+
+@dataclass(frozen=True)
+class DatasetSummary:
+    """Every metric and table the dashboard pages read, computed once per dataset version.
+
+    The instance is shared by all sessions, so pages must only read from it.
+    """
+    version: str
+    total_respondents: int
+    avg_age: float
+    gender_share: dict
+    most_common_occupation: str
+    unique_occupations: int
+    occupation_counts: pd.Series
+    describe: pd.DataFrame
+    column_info: pd.DataFrame
+    occupation_quality_mean: pd.DataFrame
+    quality_by_age: pd.DataFrame
+    quality_heart_rate_corr: pd.DataFrame
+    # {(value column, group column): {group: sketches.QuantileSketch}} for the violin and box plots
+    group_sketches: dict = field(default_factory=dict)
+    # Pearson/Spearman correlations of every numeric measurement (see correlation.py)
+    correlation: CorrelationEngine = None
+    # {(column, by): Series of row counts indexed by (column value, by value)} for PAIR_COUNTS;
+    # only the streaming and DuckDB summaries fill it, since in-memory pages read the rows
+    pair_counts: dict = field(default_factory=dict)
+
+
+def mode_label(counts):
+    """Returns the most frequent label, breaking ties like Series.mode() (smallest first)."""
+    if not len(counts):
+        return ""
+    return str(counts[counts == counts.max()].index.sort_values()[0])
+
+
+def build_summary(df, version=None):
+    """Computes all page aggregates from the full DataFrame in a single pass.
+
+    A column projection (see sleep_data.load_data) gets empty tables for the
+    aggregates whose columns it does not have.
+    """
+    def has(*columns):
+        return all(col in df for col in columns)
+
+    gender_share = df["Gender"].value_counts(normalize=True) if has("Gender") else pd.Series(dtype="float64")
+    occupation_counts = (df["Occupation"].value_counts() if has("Occupation")
+                         else pd.Series(dtype="int64", name="count"))
+
+    # Transposed describe() for all numerical columns (the "Summary Statistics" table). float32
+    # columns are described in float64, like the mergeable aggregates (see parallel.py) accumulate them;
+    # so are nullable integers, which would otherwise turn the transposed table into object columns
+    wide = {col: "float64" for col, dtype in df.dtypes.items()
+            if dtype == np.float32 or isinstance(dtype, pd.api.extensions.ExtensionDtype)
+            and pd.api.types.is_numeric_dtype(dtype)}
+    describe = df.astype(wide).describe(include=np.number).transpose()
+
+    column_info = pd.DataFrame({
+        'Column Name': df.columns,
+        'Data Type': [str(dtype) for dtype in df.dtypes],
+        'Non-Null Count': df.count().to_numpy(),
+    })
+
+    # Average Quality of Sleep for each Occupation, sorted by Occupation
+    if has('Occupation', 'Quality of Sleep'):
+        occupation_quality_mean = (
+            df.groupby('Occupation', observed=True)['Quality of Sleep']
+            .mean()
+            .reset_index()
+            .sort_values(by='Occupation')
+        )
+    else:
+        occupation_quality_mean = pd.DataFrame(columns=['Occupation', 'Quality of Sleep'])
+
+    if has('Age', 'Quality of Sleep'):
+        age_group = binned(df['Age'], AGE_GROUPS)
+        quality_by_age = pd.crosstab(age_group, df['Quality of Sleep'])
+    else:
+        quality_by_age = pd.DataFrame()
+
+    if has('Quality of Sleep', 'Heart Rate'):
+        quality_heart_rate_corr = df[['Quality of Sleep', 'Heart Rate']].corr()
+    else:
+        quality_heart_rate_corr = pd.DataFrame()
+
+    return DatasetSummary(
+        version=version or df.attrs.get("version", ""),
+        total_respondents=len(df),
+        avg_age=float(df["Age"].mean()) if has("Age") else float("nan"),
+        gender_share=gender_share.to_dict(),
+        most_common_occupation=mode_label(occupation_counts),
+        unique_occupations=int((occupation_counts > 0).sum()),
+        occupation_counts=occupation_counts,
+        describe=describe,
+        column_info=column_info,
+        occupation_quality_mean=occupation_quality_mean,
+        quality_by_age=quality_by_age,
+        quality_heart_rate_corr=quality_heart_rate_corr,
+        group_sketches=sketches.sketch_groups(df),
+        correlation=CorrelationEngine.from_frame(df),
+    )
+
+
+# Keyed on the dataset version and column projection; the DataFrame itself is not hashed
+# Large frames are aggregated over row partitions in a process pool (see parallel.py)
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_summary(_df, version, columns=None):
+    import parallel  # imported lazily: parallel -> streaming -> aggregates
+
+    # Appended versions were summarized incrementally when their rows arrived
+    summary = appends.incremental_summary(version)
+    if summary is not None:
+        return summary
+
+    # In DuckDB mode the loaded file itself is summarized with SQL (filtered subsets are not)
+    source = _df.attrs.get("source", "")
+    if sleep_data.ingest_mode() == "duckdb" and os.path.exists(source) and version == sleep_data.data_version(source):
+        import sql_backend  # imported lazily: sql_backend -> aggregates
+
+        return sql_backend.sql_summary(source)
+
+    # The partition aggregates need every column, so projections are summarized in-process
+    if columns is None and len(_df) >= parallel.MIN_PARALLEL_ROWS and parallel.worker_count() > 1:
+        return parallel.summarize_frame(_df, version)
+    return build_summary(_df, version)
+
+
+def get_summary(df):
+    """Returns the shared DatasetSummary for a DataFrame loaded by sleep_data.load_data."""
+    return _cached_summary(df, df.attrs.get("version", ""), df.attrs.get("columns"))
@@ -0,0 +1,305 @@
+import copy
+import io
+import logging
+import os
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import schema
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Incremental Appends ---
+# With SLEEP_APPEND_DIR set, CSV files dropped into that directory (same columns
+# as the dataset export) are added to the loaded dataset without re-reading it.
+# Each new file, or the lines added to a file that grew (see read_batch), is
+# parsed on its own, validated against the loaded dtypes, and only rows whose
+# Person ID is not in the dataset yet are kept.
+# Those rows update mergeable StreamingAggregates, so the DatasetSummary of the
+# new version costs O(new rows); the loaded rows are aggregated once, on the
+# first append. The store keeps each batch as a chunk and publishes the chunks
+# so far as the shared DataFrame of a new dataset version, which every cached
+# chart engine keys on. Engines whose state grows with the rows (the filter
+# index, value tables, segment and bin codes, comparison cells) extend the
+# state of the previous version with the new chunks through extended(), so a
+# refresh costs O(new rows) there as well. Sessions poll for new versions every
+# SLEEP_APPEND_POLL seconds and rerun (see components.py). append_rows() is the
+# in-process API for the same path.
+ID_COLUMN = "Person ID"
+DEFAULT_POLL_SECONDS = 10
+# Derived states kept per store for extended(); the oldest is dropped past this
+MAX_DERIVED_STATES = 64
+
+# {dataset version: DatasetSummary} of each store's latest appended version, read by aggregates.get_summary
+_summaries = {}
+_summaries_lock = threading.Lock()
+# {dataset version: AppendStore} of the loaded and appended versions of every live store
+_stores = weakref.WeakValueDictionary()
+
+
+def append_dir():
+    """Returns the watched directory for new survey rows, or None when appends are off."""
+    return os.environ.get("SLEEP_APPEND_DIR") or None
+
+
+def poll_seconds():
+    """Returns how often sessions check for appended rows (SLEEP_APPEND_POLL)."""
+    return max(1.0, float(os.environ.get("SLEEP_APPEND_POLL", DEFAULT_POLL_SECONDS)))
+
+
+def read_batch(path, start=0):
+    """Reads an appended CSV file from byte start on, without applying the schema.
+
+    Returns (raw rows, end offset). Only complete lines are read, so a row the
+    writer has not finished yet is read on the next change; start is the end
+    offset of the previous read, or 0 for the whole file.
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(max(start, len(header)))
+        data = f.read()
+    data = data[:data.rfind(b"\n") + 1]
+    rows = pd.read_csv(io.BytesIO(header + data), dtype=schema.CSV_DTYPES)
+    return schema.drop_unnamed(rows), max(start, len(header)) + len(data)
+
+
+def validate(raw, base):
+    """Returns (rows typed like base, number of rejected rows) for a raw batch.
+
+    A row is rejected when a numeric value does not parse or does not fit the
+    loaded column (missing in a column without missing values, out of range,
+    or fractional in an integer column), or when it has no Person ID. Columns
+    the dataset does not have are dropped; a missing column rejects the batch.
+    """
+    numeric = [col for col in raw if col in schema.INTEGER_COLUMNS or col in schema.FLOAT_COLUMNS]
+    coerced = raw.assign(**{col: pd.to_numeric(raw[col], errors="coerce") for col in numeric})
+    keep = ~(coerced[numeric].isna() & raw[numeric].notna()).any(axis=1).to_numpy()
+    typed = schema.apply_schema(coerced)
+
+    missing = [col for col in base.columns if col not in typed]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    typed = typed[list(base.columns)]
+    if ID_COLUMN in typed:
+        keep &= typed[ID_COLUMN].notna().to_numpy()
+
+    for col in base.columns:
+        dtype = base[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            continue
+        values = typed[col].astype("float64")
+        if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+            info = np.iinfo(dtype)
+            keep &= (values.notna() & values.between(info.min, info.max) & (values % 1 == 0)).to_numpy()
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in "iu":
+            info = np.iinfo(dtype.numpy_dtype)
+            keep &= (values.isna() | (values.between(info.min, info.max) & (values % 1 == 0))).to_numpy()
+
+    rows = typed[keep]
+    rows = rows.astype({col: base[col].dtype for col in base.columns
+                        if not isinstance(base[col].dtype, pd.CategoricalDtype)})
+    return rows, int((~keep).sum())
+
+
+class AppendStore:
+    """The loaded dataset plus every appended batch, with incrementally updated aggregates."""
+
+    def __init__(self, base):
+        self.base = base
+        self.frame = base
+        self.aggregates = None
+        self.generation = 0
+        self.rejected = 0
+        self.files = {}
+        self.lock = threading.Lock()
+        ids = base[ID_COLUMN].to_numpy(dtype="int64", na_value=-1) if ID_COLUMN in base else np.empty(0)
+        self.base_ids = np.unique(ids)
+        self.appended_ids = np.empty(0, dtype="int64")
+        # chunks[g] holds the rows generation g added (the loaded rows at 0); versions[g] names generation g
+        self.chunks = [base]
+        self.versions = [self.version]
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+        self._batch = (None, None, None)
+        _stores[self.version] = self
+
+    @property
+    def version(self):
+        return self.frame.attrs.get("version", "")
+
+    def derived(self, df, key, build, extend):
+        """Returns the state key of a version of this store (see extended)."""
+        generation = self.versions.index(df.attrs.get("version", ""))
+        with self._derived_lock:
+            known, state = self._derived.get(key, (None, None))
+        if known == generation:
+            return state
+        value = None
+        if known is not None and known < generation:
+            value = extend(state, self._rows(known + 1, generation + 1, df))
+        if value is None:
+            value = build(df)
+        with self._derived_lock:
+            if self._derived.get(key, (-1,))[0] < generation:
+                self._derived.pop(key, None)
+                self._derived[key] = (generation, value)
+                while len(self._derived) > MAX_DERIVED_STATES:
+                    self._derived.pop(next(iter(self._derived)))
+        return value
+
+    def _rows(self, start, stop, df):
+        # The rows of generations [start, stop), with the categories of df (later batches may add labels);
+        # the latest ones are kept, since every derived state of a new version asks for the same rows
+        cached = self._batch
+        if cached[:2] == (start, stop):
+            return cached[2]
+        rows = self.chunks[start] if stop - start == 1 else pd.concat(self.chunks[start:stop], ignore_index=True)
+        rows = rows.astype({col: df[col].dtype for col in rows.columns
+                            if isinstance(df[col].dtype, pd.CategoricalDtype) and rows[col].dtype != df[col].dtype})
+        self._batch = (start, stop, rows)
+        return rows
+
+    def _known(self, ids):
+        # Both id sets are sorted, so membership is a binary search instead of a pass over all rows
+        known = np.zeros(len(ids), dtype=bool)
+        for sorted_ids in (self.base_ids, self.appended_ids):
+            if len(sorted_ids):
+                position = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+                known |= sorted_ids[position] == ids
+        return known
+
+    def append(self, raw, source="api"):
+        """Validates raw rows and adds those with new Person IDs; returns how many were added."""
+        with self.lock:
+            rows, rejected = validate(raw, self.base)
+            if ID_COLUMN in rows:
+                ids = rows[ID_COLUMN].to_numpy(dtype="int64")
+                new = ~pd.Index(ids).duplicated() & ~self._known(ids)
+                rows, ids = rows[new], ids[new]
+                self.appended_ids = np.union1d(self.appended_ids, ids)
+            self.rejected += rejected
+            if rejected:
+                logger.warning("Rejected %d invalid rows from %s", rejected, source)
+            if rows.empty:
+                return 0
+
+            import parallel  # imported lazily: parallel -> streaming -> binning -> appends
+
+            rows = self._extend_categories(rows)
+            if self.aggregates is None:
+                self.aggregates = parallel.aggregate_frame(self.base)
+            # Summaries already handed out keep their own copy of the mergeable state
+            self.aggregates = copy.deepcopy(self.aggregates).update(rows)
+
+            self.generation += 1
+            frame = pd.concat([self.frame, rows], ignore_index=True)
+            version = f"{self.base.attrs.get('version', '')}-append{self.generation}"
+            frame.attrs = {**self.base.attrs, "version": version, "appended_rows": len(frame) - len(self.base)}
+            # Quartiles past the exact counts' limit are read from the frame, as for the loaded dataset
+            summary = parallel.fill_quartiles(self.aggregates.to_summary(frame.attrs["version"]), frame)
+            with _summaries_lock:
+                _summaries.pop(self.version, None)
+                _summaries[summary.version] = summary
+            self.frame = frame
+            self.chunks.append(rows.reset_index(drop=True))
+            self.versions.append(version)
+            _stores[version] = self
+            logger.info("Appended %d rows from %s", len(rows), source)
+            return len(rows)
+
+    def _extend_categories(self, rows):
+        # New labels (e.g. an occupation not seen before) are added to the shared categories
+        # on both sides, so the concatenated columns stay categorical. Categories read from
+        # the CSV are sorted and stay sorted, so tables and summaries list labels in the same
+        # order as after a reload; the loaded rows are then recoded once per new label.
+        extended = {}
+        for col in self.frame.columns:
+            dtype = self.frame[col].dtype
+            if not isinstance(dtype, pd.CategoricalDtype):
+                continue
+            extra = pd.Index(rows[col].dropna().unique()).astype(dtype.categories.dtype).difference(dtype.categories)
+            if len(extra):
+                categories = dtype.categories.append(extra.sort_values())
+                if dtype.categories.is_monotonic_increasing:
+                    categories = categories.sort_values()
+                extended[col] = self.frame[col].cat.set_categories(categories)
+            categories = extended[col].cat.categories if col in extended else dtype.categories
+            rows[col] = pd.Categorical(rows[col], categories=categories)
+        if extended:
+            self.frame = self.frame.assign(**extended)
+        return rows
+
+    def refresh(self, directory=None):
+        """Appends every new or changed CSV file in the watched directory; returns the current frame."""
+        directory = directory or append_dir()
+        if not directory or not os.path.isdir(directory):
+            return self.frame
+        entries = sorted((entry for entry in os.scandir(directory)
+                          if entry.is_file() and entry.name.endswith(".csv")),
+                         key=lambda entry: (entry.stat().st_mtime_ns, entry.name))
+        for entry in entries:
+            stat = entry.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            # Checked and claimed under the lock, so concurrent sessions read each file version once
+            with self.lock:
+                previous, offset = self.files.get(entry.path, (None, 0))
+                if previous == signature:
+                    continue
+                # A file that grew is read from where the last read stopped, so its earlier rows are
+                # not validated (and their rejects counted) again; a file that shrank was replaced
+                if stat.st_size < offset:
+                    offset = 0
+                self.files[entry.path] = (signature, offset)
+            if stat.st_size == offset:
+                continue
+            try:
+                raw, end = read_batch(entry.path, offset)
+                with self.lock:
+                    self.files[entry.path] = (signature, end)
+                self.append(raw, source=entry.path)
+            except (OSError, ValueError, pd.errors.ParserError) as exc:
+                logger.warning("Skipping appended file %s: %s", entry.path, exc)
+        return self.frame
+
+
+# One store per loaded dataset version, shared by every session
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_store(_base, version):
+    return AppendStore(_base)
+
+
+def get_store(base):
+    """Returns the AppendStore for a DataFrame read by sleep_data."""
+    return _cached_store(base, base.attrs.get("version", ""))
+
+
+def append_rows(base, rows):
+    """Appends a DataFrame of raw survey rows to the dataset loaded as base; returns how many were added."""
+    return get_store(base).append(rows)
+
+
+def extended(df, key, build, extend):
+    """Returns the derived state key of a DataFrame: build(df), or extended from an earlier version.
+
+    For an appended version of a store (see AppendStore), the latest state kept
+    for key is passed to extend(state, rows) with the rows appended since, and
+    extend returns the state of df, or None when it has to be built again. Any
+    other DataFrame is passed to build. States are shared, so extend must not
+    modify the state it is given.
+    """
+    store = _stores.get(df.attrs.get("version", ""))
+    if store is None:
+        return build(df)
+    return store.derived(df, key, build, extend)
+
+
+def incremental_summary(version):
+    """Returns the incrementally built DatasetSummary of the latest appended dataset version, if any."""
+    with _summaries_lock:
+        return _summaries.get(version)
@@ -0,0 +1,314 @@
+"""Benchmark the dashboard pages at scaled data sizes.
+
+Generates synthetic datasets with the cleaned_sleep_health_data.csv schema,
+runs every page headlessly through Streamlit's AppTest and records, per page,
+cold and warm wall time, peak resident memory and serialized payload size,
+and per logical section (data load, summary, dataset table, Figures 1-3, ...)
+the timings and allocation peaks of the page's own profiling spans (see
+profiling.py).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pages --sizes 1k,100k --save benchmarks/baseline.json
+    python -m benchmarks.bench_pages --sizes 1k,100k --compare benchmarks/baseline.json
+    python -m benchmarks.bench_pages --sizes 1k,100k --backend vega
+
+Every timing is the median of --repeats runs. --compare exits with status 1
+when a median is slower than the baseline by more than --tolerance (default
+25%) and by more than --min-delta seconds (default 5 ms), so sections that
+take a few milliseconds do not flag noise. --backend picks the chart backend
+(matplotlib PNGs or browser-drawn Vega-Lite specs) so the CPU cost and payload
+of the two can be compared.
+
+peak_rss_bytes is the process's resident set high-water mark while a page
+ran (getrusage); on Linux it is reset before every page, elsewhere it covers
+the whole benchmark so far (peak_rss_scope says which). Section
+peak_alloc_bytes come from an extra tracemalloc run, skipped by --no-memory.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import streamlit as st
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.testing.v1 import AppTest
+
+import binary_cache
+import profiling
+import schema
+from benchmarks.synthetic import dataset_path, parse_size
+from figure_cache import CHART_BACKENDS, chart_backend
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak_rss_bytes is recorded as None
+    resource = None
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = "1k,100k,1m,10m"
+DEFAULT_DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+PAGES = ["overview.py", "objective1.py", "objective2.py", "objective3.py"]
+PAGE_TIMEOUT = 3600
+
+
+def measure(fn, trace_memory=True, repeats=1):
+    """Runs fn repeats times; returns (last result, {"wall_s", "cpu_s", "min_wall_s", "peak_alloc_bytes"}).
+
+    Wall and CPU time are medians over the repeats, which run without tracemalloc;
+    with trace_memory one more run measures the allocation peak.
+    """
+    walls, cpus = [], []
+    for _ in range(repeats):
+        gc.collect()
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = fn()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    peak = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = fn()
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return result, {"wall_s": statistics.median(walls), "cpu_s": statistics.median(cpus),
+                    "min_wall_s": min(walls), "peak_alloc_bytes": peak}
+
+
+def span_stats(runs, alloc=None):
+    """Returns {section: stats} with the median wall and CPU time of each span over runs of a page.
+
+    runs holds the span records of each run (profiling.collect()); a span seen
+    several times in one run counts with its total. alloc maps spans to the
+    allocation peaks of a run with SLEEP_PROFILE_MEMORY=1.
+    """
+    totals = []
+    for records in runs:
+        run = {}
+        for record in records:
+            wall, cpu = run.get(record["name"], (0.0, 0.0))
+            run[record["name"]] = (wall + record["wall_s"], cpu + record["cpu_s"])
+        totals.append(run)
+    stats = {}
+    for name in sorted(set().union(*totals)):
+        # A span missing from a run (e.g. a cache hit skipped it) took no time in that run
+        walls = [run.get(name, (0.0, 0.0))[0] for run in totals]
+        cpus = [run.get(name, (0.0, 0.0))[1] for run in totals]
+        stats[name] = {"wall_s": statistics.median(walls), "cpu_s": statistics.median(cpus),
+                       "min_wall_s": min(walls), "peak_alloc_bytes": (alloc or {}).get(name)}
+    return stats
+
+
+def _iter_nodes(node):
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        for child in children.values():
+            yield from _iter_nodes(child)
+    else:
+        yield node
+
+
+class _MediaRecorder:
+    """Records the size of every media file (chart images) added during a run."""
+
+    def __init__(self):
+        self.bytes = 0
+        self._original = MediaFileManager.add
+
+    def __enter__(self):
+        recorder = self
+
+        def add(manager, path_or_data, *args, **kwargs):
+            if isinstance(path_or_data, (bytes, bytearray)):
+                recorder.bytes += len(path_or_data)
+            return recorder._original(manager, path_or_data, *args, **kwargs)
+
+        MediaFileManager.add = add
+        return self
+
+    def __exit__(self, *exc):
+        MediaFileManager.add = self._original
+
+
+def proto_bytes(app):
+    """Returns the serialized size of every element proto of a finished AppTest run."""
+    total = 0
+    for node in _iter_nodes(app._tree):
+        proto = getattr(node, "proto", None)
+        if proto is not None:
+            total += proto.ByteSize()
+    return total
+
+
+def reset_peak_rss():
+    """Resets the process's peak RSS so the next peak_rss_bytes() starts from now; False if unsupported."""
+    try:
+        # Writing 5 to clear_refs resets the high-water mark (Linux 4.0+)
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes():
+    """Returns the peak resident set size of this process (ru_maxrss) in bytes, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kibibytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def _run_cold(page):
+    # Empty caches, so every section of the page does its work
+    clear_caches()
+    app = AppTest.from_file(os.path.join(ROOT, page), default_timeout=PAGE_TIMEOUT)
+    with profiling.collect() as records:
+        _, cold = measure(app.run, trace_memory=False)
+    return app, cold["wall_s"], records
+
+
+def run_page(page, repeats=1, trace_memory=True):
+    """Runs a page cold (empty caches) then warm, repeats times.
+
+    Returns the median timings, the warm run's payload size and the page's
+    section timings, taken from the spans of its cold runs.
+    """
+    colds, warms, runs = [], [], []
+    per_page = reset_peak_rss()
+    for _ in range(repeats):
+        app, cold, records = _run_cold(page)
+        with _MediaRecorder() as media:
+            _, warm = measure(app.run, trace_memory=False)
+        colds.append(cold)
+        warms.append(warm["wall_s"])
+        runs.append(records)
+    errors = [str(e.value) for e in app.exception]
+    result = {
+        "cold_s": statistics.median(colds),
+        "warm_s": statistics.median(warms),
+        "payload_bytes": proto_bytes(app) + media.bytes,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "peak_rss_scope": "page" if per_page else "process",
+        "errors": errors,
+    }
+
+    alloc = None
+    if trace_memory:
+        os.environ["SLEEP_PROFILE_MEMORY"] = "1"
+        try:
+            _, _, records = _run_cold(page)
+        finally:
+            del os.environ["SLEEP_PROFILE_MEMORY"]
+        alloc = {}
+        for record in records:
+            alloc[record["name"]] = max(alloc.get(record["name"], 0), record["alloc_bytes"] or 0)
+    return result, span_stats(runs, alloc)
+
+
+def bench_size(rows, data_dir, trace_memory=True, repeats=1):
+    """Benchmarks every page and its sections for one synthetic dataset size."""
+    path = dataset_path(rows, data_dir)
+    os.environ["SLEEP_DATA_PATH"] = path
+    result = {"rows": rows, "csv_bytes": os.path.getsize(path), "sections": {}, "pages": {}}
+
+    _, result["sections"]["load.csv_parse"] = measure(lambda: schema.read_csv(path), trace_memory, repeats)
+    binary_cache.load_csv(path)  # make sure the Feather cache exists
+    _, result["sections"]["load.binary_cache"] = measure(lambda: binary_cache.load_csv(path), trace_memory, repeats)
+
+    for page in PAGES:
+        result["pages"][page], sections = run_page(page, repeats, trace_memory)
+        result["sections"].update(sections)
+        for name, stats in sections.items():
+            print(f"  {rows:>10,} {name} {stats['wall_s']:.3f}s", file=sys.stderr)
+        print(f"  {rows:>10,} {page} cold {result['pages'][page]['cold_s']:.3f}s "
+              f"warm {result['pages'][page]['warm_s']:.3f}s", file=sys.stderr)
+    return result
+
+
+def compare(current, baseline, tolerance, min_delta=0.005):
+    """Returns a list of regression messages for timings slower than baseline by more than tolerance.
+
+    A timing also has to be slower by more than min_delta seconds, since a few
+    milliseconds of noise on a short section is a large relative change.
+    """
+    regressions = []
+    for size, result in current["results"].items():
+        previous = baseline.get("results", {}).get(size)
+        if previous is None:
+            continue
+        pairs = [(f"{name}.wall_s", stats["wall_s"], previous["sections"].get(name, {}).get("wall_s"))
+                 for name, stats in result["sections"].items()]
+        for page, stats in result["pages"].items():
+            for key in ("cold_s", "warm_s"):
+                pairs.append((f"{page}.{key}", stats[key], previous["pages"].get(page, {}).get(key)))
+        for name, now, before in pairs:
+            if before and now > before * (1 + tolerance) and now - before > min_delta:
+                regressions.append(f"{size} {name}: {before:.3f}s -> {now:.3f}s (+{now / before - 1:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated row counts, e.g. 1k,100k,1m,10m")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="where synthetic CSVs are generated and reused")
+    parser.add_argument("--save", help="write the results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="compare against a previously saved JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging a regression")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="smallest slowdown in seconds flagged as a regression")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per timing; the median is reported")
+    parser.add_argument("--backend", choices=CHART_BACKENDS, help="chart backend to benchmark (SLEEP_CHART_BACKEND)")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster, no section peak_alloc_bytes)")
+    args = parser.parse_args(argv)
+    if args.backend:
+        os.environ["SLEEP_CHART_BACKEND"] = args.backend
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "chart_backend": chart_backend(),
+        "repeats": args.repeats,
+        "results": {},
+    }
+    for size in args.sizes.split(","):
+        rows = parse_size(size)
+        report["results"][size.strip()] = bench_size(rows, args.data_dir, trace_memory=not args.no_memory,
+                                                   repeats=args.repeats)
+
+    output = json.dumps(report, indent=2)
+    if args.save:
+        with open(args.save, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_delta)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
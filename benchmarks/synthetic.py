@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from sleep_data import DATA_FILE
+
+
+# --- Synthetic Dataset Generator ---
+# Rows are resampled (with replacement) from the bundled dataset, so the joint
+# distribution of Gender, Occupation, scores and measurements stays realistic
+# at any size. Person ID is renumbered and Age is jittered by up to +/-2 years
+# within the original range so histograms and age groups are not just copies.
+WRITE_CHUNK_ROWS = 1_000_000
+
+
+def parse_size(text):
+    """Parses sizes such as "1k", "100k", "1m" or "10m" into a row count."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def generate(rows, path, seed=0, source=DATA_FILE):
+    """Writes a CSV of rows synthetic records with the cleaned dataset's schema."""
+    base = pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    age_min, age_max = base["Age"].min(), base["Age"].max()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="") as f:
+        for start in range(0, rows, WRITE_CHUNK_ROWS):
+            n = min(WRITE_CHUNK_ROWS, rows - start)
+            chunk = base.iloc[rng.integers(0, len(base), size=n)].reset_index(drop=True)
+            chunk["Person ID"] = np.arange(start + 1, start + n + 1)
+            chunk["Age"] = np.clip(chunk["Age"] + rng.integers(-2, 3, size=n), age_min, age_max)
+            chunk.to_csv(f, index=False, header=start == 0)
+    os.replace(tmp_path, path)
+    return path
+
+
+def dataset_path(rows, data_dir, seed=0):
+    """Returns the synthetic CSV for rows records, generating it on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"synthetic_{rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        generate(rows, path, seed=seed)
+    return path
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+
+import schema
+
+
+logger = logging.getLogger(__name__)
+
+# --- Binary Columnar Cache ---
+# A CSV export is parsed once and written next to it as a typed Arrow file.
+# Later loads memory-map that file instead of re-parsing text. The source CSV's
+# size, mtime and SHA-256 are stored in the file's schema metadata with the
+# schema.schema_hash() of the dtypes it was typed with; the cache is rebuilt when
+# the size, content or schema changes (a bare mtime change is checked by hash).
+FORMATS = {"feather": ".feather", "parquet": ".parquet"}
+METADATA_KEY = b"sleep_health_source"
+
+
+def cache_path(csv_path, fmt="feather"):
+    """Returns the binary cache path stored next to the CSV file."""
+    return os.path.splitext(csv_path)[0] + FORMATS[fmt]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint(csv_path, with_hash=True):
+    stat = os.stat(csv_path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "schema": schema.schema_hash()}
+    if with_hash:
+        fingerprint["sha256"] = file_hash(csv_path)
+    return fingerprint
+
+
+def _read_table(path, fmt, columns=None):
+    if fmt == "feather":
+        from pyarrow import feather
+        return feather.read_table(path, columns=columns, memory_map=True)
+    from pyarrow import parquet
+    return parquet.read_table(path, columns=columns, memory_map=True)
+
+
+def _is_fresh(table_schema, csv_path):
+    """Checks a cached table's stored fingerprint against the current CSV."""
+    raw = (table_schema.metadata or {}).get(METADATA_KEY)
+    if raw is None:
+        return False
+    stored = json.loads(raw)
+    current = _fingerprint(csv_path, with_hash=False)
+    if stored.get("schema") != current["schema"] or stored.get("size") != current["size"]:
+        return False
+    if stored.get("mtime_ns") == current["mtime_ns"]:
+        return True
+    return stored.get("sha256") == file_hash(csv_path)
+
+
+def write_cache(data, csv_path, fmt="feather", fingerprint=None):
+    """Writes a typed DataFrame as the binary cache for csv_path and returns its path."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps(fingerprint or _fingerprint(csv_path)).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    path = cache_path(csv_path, fmt)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if fmt == "feather":
+        from pyarrow import feather
+        # Uncompressed so later reads can memory-map the column buffers directly
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+    else:
+        from pyarrow import parquet
+        parquet.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_cached(csv_path, fmt="feather", columns=None):
+    """Returns the cached DataFrame for csv_path, or None when missing or stale."""
+    path = cache_path(csv_path, fmt)
+    if not os.path.exists(path):
+        return None
+    try:
+        table = _read_table(path, fmt, columns=columns)
+        if not _is_fresh(table.schema, csv_path):
+            return None
+        return table.to_pandas()
+    except Exception as e:
+        logger.warning("Ignoring unreadable cache %s: %s", path, e)
+        return None
+
+
+def fresh_cache_path(csv_path, fmt="parquet"):
+    """Returns the cache path for csv_path when it exists and is fresh, reading only its schema."""
+    path = cache_path(csv_path, fmt)
+    if not os.path.exists(path):
+        return None
+    try:
+        if fmt == "feather":
+            import pyarrow as pa
+            with pa.memory_map(path) as source:
+                table_schema = pa.ipc.open_file(source).schema
+        else:
+            from pyarrow import parquet
+            table_schema = parquet.read_schema(path)
+        return path if _is_fresh(table_schema, csv_path) else None
+    except Exception as e:
+        logger.warning("Ignoring unreadable cache %s: %s", path, e)
+        return None
+
+
+def load_csv(csv_path, fmt="feather"):
+    """Loads csv_path through the binary cache, converting it on the first load."""
+    if fmt not in FORMATS:
+        return schema.read_csv(csv_path)
+
+    data = read_cached(csv_path, fmt)
+    if data is not None:
+        return data
+
+    # Fingerprint before parsing so a CSV rewritten mid-parse is not marked fresh
+    fingerprint = _fingerprint(csv_path)
+    data = schema.read_csv(csv_path)
+    try:
+        write_cache(data, csv_path, fmt, fingerprint)
+    except Exception as e:
+        # Missing pyarrow or a read-only data directory only costs the speed-up
+        logger.warning("Could not write %s cache for %s: %s", fmt, csv_path, e)
+    return data
@@ -0,0 +1,209 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import appends
+import schema
+
+
+# --- Binning ---
+# Continuous columns are grouped by a BinSpec: fixed edges, a fixed bin width,
+# or quantile bins. The edges of a width or quantile spec come from the data's
+# range or quantiles. Bins are closed on the left like pd.cut(right=False).
+# Values below the first edge or at/above the last edge fall into open-ended
+# bins ("<20", "60+"), so an out-of-range value is never silently dropped;
+# only missing values get code -1. Codes come from one np.searchsorted over the
+# edges, are stored as int8 and are cached per (dataset version, spec), so
+# re-binning on a rerun is a cache lookup.
+AGE_BINS = [20, 30, 40, 50, 60]
+MAX_BINS = 100
+QUANTILE_RANGE = (2, 20)
+BIN_KINDS = {"preset": "Preset", "width": "Fixed width", "quantile": "Quantiles"}
+
+
+@dataclass(frozen=True)
+class BinSpec:
+    """How to bin one numeric column; hashable, so it keys the code cache."""
+    column: str
+    kind: str = "edges"  # "edges", "width" or "quantile"
+    edges: tuple = ()
+    width: float = None
+    quantiles: int = None
+    name: str = None
+
+    @property
+    def label(self):
+        """Returns the dimension name shown in charts and tables."""
+        if self.name:
+            return self.name
+        if self.kind == "width":
+            return f"{self.column} ({self.width:g} wide bins)"
+        if self.kind == "quantile":
+            return f"{self.column} ({self.quantiles} quantile bins)"
+        return f"{self.column} bins"
+
+    @property
+    def integer(self):
+        return self.column in schema.INTEGER_COLUMNS
+
+    def resolve(self, values, weights=None):
+        """Returns the sorted, distinct bin edges for a float array of the column's values.
+
+        weights counts how often each value occurs (see file_aggregates.py); the
+        edges are those of the values repeated that many times.
+        """
+        if self.kind == "edges":
+            return np.asarray(self.edges, dtype="float64")
+        finite = ~np.isnan(values)
+        values = values[finite]
+        if not len(values):
+            return np.empty(0)
+        low, high = values.min(), values.max()
+        if self.kind == "width":
+            # Too narrow a width is widened so the range needs at most MAX_BINS bins (see min_width)
+            width = max(self.width, min_width(low, high))
+            start = math.floor(low / width) * width
+            count = int((high - start) // width) + 1
+            return start + width * np.arange(count + 1)
+        if self.kind == "quantile":
+            q = np.linspace(0, 1, self.quantiles + 1)[1:-1]
+            if weights is None:
+                inner = np.quantile(values, q)
+            else:
+                inner = weighted_quantiles(values, np.asarray(weights)[finite], q)
+            return np.unique(np.concatenate([[low], inner]))
+        raise ValueError(f"Unknown bin kind: {self.kind!r}")
+
+    def labels(self, edges=None):
+        """Returns one label per bin code: underflow, each [edge, next edge) and overflow."""
+        edges = np.asarray(self.edges if edges is None else edges, dtype="float64")
+        if not len(edges):
+            return []
+
+        def number(value):
+            return f"{int(value)}" if self.integer and float(value).is_integer() else f"{value:g}"
+
+        labels = [f"<{number(edges[0])}"]
+        for low, high in zip(edges, edges[1:]):
+            if self.integer and float(low).is_integer() and float(high).is_integer():
+                # Integer columns name the last value inside the bin: [20, 30) is "20-29"
+                labels.append(number(low) if high - 1 <= low else f"{number(low)}-{number(high - 1)}")
+            else:
+                labels.append(f"{number(low)}-{number(high)}")
+        labels.append(f"{number(edges[-1])}+")
+        return labels
+
+
+# Age groups of the Comparison page; ages outside 20-59 get "<20" and "60+"
+AGE_GROUPS = BinSpec("Age", edges=tuple(AGE_BINS), name="Age_Group")
+
+# Default spec of every column the dashboard bins
+PRESETS = {
+    "Age": AGE_GROUPS,
+    "Sleep Duration": BinSpec("Sleep Duration", "width", width=0.5, name="Sleep Duration"),
+    "Daily Steps": BinSpec("Daily Steps", "width", width=2000, name="Daily Steps"),
+    "Heart Rate": BinSpec("Heart Rate", "width", width=5, name="Heart Rate"),
+}
+BINNABLE_COLUMNS = list(PRESETS)
+
+
+def min_width(low, high):
+    """Returns the narrowest bin width covering [low, high] with at most MAX_BINS bins.
+
+    A width bin spec adds the bin holding high and the open-ended bins on either
+    side, so the range itself gets MAX_BINS - 3 widths. The width is rounded up
+    to two significant digits so it reads well in the page's width input.
+    """
+    width = (high - low) / (MAX_BINS - 3)
+    if width <= 0:
+        return 0.0
+    scale = 10.0 ** (math.floor(math.log10(width)) - 1)
+    return round(math.ceil(width / scale) * scale, 12)
+
+
+def default_width(column):
+    """Returns the bin width a column's preset uses (the first bin's width for fixed edges)."""
+    preset = PRESETS[column]
+    return float(preset.width or preset.edges[1] - preset.edges[0])
+
+
+def make_spec(column, kind="preset", value=None):
+    """Returns the BinSpec for a column from the page's bin controls (see BIN_KINDS)."""
+    if kind == "width":
+        return BinSpec(column, "width", width=float(value))
+    if kind == "quantile":
+        return BinSpec(column, "quantile", quantiles=int(value))
+    return PRESETS[column]
+
+
+def weighted_quantiles(values, weights, q):
+    """Returns np.quantile(values repeated weights times, q) without repeating them."""
+    order = np.argsort(values, kind="stable")
+    values, cumulative = values[order], np.cumsum(weights[order])
+    # Linear interpolation between the sorted positions floor(h) and floor(h) + 1, like np.quantile
+    position = np.asarray(q) * (cumulative[-1] - 1)
+    lower = np.floor(position)
+    upper = np.minimum(lower + 1, cumulative[-1] - 1)
+    low_value = values[np.searchsorted(cumulative, lower, side="right")]
+    high_value = values[np.searchsorted(cumulative, upper, side="right")]
+    return low_value + (position - lower) * (high_value - low_value)
+
+
+def bin_codes(values, spec, weights=None):
+    """Returns (int8 codes, labels, edges) of a column's values; missing values get -1."""
+    values = np.asarray(values, dtype="float64")
+    edges = spec.resolve(values, weights)
+    return edge_codes(values, edges), spec.labels(edges), edges
+
+
+def edge_codes(values, edges):
+    """Returns the int8 bin codes of a float array for resolved edges; missing values get -1."""
+    # searchsorted(side="right") puts [edge_i, edge_i+1) at code i + 1, below the first edge at 0
+    codes = np.searchsorted(edges, values, side="right")
+    codes[np.isnan(values)] = -1
+    return codes.astype(np.int8)
+
+
+def binned(series, spec, name=None):
+    """Returns the values of series as an ordered categorical of bin labels."""
+    codes, labels, _ = bin_codes(series.to_numpy(dtype="float64", na_value=np.nan), spec)
+    categories = pd.CategoricalDtype(labels, ordered=True)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=categories), index=series.index,
+                     name=name or spec.label)
+
+
+# Codes are computed once per dataset version and spec and shared by every session
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _cached_codes(_df, version, spec):
+    # The state also keeps the column's range, which decides the edges of a width spec
+    def build(df):
+        values = df[spec.column].to_numpy(dtype="float64", na_value=np.nan)
+        return (*bin_codes(values, spec), *_value_range(values))
+
+    def extend(state, rows):
+        # Appended rows get codes of their own while the edges stay the same (see appends.extended);
+        # quantile edges move with every row, so those codes are built again
+        codes, labels, edges, low, high = state
+        if spec.kind == "quantile":
+            return None
+        values = rows[spec.column].to_numpy(dtype="float64", na_value=np.nan)
+        new_low, new_high = _value_range(values)
+        low, high = np.fmin(low, new_low), np.fmax(high, new_high)
+        if not np.array_equal(spec.resolve(np.array([low, high])), edges):
+            return None
+        return np.concatenate([codes, edge_codes(values, edges)]), labels, edges, low, high
+
+    return appends.extended(_df, ("bin_codes", spec), build, extend)[:3]
+
+
+def _value_range(values):
+    finite = values[~np.isnan(values)]
+    return (finite.min(), finite.max()) if len(finite) else (np.nan, np.nan)
+
+
+def get_codes(df, spec):
+    """Returns the cached (int8 codes, labels, edges) of df[spec.column]."""
+    return _cached_codes(df, df.attrs.get("version", ""), spec)
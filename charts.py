@@ -0,0 +1,262 @@
+import colorsys
+import dataclasses
+
+import matplotlib as mpl
+import numpy as np
+import seaborn as sns
+from matplotlib.colors import to_rgb, to_rgba
+from matplotlib.patches import Patch
+
+from figure_cache import new_figure
+
+
+# --- Chart Definitions ---
+# Each function draws one dashboard figure and returns it without displaying it.
+# Figures come from new_figure, so they never enter pyplot's global figure manager.
+# Pages name them in figure_cache.show_figure so the rendered image is reused
+# across reruns, sessions and page switches, and this module (with matplotlib
+# and seaborn) is only imported when a figure is actually drawn.
+
+
+# --- Precomputed Histograms ---
+# Histogram bars and KDE curves are drawn from a density.Distribution (bins and
+# curves computed once per dataset version) with seaborn histplot's styling.
+
+def _draw_histogram(ax, dist, groups, kde=False, legend_title=None):
+    """Draws stacked bars (and stacked KDE curves) for the given groups of dist."""
+    alpha = .5 if kde else .75
+    edges, widths = dist.edges[:-1], np.diff(dist.edges)
+    colors = {group: f"C{i}" for i, group in enumerate(groups)}
+    edgecolor = mpl.rcParams["patch.edgecolor"]
+
+    # Like seaborn, the last group sits at the bottom of the stack and is drawn first
+    bottom = np.zeros(len(edges))
+    curve_bottom = np.zeros(len(dist.support))
+    bars = []
+    for group in reversed(groups):
+        heights = dist.counts[group].to_numpy()
+        bars += ax.bar(edges, heights, widths, bottom, align="edge", color="none",
+                       facecolor=to_rgba(colors[group], alpha), edgecolor=edgecolor)
+        bottom = bottom + heights
+        if kde and group in dist.density and dist.density[group].notna().all():
+            curve_bottom = curve_bottom + dist.density[group].to_numpy()
+            ax.plot(dist.support, curve_bottom, color=to_rgba(colors[group], 1))
+
+    # Bar outlines scale with the bin width on screen, capped at the default patch linewidth
+    ax.autoscale_view()
+    points = 72 / ax.figure.dpi * abs(ax.transData.transform([edges[0] + widths.min(), 0])[0]
+                                      - ax.transData.transform([edges[0], 0])[0])
+    for bar in bars:
+        bar.set_linewidth(min(.1 * points, bar.get_linewidth()))
+
+    if legend_title is not None:
+        handles = [Patch(facecolor=to_rgba(colors[group], alpha), edgecolor=edgecolor) for group in groups]
+        ax.legend(handles, groups, title=legend_title)
+
+
+# --- Categorical Axes ---
+# Bars, violins and boxes drawn from precomputed statistics use seaborn's
+# categorical styling: desaturated palette color, gray outline, one slot per group.
+
+def _fill_color():
+    return sns.desaturate("C0", .75)
+
+
+def _line_color(color):
+    """Returns seaborn's "auto" outline gray for a fill color."""
+    lightness = colorsys.rgb_to_hls(*to_rgb(color))[1] * .6
+    return (lightness, lightness, lightness)
+
+
+def _categorical_axis(ax, labels):
+    positions = np.arange(len(labels))
+    ax.set_xticks(positions, [str(label) for label in labels])
+    ax.set_xlim(-.5, len(labels) - .5)
+    return positions
+
+
+def _draw_mean_bars(ax, intervals):
+    # Same look as sns.barplot: desaturated first palette color, ".26" error bars
+    positions = _categorical_axis(ax, intervals.index)
+    ax.bar(positions - .4, intervals["mean"], .8, align="edge", color=_fill_color())
+    for position, low, high in zip(positions, intervals["low"], intervals["high"]):
+        if not np.isnan(low):
+            ax.plot([position, position], [low, high], color=".26", linewidth=1.5 * mpl.rcParams["lines.linewidth"])
+
+
+# Objective 1 (Demographic)
+
+def age_distribution_by_gender(age):
+    """Figure 1: stacked Age histogram per Gender with KDE curves (see density.get_distribution)."""
+    fig, ax = new_figure(figsize=(10, 6))
+    _draw_histogram(ax, age, list(age.counts.columns), kde=True, legend_title='Gender')
+
+    ax.set_title('Age Distribution by Gender')
+    ax.set_xlabel('Age')
+    ax.set_ylabel('Count')
+    return fig
+
+
+def age_distribution(age):
+    """Figure 2: histogram of the Age column, summed over the groups of the same Distribution."""
+    fig, ax = new_figure(figsize=(8, 6))
+    # Same bins as Figure 1, so the counts are the per-Gender counts added together
+    _draw_histogram(ax, dataclasses.replace(age, counts=age.total.to_frame("All")), ["All"])
+
+    ax.set_xlabel('Age')
+    ax.set_ylabel('Frequency')
+    ax.set_title('Distribution of Age')
+    return fig
+
+
+def occupation_distribution(occupation_counts):
+    """Figure 3: pie chart of Occupation value counts."""
+    fig, ax = new_figure(figsize=(10, 8))
+    wedges, texts, autotexts = ax.pie(
+        occupation_counts,
+        autopct='%1.1f%%',
+        startangle=140,
+        pctdistance=1.1
+    )
+
+    # Add a legend to display the occupation labels
+    ax.legend(
+        wedges,
+        occupation_counts.index,
+        title="Occupation",
+        loc="center left",
+        bbox_to_anchor=(1, 0, 0.5, 1)
+    )
+
+    ax.set_title('Distribution of Occupation')
+    ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+    return fig
+
+
+# Objective 2 (Comparison)
+
+def quality_by_gender(intervals, method="t"):
+    """Figure 1: bars of mean Quality of Sleep per Gender with precomputed error bars.
+
+    intervals has mean/low/high per Gender (see comparison.get_mean_intervals);
+    method is only part of the figure cache key.
+    """
+    fig, ax = new_figure(figsize=(8, 6))
+    _draw_mean_bars(ax, intervals)
+    ax.set_title('Average Quality of Sleep by Gender')
+    ax.set_xlabel('Gender')
+    ax.set_ylabel('Quality of Sleep')
+    return fig
+
+
+def quality_by_age_group(quality_by_age):
+    """Figure 2: stacked bars of the Age_Group x Quality of Sleep crosstab."""
+    fig, ax = new_figure(figsize=(10, 7))
+    quality_by_age.plot(kind='bar', stacked=True, ax=ax, colormap='viridis')
+
+    ax.set_title('Distribution of Quality of Sleep by Age Group')
+    ax.set_xlabel('Age Group')
+    ax.set_ylabel('Count')
+    ax.legend(title='Quality of Sleep')
+    ax.tick_params(axis='x', labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+
+def quality_by_occupation(occupation_quality_mean):
+    """Figure 3: line chart of mean Quality of Sleep per Occupation."""
+    fig, ax = new_figure(figsize=(12, 8))
+    sns.lineplot(x='Occupation', y='Quality of Sleep', data=occupation_quality_mean, marker='o', ax=ax)
+
+    ax.set_title('Average Quality of Sleep by Occupation (Line Chart)')
+    ax.set_xlabel('Occupation')
+    ax.set_ylabel('Average Quality of Sleep')
+    ax.grid(True)
+    ax.tick_params(axis='x', labelrotation=90)
+    return fig
+
+
+def segment_means(intervals, dimension, metric, method="t"):
+    """Figure 4: bars of the mean metric per segment of any dimension (see comparison.py).
+
+    method is only part of the figure cache key.
+    """
+    fig, ax = new_figure(figsize=(10, 6))
+    _draw_mean_bars(ax, intervals)
+    ax.set_title(f'Average {metric} by {dimension.replace("_", " ")}')
+    ax.set_xlabel(dimension.replace("_", " "))
+    ax.set_ylabel(metric)
+    if len(intervals) > 5:
+        ax.tick_params(axis='x', labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment("right")
+    fig.tight_layout()
+    return fig
+
+
+# Objective 3 (Correlation)
+
+def correlation_heatmap(correlation_matrix, title="Correlation Matrix of Quality of Sleep and Heart Rate"):
+    """Figure 1: annotated heatmap of a correlation matrix."""
+    fig, ax = new_figure(figsize=(8, 6))
+    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt=".2f", ax=ax)
+    ax.set_title(title)
+    return fig
+
+
+def sleep_duration_by_disorder(sketches):
+    """Figure 2: violin plot of Sleep Duration per Sleep Disorder from quantile sketches.
+
+    sketches maps each Sleep Disorder to its sketches.QuantileSketch; the KDE
+    (Scott bandwidth, cut=2) and inner box come from the sketch centroids.
+    """
+    fig, ax = new_figure(figsize=(8, 6))
+    color = _fill_color()
+    linecolor = _line_color(color)
+    linewidth = 1.25 * mpl.rcParams["patch.linewidth"]
+    box_width = linewidth * 4.5
+
+    curves = [sketch.kde(cut=2) for sketch in sketches.values()]
+    # density_norm="area": every violin shares the largest density's scale
+    peak = max((curve[1].max() for curve in curves if curve is not None), default=1)
+
+    positions = _categorical_axis(ax, list(sketches))
+    for position, sketch, curve in zip(positions, sketches.values(), curves):
+        if curve is None:
+            # A group without spread is a single line at its value
+            ax.plot([position - .4, position + .4], [sketch.mean] * 2, color=linecolor, linewidth=linewidth)
+            continue
+        support, values = curve
+        half_width = values / peak * .4
+        ax.fill_betweenx(support, position - half_width, position + half_width,
+                         facecolor=color, edgecolor=linecolor, linewidth=linewidth)
+        stats = sketch.box_stats()
+        ax.plot([position, position], [stats["whislo"], stats["whishi"]], color=linecolor, linewidth=box_width / 3)
+        ax.plot([position, position], [stats["q1"], stats["q3"]], color=linecolor, linewidth=box_width)
+        ax.plot([position], [stats["med"]], marker="_", markersize=box_width / 1.2, markeredgewidth=box_width / 5,
+                markeredgecolor="w", markerfacecolor="w", color=linecolor)
+
+    ax.set_title('Sleep Duration Distribution by Sleep Disorder')
+    ax.set_xlabel('Sleep Disorder')
+    ax.set_ylabel('Sleep Duration')
+    return fig
+
+
+def activity_by_bmi(sketches):
+    """Figure 3: box plot of Physical Activity Level per BMI Category from quantile sketches."""
+    fig, ax = new_figure(figsize=(10, 6))
+    color = _fill_color()
+    linecolor = _line_color(color)
+    line = dict(color=linecolor, linewidth=mpl.rcParams["patch.linewidth"])
+    ax.bxp(
+        [sketch.box_stats() for sketch in sketches.values()],
+        positions=np.arange(len(sketches)), widths=.8, capwidths=.4, patch_artist=True, manage_ticks=False,
+        boxprops=dict(facecolor=color, edgecolor=linecolor, linewidth=line["linewidth"]),
+        whiskerprops=line, capprops=line, medianprops=line,
+        flierprops=dict(marker="o", markerfacecolor="none", markeredgecolor=linecolor),
+    )
+    _categorical_axis(ax, list(sketches))
+    ax.set_title('Physical Activity Level Distribution by BMI Category')
+    ax.set_xlabel('BMI Category')
+    ax.set_ylabel('Physical Activity Level')
+    return fig
@@ -0,0 +1,313 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import appends
+import binning
+import density
+import intervals
+
+
+# --- Segment Comparison Engine ---
+# Compares any numeric metric across the segments of any dimension: a
+# categorical column, or a numeric column cut into bins by a binning.BinSpec
+# (fixed edges, a fixed width or quantiles). Each dimension is turned into
+# compact integer segment codes, and each metric into codes over its sorted
+# distinct values, once per dataset version. A comparison is then a single
+# bincount of the combined (segment, value) code, and counts, means, variances
+# and the segment x value distribution are all read from that table in
+# O(segments x values). Metrics with more than DISTINCT_LIMIT distinct values
+# get their moments from weighted bincounts and no distribution table.
+CATEGORY_DIMENSIONS = ["Gender", "Occupation", "BMI Category", "Sleep Disorder"]
+# Binned dimensions by name, with their preset bins; any other binning.BinSpec is accepted as well
+BINNED_DIMENSIONS = {spec.label: spec for spec in binning.PRESETS.values()}
+DIMENSIONS = ["Gender", "Age_Group", "Occupation", "BMI Category", "Sleep Disorder",
+              "Sleep Duration", "Daily Steps", "Heart Rate"]
+METRICS = [
+    "Quality of Sleep", "Sleep Duration", "Stress Level", "Physical Activity Level",
+    "Heart Rate", "Daily Steps", "Systolic BP", "Diastolic BP",
+]
+DISTINCT_LIMIT = 10_000
+
+
+def bin_spec(dimension):
+    """Returns the BinSpec of a binned dimension, or None for a categorical column."""
+    if isinstance(dimension, binning.BinSpec):
+        return dimension
+    return BINNED_DIMENSIONS.get(dimension)
+
+
+def dimension_name(dimension):
+    """Returns the name of a dimension's segment index."""
+    spec = bin_spec(dimension)
+    return spec.label if spec is not None else dimension
+
+
+def dimension_column(dimension):
+    """Returns the data column a dimension is read from."""
+    spec = bin_spec(dimension)
+    return spec.column if spec is not None else dimension
+
+
+def columns_for(dimension, metric):
+    """Returns the columns a comparison reads, for sleep_data.load_data(columns=...)."""
+    return [dimension_column(dimension), metric]
+
+
+def code_dimension(df, dimension):
+    """Returns (segment codes with -1 for missing, segment labels) of a dimension."""
+    spec = bin_spec(dimension)
+    if spec is not None:
+        codes, labels, _ = binning.bin_codes(df[spec.column].to_numpy(dtype="float64", na_value=np.nan), spec)
+        return codes, labels
+    series = df[dimension]
+    levels = density.group_levels(series)
+    if isinstance(series.dtype, pd.CategoricalDtype) and list(series.cat.categories) == levels:
+        return series.cat.codes.to_numpy(), levels
+    return pd.Categorical(series, categories=levels).codes, levels
+
+
+def code_metric(df, metric):
+    """Returns (value codes with -1 for missing, sorted distinct values) of a numeric column."""
+    values = df[metric].to_numpy(dtype="float64", na_value=np.nan)
+    codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=True)
+    return codes.astype("int64"), uniques.astype("float64")
+
+
+@dataclass(frozen=True)
+class SegmentComparison:
+    """Per-segment statistics of one metric; shared by every session, so read-only."""
+    dimension: object  # a column name or a binning.BinSpec
+    metric: str
+    # count, sum, sumsq, mean, var and std per observed segment, in segment order
+    stats: pd.DataFrame
+    # segment x metric value counts of the observed segments and values, or None past DISTINCT_LIMIT
+    distribution: pd.DataFrame = None
+    # past DISTINCT_LIMIT: segment x counts over DISTINCT_LIMIT bins of consecutive distinct values,
+    # labelled by each bin's mean value; what the bootstrap resamples instead of the distribution
+    binned_distribution: pd.DataFrame = None
+
+    @property
+    def moments(self):
+        """Returns count/sum/sumsq per segment (the input of intervals.mean_intervals)."""
+        return self.stats[["count", "sum", "sumsq"]]
+
+    def mean_intervals(self, method="t"):
+        """Returns mean, low and high per segment for an analytic CI method (see intervals.py)."""
+        return intervals.mean_intervals(self.moments, method)
+
+    def value_table(self):
+        """Returns the distribution as a density.value_table (values x segments)."""
+        if self.distribution is None:
+            raise ValueError(f"{self.metric} has more than {DISTINCT_LIMIT} distinct values")
+        return self.distribution.transpose().rename_axis(self.metric).rename_axis(self.distribution.index.name, axis=1)
+
+    def bootstrap_intervals(self):
+        """Returns mean, low and high per segment from a percentile bootstrap (see intervals.py).
+
+        Past DISTINCT_LIMIT the resamples are drawn from the binned distribution
+        and each interval is shifted onto the segment's exact mean.
+        """
+        if self.distribution is not None:
+            return intervals.bootstrap_intervals(self.value_table())
+        table = self.binned_distribution
+        result = intervals.bootstrap_intervals(table.transpose().rename_axis(table.index.name, axis=1))
+        shift = self.stats["mean"].to_numpy() - result["mean"].to_numpy()
+        return result.add(shift, axis=0)
+
+    def means(self):
+        """Returns a two-column frame of segment and mean metric, like groupby().mean().reset_index()."""
+        return self.stats["mean"].rename(self.metric).reset_index()
+
+
+def compare(dimension_codes, metric_codes, dimension, metric, weights=None):
+    """Returns the SegmentComparison of coded segments and metric values.
+
+    weights, when given, is the number of rows each (segment, value) entry stands for.
+    """
+    segments, labels = dimension_codes
+    value_codes, values = metric_codes
+    keep = (segments >= 0) & (value_codes >= 0)
+    n_segments, n_values = len(labels), len(values)
+    # Segment codes are stored compactly (int8 for bins and most categories) and widened per comparison
+    segment = segments[keep].astype("int64")
+    weight = None if weights is None else np.asarray(weights, dtype="float64")[keep]
+    if n_values <= DISTINCT_LIMIT:
+        cells = np.bincount(segment * n_values + value_codes[keep], weights=weight,
+                            minlength=n_segments * n_values).reshape(n_segments, n_values)
+        if weight is not None:
+            cells = np.rint(cells).astype("int64")
+        return compare_cells(cells, labels, values, dimension, metric)
+
+    value = values[value_codes[keep]]
+    weight = np.ones(len(value)) if weight is None else weight
+    count = np.bincount(segment, weights=weight, minlength=n_segments).round().astype("int64")
+    total = np.bincount(segment, weights=weight * value, minlength=n_segments)
+    sumsq = np.bincount(segment, weights=weight * value ** 2, minlength=n_segments)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        m2 = np.bincount(segment, weights=weight * (value - mean[segment]) ** 2, minlength=n_segments)
+    # Consecutive distinct values share one of DISTINCT_LIMIT bins, represented by their mean
+    value_bin = (value_codes[keep] * DISTINCT_LIMIT) // n_values
+    binned = np.bincount(segment * DISTINCT_LIMIT + value_bin, weights=weight,
+                         minlength=n_segments * DISTINCT_LIMIT).reshape(n_segments, DISTINCT_LIMIT)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bin_values = (np.bincount(value_bin, weights=weight * value, minlength=DISTINCT_LIMIT)
+                      / np.bincount(value_bin, weights=weight, minlength=DISTINCT_LIMIT))
+    stats, observed = _segment_stats(labels, count, total, sumsq, mean, m2, dimension)
+    used = binned.sum(axis=0) > 0
+    binned_distribution = pd.DataFrame(np.rint(binned[observed][:, used]).astype("int64"), index=stats.index,
+                                       columns=pd.Index(bin_values[used], name=metric))
+    return SegmentComparison(dimension, metric, stats, binned_distribution=binned_distribution)
+
+
+def compare_cells(cells, labels, values, dimension, metric):
+    """Returns the SegmentComparison of a segments x sorted metric values array of row counts."""
+    count = cells.sum(axis=1)
+    total = cells @ values
+    sumsq = cells @ values ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        # Centered on each segment mean, so large values do not cancel
+        m2 = (cells * (values[None, :] - mean[:, None]) ** 2).sum(axis=1)
+    stats, observed = _segment_stats(labels, count, total, sumsq, mean, m2, dimension)
+    used = cells.sum(axis=0) > 0
+    value_index = pd.Index(values[used], name=metric)
+    if np.all(value_index == np.round(value_index)):
+        value_index = value_index.astype("int64")
+    distribution = pd.DataFrame(cells[observed][:, used], index=stats.index, columns=value_index)
+    return SegmentComparison(dimension, metric, stats, distribution)
+
+
+def _segment_stats(labels, count, total, sumsq, mean, m2, dimension):
+    # Returns the stats frame of the observed segments and the observed mask
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.where(count > 1, m2 / (count - 1), np.nan)
+    observed = count > 0
+    # Categorical like the index of a groupby/crosstab on the column (bins are ordered)
+    index = pd.CategoricalIndex(labels, categories=labels, ordered=bin_spec(dimension) is not None,
+                                name=dimension_name(dimension))
+    stats = pd.DataFrame({"count": count, "sum": total, "sumsq": sumsq, "mean": mean, "var": var,
+                          "std": np.sqrt(var)}, index=index)[observed]
+    return stats, observed
+
+
+def add_comparisons(left, right, labels):
+    """Returns the SegmentComparison of the rows behind two comparisons coded with the same segments.
+
+    labels are the segments of both (right may add segments after those of left);
+    returns None past DISTINCT_LIMIT, where comparisons keep no distribution.
+    """
+    if left.distribution is None or right.distribution is None:
+        return None
+    parts = [part.distribution for part in (left, right)]
+    values = np.union1d(*(part.columns.to_numpy(dtype="float64") for part in parts))
+    if len(values) > DISTINCT_LIMIT:
+        return None
+    cells = np.zeros((len(labels), len(values)), dtype="int64")
+    segments = pd.Index(labels)
+    for part in parts:
+        rows = segments.get_indexer(list(part.index))
+        columns = np.searchsorted(values, part.columns.to_numpy(dtype="float64"))
+        cells[np.ix_(rows, columns)] += part.to_numpy(dtype="int64")
+    return compare_cells(cells, labels, values, left.dimension, left.metric)
+
+
+def compare_counts(counts, dimension, metric):
+    """Returns the SegmentComparison of (dimension column value, metric value) pair counts.
+
+    counts is a Series indexed by the pairs, as file_aggregates.pair_counts returns;
+    segments are ordered like the categories code_dimension reads from a frame.
+    """
+    weights = counts.to_numpy(dtype="float64")
+    dimension_values = counts.index.get_level_values(0)
+    spec = bin_spec(dimension)
+    if spec is not None:
+        codes, labels, _ = binning.bin_codes(dimension_values.to_numpy(dtype="float64", na_value=np.nan),
+                                             spec, weights)
+    else:
+        labels = sorted(pd.unique(dimension_values.dropna()))
+        codes = pd.Categorical(dimension_values, categories=labels).codes
+    values = counts.index.get_level_values(1).to_numpy(dtype="float64", na_value=np.nan)
+    value_codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=True)
+    return compare((codes, labels), (value_codes.astype("int64"), uniques.astype("float64")),
+                   dimension, metric, weights=weights)
+
+
+def _extend_dimension(state, rows, dimension):
+    # Categories only gain labels at the end (see appends.py), so earlier codes stay valid
+    codes, levels = state
+    new_codes, new_levels = code_dimension(rows, dimension)
+    if new_levels[:len(levels)] != levels:
+        return None
+    return np.concatenate([codes, new_codes]), new_levels
+
+
+def _extend_metric(state, rows, metric):
+    # Earlier codes are remapped only when the new rows bring new distinct values
+    codes, uniques = state
+    new_codes, new_uniques = code_metric(rows, metric)
+    merged = np.union1d(uniques, new_uniques)
+    if len(merged) > len(uniques):
+        codes = np.where(codes >= 0, np.searchsorted(merged, uniques)[codes], -1)
+    new_codes = np.where(new_codes >= 0, np.searchsorted(merged, new_uniques)[new_codes], -1)
+    return np.concatenate([codes, new_codes]), merged
+
+
+# Codes are built once per dataset version; each comparison is one bincount over them.
+# An appended version extends the codes and comparison cells of the previous one (see appends.extended).
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _cached_dimension(_df, version, dimension):
+    spec = bin_spec(dimension)
+    if spec is not None:
+        # Shares the int8 bin codes cached by binning.py
+        codes, labels, _ = binning.get_codes(_df, spec)
+        return codes, labels
+    return appends.extended(_df, ("dimension_codes", dimension), lambda df: code_dimension(df, dimension),
+                            lambda state, rows: _extend_dimension(state, rows, dimension))
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _cached_metric(_df, version, metric):
+    return appends.extended(_df, ("metric_codes", metric), lambda df: code_metric(df, metric),
+                            lambda state, rows: _extend_metric(state, rows, metric))
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _cached_comparison(_df, version, dimension, metric):
+    segments, labels = _cached_dimension(_df, version, dimension)
+    value_codes, values = _cached_metric(_df, version, metric)
+    spec = bin_spec(dimension)
+    # Bin edges that moved re-bin every row, so the comparison is built again
+    coding = tuple(binning.get_codes(_df, spec)[2]) if spec is not None else ()
+
+    def build(df):
+        return coding, compare((segments, labels), (value_codes, values), dimension, metric)
+
+    def extend(state, rows):
+        if state[0] != coding:
+            return None
+        added = compare((segments[-len(rows):], labels), (value_codes[-len(rows):], values), dimension, metric)
+        result = add_comparisons(state[1], added, labels)
+        return None if result is None else (coding, result)
+
+    return appends.extended(_df, ("comparison", dimension, metric), build, extend)[1]
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _cached_bootstrap(_df, version, dimension, metric):
+    return _cached_comparison(_df, version, dimension, metric).bootstrap_intervals()
+
+
+def get_comparison(df, dimension, metric):
+    """Returns the cached SegmentComparison of metric across the segments of dimension."""
+    return _cached_comparison(df, df.attrs.get("version", ""), dimension, metric)
+
+
+def get_mean_intervals(df, dimension, metric, method="t"):
+    """Returns cached mean, low and high of metric per segment for a CI method (see intervals.CI_METHODS)."""
+    if method == "bootstrap":
+        return _cached_bootstrap(df, df.attrs.get("version", ""), dimension, metric)
+    return get_comparison(df, dimension, metric).mean_intervals(method)
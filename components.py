@@ -0,0 +1,330 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import appends
+import filters
+from aggregates import get_summary
+from profiling import span
+from sleep_data import load_data
+
+
+# --- Purple/Black Theme CSS shared by every page ---
+THEME_CSS = """
+<style>
+    /* Main Header Styling */
+    .stApp {
+        background-color: #1a1a1a; /* Dark background */
+        color: #e0e0e0; /* Light text for contrast */
+    }
+    h1 {
+        color: #8A2BE2; /* Primary Purple for main title */
+        font-weight: 700;
+        text-shadow: 2px 2px 4px #000000;
+    }
+    h2 {
+        color: #BA55D3; /* Medium Purple for headers */
+        border-bottom: 2px solid #8A2BE2;
+        padding-bottom: 5px;
+    }
+    /* Ensure text in main sections is light */
+    .st-emotion-cache-nahz7x, 
+    .st-emotion-cache-163l4a8, 
+    .st-emotion-cache-12fm5so {
+        color: #e0e0e0 !important;
+    }
+</style>
+"""
+
+
+def apply_theme():
+    """Injects the Purple/Black theme CSS into the current page."""
+    st.markdown(THEME_CSS, unsafe_allow_html=True)
+
+
+def page_header(title, description):
+    """Shows the lavender title box followed by the page's description box."""
+    # Using HTML for styling with a smooth color box
+    st.markdown(
+        f"""
+        <style>
+        .title {{
+            /* Smooth, single background color (Lavender) */
+            background: #E6E6FA; 
+            color: #000000; /* Black text color for contrast */
+            padding: 10px;
+            border-radius: 5px;
+            /* Thick Black Border: 10px wide, solid style, black color */
+            border: 10px solid #000000;
+            text-align: center;
+            box-shadow: 0 4px 10px rgba(0, 0, 0, 0.5); /* Shadow for depth */
+        }}
+        h1 {{
+            margin: 0;
+        }}
+        </style>
+        <div class="title">
+            <h1>{title}</h1>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+    st.markdown(
+        f"""
+        <div style="
+            background-color:#BDB5D5;
+            color: #000000; /* Black text color for contrast */;
+            padding:15px 20px;
+            border-radius:10px;
+            border:1px solid #d1d5db;
+        ">
+        <b>{description}</b>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+# --- Paginated Dataset Viewer ---
+# Only the visible page of rows is materialized and sent to the browser.
+# Sorting and filtering run on the server over row positions, and the
+# purple/black theme comes from .streamlit/config.toml plus column_config
+# instead of per-cell Styler CSS.
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def column_config(df):
+    """Returns st.dataframe column formats for the dashboard columns present in df."""
+    formats = {
+        "Sleep Duration": st.column_config.NumberColumn("Sleep Duration", format="%.1f h"),
+        "Daily Steps": st.column_config.NumberColumn("Daily Steps", format="%d"),
+        "Heart Rate": st.column_config.NumberColumn("Heart Rate", format="%d bpm"),
+        "Systolic BP": st.column_config.NumberColumn("Systolic BP", format="%d mmHg"),
+        "Diastolic BP": st.column_config.NumberColumn("Diastolic BP", format="%d mmHg"),
+    }
+    return {col: config for col, config in formats.items() if col in df.columns}
+
+
+def _sort_keys(values):
+    """Returns float sort keys for a column: category codes for categoricals, NaN for missing values."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Category order, so ordered categories keep their order and labels are never compared
+        codes = values.cat.codes.to_numpy()
+    elif pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        codes, _ = pd.factorize(values, sort=True)
+    return np.where(codes < 0, np.nan, codes.astype("float64"))
+
+
+# Sort orders and filter results are shared by every session of a dataset version
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _sort_order(_df, version, column, ascending):
+    if column is None:
+        return np.arange(len(_df))
+    keys = _sort_keys(_df[column])
+    # Negated keys keep the sort stable (tied rows stay in order) and missing values last, like sort_values
+    return np.argsort(keys if ascending else -keys, kind="stable")
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _filter_mask(_df, version, column, selection):
+    values = _df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Compare integer category codes rather than the label strings
+        wanted = [values.cat.categories.get_loc(label) for label in selection]
+        return np.isin(values.cat.codes.to_numpy(), wanted)
+    low, high = selection
+    array = values.to_numpy()
+    return (array >= low) & (array <= high)
+
+
+def _filter_controls(df, key):
+    """Renders the filter widgets and returns (column, selection) or (None, None)."""
+    column = st.selectbox("Filter column", ["(none)"] + list(df.columns), key=f"{key}_filter_column")
+    if column == "(none)":
+        return None, None
+
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = list(values.cat.categories)
+        selection = st.multiselect("Values", categories, default=categories, key=f"{key}_filter_values")
+        return column, tuple(selection)
+
+    low, high = values.min(), values.max()
+    if low == high:
+        return None, None
+    selection = st.slider("Range", min_value=low.item(), max_value=high.item(),
+                          value=(low.item(), high.item()), key=f"{key}_filter_range")
+    return column, tuple(selection)
+
+
+def dataset_viewer(df, key="dataset"):
+    """Shows df one page at a time with server-side sorting and filtering."""
+    version = df.attrs.get("version", "")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_column = st.selectbox("Sort by", ["(none)"] + list(df.columns), key=f"{key}_sort")
+        sort_column = None if sort_column == "(none)" else sort_column
+    with col2:
+        ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True,
+                             key=f"{key}_order") == "Ascending"
+    with col3:
+        filter_column, selection = _filter_controls(df, key)
+
+    positions = _sort_order(df, version, sort_column, ascending)
+    if filter_column is not None:
+        mask = _filter_mask(df, version, filter_column, selection)
+        positions = positions[mask[positions]]
+
+    col1, col2 = st.columns(2)
+    page_size = col1.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size")
+    page_count = max(1, -(-len(positions) // page_size))
+    # A narrower filter can leave the stored page number past the last page
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count
+    # No value=: the page number lives in Session State, and starts at min_value
+    page = col2.number_input("Page", min_value=1, max_value=page_count, step=1, key=f"{key}_page")
+
+    start = (page - 1) * page_size
+    page_df = df.iloc[positions[start:start + page_size]]
+
+    st.dataframe(page_df, column_config=column_config(df), hide_index=True, width="stretch")
+    st.caption(f"Showing rows {min(start + 1, len(positions))}–{start + len(page_df)} "
+               f"of {len(positions)} (page {page} of {page_count})")
+
+
+# --- Dataset Overview ---
+# KPI metrics and the dataset, summary and column tables, shown once on the
+# Overview page instead of being repeated on every objective page.
+
+def metrics_row(summary):
+    """Shows the five KPI metrics from a DatasetSummary."""
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric(label="Total Respondents", value=summary.total_respondents)
+    col2.metric(label="Average Age", value=f"{summary.avg_age:.1f}")
+    col3.metric(label="Gender (Male)", value=f"{summary.gender_share.get('Male', 0) * 100:.1f}%")
+    col4.metric(label="Gender (Female)", value=f"{summary.gender_share.get('Female', 0) * 100:.1f}%")
+    col5.metric(label="Top Job", value=f"{summary.most_common_occupation}")
+
+
+def render_overview(df, summary=None):
+    """Shows the dataset overview: metrics, paginated dataset, summary statistics and column info.
+
+    In streaming mode df is only a preview of the first rows and summary is
+    the streamed DatasetSummary of the full file.
+    """
+    st.title("💜 Sleep Health and Lifestyle Dataset")
+
+    if df.empty:
+        st.warning("Could not load the dataset. Please check the data path (SLEEP_DATA_PATH).")
+        return
+
+    # All metrics and tables come from the shared summary computed once per dataset version
+    if summary is None:
+        with span("overview.summary"):
+            summary = get_summary(df)
+    with span("overview.metrics"):
+        metrics_row(summary)
+
+    # 1. Full Dataset Display
+    st.header("Dataset")
+    st.write(f"The dataset contains **{summary.total_respondents}** rows and **{len(df.columns)}** columns.")
+    if len(df) < summary.total_respondents:
+        st.caption(f"Streaming mode: the table below previews the first {len(df):,} rows.")
+    # Paginated view: only the visible page of rows is sent to the browser
+    with span("overview.dataset_table"):
+        dataset_viewer(df)
+
+    # 2. Summary Statistics Display
+    st.header("Summary Statistics")
+    st.write("Descriptive statistics for all numerical columns in the dataset.")
+    with span("overview.summary_table"):
+        st.dataframe(
+            summary.describe,
+            column_config={col: st.column_config.NumberColumn(format="%.2f") for col in summary.describe.columns},
+            width="stretch",
+        )
+
+    # 3. Data Dictionary / Info (Using a basic info section)
+    st.header("Data Column Information")
+    st.write("Below is a quick look at the column names and their data types.")
+    with span("overview.column_info"):
+        st.dataframe(summary.column_info, hide_index=True, width="stretch")
+
+
+# --- Filter Sidebar ---
+
+def filter_sidebar(df):
+    """Shows the cross-filter widgets in the sidebar and returns the selection (see filters.py)."""
+    index = filters.get_index(df)
+    categories = {}
+    st.sidebar.header("Filters")
+    for column, levels in index.levels.items():
+        categories[column] = st.sidebar.multiselect(column, levels, default=levels, key=f"filter_{column}")
+    age_range = index.age_range
+    if age_range is not None and age_range[0] < age_range[1]:
+        age_range = st.sidebar.slider(filters.AGE_COLUMN, min_value=age_range[0], max_value=age_range[1],
+                                      value=age_range, key="filter_age")
+    return index.make_selection(categories, age_range)
+
+
+def filter_caption(df, total_rows):
+    """Notes how many respondents the sidebar filters kept, when they filter anything."""
+    if df.attrs.get("filter"):
+        st.caption(f"Filtered: {len(df):,} of {total_rows:,} respondents match the sidebar filters.")
+
+
+# --- Append Notifications ---
+
+@st.fragment(run_every=appends.poll_seconds())
+def append_watcher():
+    """Reruns the whole page when new survey rows have been appended (see appends.py)."""
+    data = load_data()  # picks up new files in SLEEP_APPEND_DIR
+    version = data.attrs.get("version", "")
+    seen = st.session_state.setdefault("append_seen", (version, len(data)))
+    if seen[0] != version:
+        st.session_state["append_seen"] = (version, len(data))
+        st.session_state["append_notice"] = f"{len(data) - seen[1]:,} new respondents added to the dataset."
+        st.rerun(scope="app")
+
+
+def append_notice():
+    """Shows a toast for rows appended since this session's previous run."""
+    notice = st.session_state.pop("append_notice", None)
+    if notice:
+        st.toast(notice)
+
+
+# --- Debug Sidebar ---
+
+def profile_sidebar(spans, gauges, warmup=None):
+    """Shows the per-section timings of the current rerun, the figure and memory gauges and warm-up timings."""
+    rss = gauges["process_rss_bytes"]
+    st.sidebar.caption(
+        f"Live figures: {gauges['live_figures']} · "
+        f"RSS: {rss / 2**20:,.1f} MiB" if rss is not None else f"Live figures: {gauges['live_figures']}"
+    )
+    if warmup:
+        st.sidebar.caption("Warm-up: " + " · ".join(f"{name} {seconds * 1000:,.0f} ms"
+                                                    for name, seconds in warmup.items()))
+    if not spans:
+        return
+    table = pd.DataFrame(spans).rename(columns={
+        "name": "Section", "wall_s": "Wall (ms)", "cpu_s": "CPU (ms)", "alloc_bytes": "Peak alloc (KiB)",
+    })
+    table[["Wall (ms)", "CPU (ms)"]] *= 1000
+    table["Peak alloc (KiB)"] = table["Peak alloc (KiB)"].astype("float64") / 1024
+    with st.sidebar.expander("Section timings", expanded=True):
+        st.dataframe(
+            table.dropna(axis="columns", how="all"),
+            column_config={
+                "Wall (ms)": st.column_config.NumberColumn(format="%.1f"),
+                "CPU (ms)": st.column_config.NumberColumn(format="%.1f"),
+                "Peak alloc (KiB)": st.column_config.NumberColumn(format="%.0f"),
+            },
+            hide_index=True,
+            width="stretch",
+        )
@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+
+# --- Correlation Engine ---
+# Pearson correlations come from running co-moments (counts, means, co-moments)
+# of every pair of numeric measurements, each over the rows where both values
+# are present, as in pandas' DataFrame.corr(). Spearman correlations come from exact
+# pairwise value counts: for each pair of columns the engine counts how often
+# each (x, y) value combination occurs, and average ranks are derived from
+# those counts. Both are mergeable, so appended rows only update the sums and
+# counts, and any pair or subset of columns is read from the engine without
+# touching the raw rows again. Spearman is tracked while a pair has at most
+# PAIR_CELL_LIMIT distinct combinations (true for the survey's integer scores
+# and rounded measurements); beyond that the pair reports NaN.
+CORRELATION_COLUMNS = [
+    "Sleep Duration", "Quality of Sleep", "Physical Activity Level", "Stress Level",
+    "Heart Rate", "Daily Steps", "Age", "Systolic BP", "Diastolic BP",
+]
+METHODS = {"pearson": "Pearson", "spearman": "Spearman"}
+PAIR_CELL_LIMIT = 100_000
+
+
+class CoMoments:
+    """Running counts, means and co-moments of each pair of numeric columns.
+
+    Like pandas' DataFrame.corr(), every pair uses the rows where both of its
+    columns are present: n[i, j] counts those rows, mean[i, j] is the mean of
+    column i over them, ss[i, j] the sum of squared deviations of column i over
+    them and m2[i, j] the co-moment of columns i and j. Chunks are combined
+    with Chan et al.'s pairwise update, so the result does not depend on how
+    rows were split.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.ss = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+
+    @classmethod
+    def from_array(cls, columns, values):
+        """Builds co-moments from a (rows, columns) float array with NaN for missing values."""
+        result = cls(columns)
+        present = ~np.isnan(values)
+        if not present.any():
+            return result
+        # Shifting by the column means first keeps the sums below from cancelling
+        shift = np.where(present, values, 0.0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+        centered = np.where(present, values - shift, 0.0)
+        mask = present.astype("float64")
+        n = mask.T @ mask
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # sums[i, j]: sum of column i over the rows where column j is also present
+            sums = centered.T @ mask
+            local = np.where(n > 0, sums / n, 0.0)
+            result.m2 = np.where(n > 0, centered.T @ centered - sums * sums.T / n, 0.0)
+            result.ss = np.where(n > 0, (centered ** 2).T @ mask - sums * local, 0.0)
+        result.n = n
+        result.mean = np.where(n > 0, local + shift[:, None], 0.0)
+        return result
+
+    def update(self, frame):
+        """Adds the rows of a DataFrame holding (at least) these columns."""
+        values = frame[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        self.merge(CoMoments.from_array(self.columns, values))
+
+    def merge(self, other):
+        """Folds another CoMoments over the same columns into this one."""
+        n = self.n + other.n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(n > 0, other.n / n, 0.0)
+            factor = np.where(n > 0, self.n * other.n / n, 0.0)
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + delta * delta.T * factor
+        self.ss = self.ss + other.ss + delta * delta * factor
+        self.mean = self.mean + delta * weight
+        self.n = n
+        return self
+
+    def covariance(self, ddof=1):
+        """Returns the sample covariance matrix as a DataFrame, each pair over its complete rows."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = np.where(self.n > ddof, self.m2 / (self.n - ddof), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self, columns=None):
+        """Returns the Pearson correlation matrix, optionally for a subset of columns."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.clip(self.m2 / np.sqrt(self.ss * self.ss.T), -1.0, 1.0)
+        # A column that varies correlates perfectly with itself; a constant one gives NaN, as in pandas
+        np.fill_diagonal(corr, np.where(np.diag(self.ss) > 0, 1.0, np.nan))
+        result = pd.DataFrame(corr, index=self.columns, columns=self.columns)
+        if columns is not None:
+            result = result.loc[columns, columns]
+        return result
+
+
+def _average_ranks(values, weights):
+    """Returns the average (tie-aware) rank of each value when it occurs weights times."""
+    distinct, inverse = np.unique(values, return_inverse=True)
+    counts = np.bincount(inverse, weights=weights)
+    ranks = np.cumsum(counts) - counts + (counts + 1) / 2
+    return ranks[inverse]
+
+
+def _weighted_pearson(x, y, weights):
+    n = weights.sum()
+    dx, dy = x - (weights @ x) / n, y - (weights @ y) / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float((weights * dx) @ dy / np.sqrt(((weights * dx) @ dx) * ((weights * dy) @ dy)))
+
+
+class CorrelationEngine:
+    """Mergeable Pearson and Spearman correlations over a fixed set of numeric columns."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.comoments = CoMoments(self.columns)
+        # {(column_i, column_j): Series of counts indexed by (x, y), or None past PAIR_CELL_LIMIT}
+        self.pairs = {(a, b): pd.Series(dtype="float64") for i, a in enumerate(self.columns)
+                      for b in self.columns[i + 1:]}
+        self._spearman = None
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        """Builds the engine over the given (default: all present CORRELATION_COLUMNS) columns of df."""
+        columns = columns or [col for col in CORRELATION_COLUMNS if col in df]
+        return cls(columns).update(df)
+
+    @classmethod
+    def from_parts(cls, comoments, pairs):
+        """Builds the engine from co-moments and pair counts computed elsewhere (see sql_backend.py)."""
+        engine = cls(comoments.columns)
+        engine.comoments = comoments
+        engine.pairs.update(pairs)
+        return engine
+
+    def update(self, frame):
+        """Adds rows (e.g. an appended chunk) to the running sums and pair counts."""
+        self.comoments.update(frame)
+        # Integer codes per column, so each pair is counted with one bincount
+        codes, uniques = {}, {}
+        for col in self.columns:
+            codes[col], uniques[col] = pd.factorize(frame[col].to_numpy(), use_na_sentinel=True)
+        for (a, b), counts in self.pairs.items():
+            if counts is None:
+                continue
+            valid = (codes[a] >= 0) & (codes[b] >= 0)
+            size_b = len(uniques[b])
+            keys = codes[a][valid].astype("int64") * size_b + codes[b][valid]
+            if len(uniques[a]) * size_b <= 1_000_000:
+                cell_counts = np.bincount(keys, minlength=len(uniques[a]) * size_b)
+                keys = np.flatnonzero(cell_counts)
+                cell_counts = cell_counts[keys]
+            else:
+                keys, cell_counts = np.unique(keys, return_counts=True)
+            index = pd.MultiIndex.from_arrays([np.asarray(uniques[a])[keys // size_b],
+                                               np.asarray(uniques[b])[keys % size_b]])
+            self.pairs[(a, b)] = self._add_pair(counts, pd.Series(cell_counts.astype("float64"), index=index))
+        self._spearman = None
+        return self
+
+    def merge(self, other):
+        """Folds an engine built over other rows (same columns) into this one."""
+        self.comoments.merge(other.comoments)
+        for key, counts in other.pairs.items():
+            if self.pairs[key] is not None:
+                self.pairs[key] = None if counts is None else self._add_pair(self.pairs[key], counts)
+        self._spearman = None
+        return self
+
+    @staticmethod
+    def _add_pair(left, right):
+        if left.empty:
+            combined = right
+        else:
+            combined = left.add(right, fill_value=0)
+        return None if len(combined) > PAIR_CELL_LIMIT else combined
+
+    def pearson(self, columns=None):
+        """Returns the Pearson correlation matrix, optionally for a subset of columns."""
+        return self.comoments.correlation(columns)
+
+    def spearman(self, columns=None):
+        """Returns the Spearman rank correlation matrix, optionally for a subset of columns."""
+        if self._spearman is None:
+            # Ranks and coefficients are computed once per update for all pairs
+            result = pd.DataFrame(np.eye(len(self.columns)), index=self.columns, columns=self.columns)
+            for (a, b), counts in self.pairs.items():
+                if counts is None or counts.empty:
+                    value = np.nan
+                else:
+                    weights = counts.to_numpy()
+                    x = counts.index.get_level_values(0).to_numpy(dtype="float64")
+                    y = counts.index.get_level_values(1).to_numpy(dtype="float64")
+                    value = _weighted_pearson(_average_ranks(x, weights), _average_ranks(y, weights), weights)
+                result.loc[a, b] = result.loc[b, a] = value
+            self._spearman = result
+        return self._spearman if columns is None else self._spearman.loc[columns, columns]
+
+    def matrix(self, method="pearson", columns=None):
+        """Returns the correlation matrix for method ("pearson" or "spearman")."""
+        if method == "spearman":
+            return self.spearman(columns)
+        return self.pearson(columns)
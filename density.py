@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import appends
+
+
+# --- Binned Histogram and KDE Engine ---
+# A column is reduced once to a table of counts per distinct value (rows) and
+# group (columns), using bincount over integer codes. Histograms and kernel
+# density estimates are then computed from that small table rather than from
+# the raw rows, so their cost depends on the number of distinct values, not on
+# the number of respondents. The KDE matches seaborn's defaults (Gaussian
+# kernel, Scott's rule bandwidth per group, support clipped to the data range)
+# but is evaluated by linear binning onto a grid and one FFT convolution per group.
+KDE_GRIDSIZE = 512
+SUPPORT_SIZE = 200
+ALL = "All"
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """Shared bins, per-group counts and count-scaled KDE curves of one column."""
+    column: str
+    edges: np.ndarray
+    counts: pd.DataFrame
+    support: np.ndarray
+    density: pd.DataFrame
+
+    @property
+    def total(self):
+        """Returns the counts of all groups together, one value per bin."""
+        return self.counts.sum(axis=1)
+
+
+def group_levels(values):
+    """Returns the levels of a grouping column: its categories, or values in order of appearance."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return list(values.cat.categories)
+    return list(pd.unique(values.dropna()))
+
+
+def value_table(df, column, by=None):
+    """Returns counts of each distinct value of column (rows) per level of by (columns)."""
+    values = df[column]
+    mask = values.notna().to_numpy().copy()
+    if by is None:
+        levels, group_codes = [ALL], np.zeros(len(df), dtype="int64")
+    else:
+        groups = df[by]
+        levels = group_levels(groups)
+        group_codes = pd.Categorical(groups, categories=levels).codes.astype("int64")
+        mask &= group_codes >= 0
+    x, group_codes = values.to_numpy()[mask], group_codes[mask]
+    if len(x) == 0:
+        return pd.DataFrame(columns=levels, dtype="int64").rename_axis(column)
+
+    if np.issubdtype(x.dtype, np.integer) and int(x.max()) - int(x.min()) <= 1_000_000:
+        # Small integer ranges (ages, scores) index a dense count array directly
+        low = int(x.min())
+        codes = x.astype("int64") - low
+        distinct = np.arange(int(x.max()) - low + 1) + low
+    else:
+        distinct, codes = np.unique(x, return_inverse=True)
+    counts = np.bincount(codes * len(levels) + group_codes, minlength=len(distinct) * len(levels))
+    table = pd.DataFrame(counts.reshape(len(distinct), len(levels)), index=distinct,
+                         columns=pd.Index(levels, name=by))
+    table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+    return table.rename_axis(column)
+
+
+def add_tables(table, other, levels):
+    """Returns the value_table of the rows behind two value tables of one column and grouping.
+
+    levels orders the groups, as group_levels does for the rows together.
+    """
+    combined = table.add(other, fill_value=0).fillna(0).sort_index()
+    columns = pd.Index([level for level in levels if level in combined.columns], name=table.columns.name)
+    return combined.reindex(columns=columns).astype("int64").rename_axis(table.index.name)
+
+
+def count_table(counts, column, by):
+    """Returns the value_table of (column value, by level) pair counts (see file_aggregates.pair_counts)."""
+    table = counts.unstack(fill_value=0).sort_index()
+    table = table.reindex(sorted(table.columns), axis=1, fill_value=0)
+    table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0].astype("int64")
+    table.columns = pd.Index(table.columns, name=by)
+    return table.rename_axis(column)
+
+
+def bin_edges(table, bins=20):
+    """Returns np.histogram_bin_edges for the values in table."""
+    return np.histogram_bin_edges(table.index.to_numpy(dtype="float64"), bins=bins)
+
+
+def histogram(table, edges):
+    """Returns counts per bin (rows) and group (columns), as np.histogram would on the raw values."""
+    x = table.index.to_numpy(dtype="float64")
+    n_bins = len(edges) - 1
+    # np.histogram's bins are half-open except the last, which includes its right edge
+    bin_index = np.clip(np.searchsorted(edges, x, side="right") - 1, 0, n_bins - 1)
+    inside = (x >= edges[0]) & (x <= edges[-1])
+    one_hot = np.zeros((len(x), n_bins))
+    one_hot[np.flatnonzero(inside), bin_index[inside]] = 1
+    return pd.DataFrame(one_hot.T @ table.to_numpy(dtype="float64"), columns=table.columns)
+
+
+def scott_bandwidth(x, weights):
+    """Returns the Scott's rule bandwidth for values x repeated weights times (scipy's gaussian_kde)."""
+    n = weights.sum()
+    if n < 2:
+        return np.nan
+    mean = np.average(x, weights=weights)
+    std = np.sqrt((weights * (x - mean) ** 2).sum() / (n - 1))
+    return std * n ** (-1 / 5)
+
+
+def fft_kde(table, support, gridsize=KDE_GRIDSIZE, bandwidths=None):
+    """Returns the Gaussian KDE of each group of table evaluated on support.
+
+    bandwidths defaults to Scott's rule per group. Each group's weights are linearly binned onto a regular grid padded by four
+    bandwidths, convolved with the Gaussian kernel through the FFT and linearly
+    interpolated at the support points. Groups with fewer than two values or no
+    spread get NaN, as seaborn skips singular densities.
+    """
+    x = table.index.to_numpy(dtype="float64")
+    weights = table.to_numpy(dtype="float64").T
+    if bandwidths is None:
+        bandwidths = [scott_bandwidth(x, w) for w in weights]
+    bandwidths = np.asarray(bandwidths, dtype="float64")
+    result = np.full((len(support), len(bandwidths)), np.nan)
+    valid = np.isfinite(bandwidths) & (bandwidths > 0)
+    if not valid.any():
+        return pd.DataFrame(result, columns=table.columns)
+
+    pad = 4 * bandwidths[valid].max()
+    low, high = min(x.min(), support.min()) - pad, max(x.max(), support.max()) + pad
+    grid, step = np.linspace(low, high, gridsize, retstep=True)
+
+    # Linear binning: each value's weight is split between its two neighbouring grid points
+    position = (x - low) / step
+    left = np.clip(np.floor(position).astype("int64"), 0, gridsize - 2)
+    right_share = position - left
+    size = 2 * gridsize  # zero padding so the circular convolution does not wrap around
+    binned = np.zeros((len(bandwidths), size))
+    for g in np.flatnonzero(valid):
+        binned[g, :gridsize] = (np.bincount(left, weights[g] * (1 - right_share), minlength=gridsize)
+                                + np.bincount(left + 1, weights[g] * right_share, minlength=gridsize))[:gridsize]
+
+    lags = np.fft.fftfreq(size, d=1 / size) * step
+    h = np.where(valid, bandwidths, 1.0)[:, None]
+    kernels = np.exp(-0.5 * (lags[None, :] / h) ** 2) / (h * np.sqrt(2 * np.pi))
+    smoothed = np.fft.irfft(np.fft.rfft(binned, axis=1) * np.fft.rfft(kernels, axis=1), n=size, axis=1)
+    densities = smoothed[:, :gridsize] / weights.sum(axis=1, keepdims=True).clip(min=1)
+
+    for g in np.flatnonzero(valid):
+        result[:, g] = np.interp(support, grid, np.maximum(densities[g], 0))
+    return pd.DataFrame(result, columns=table.columns)
+
+
+def distribution(table, bins=20, kde=False, support_size=SUPPORT_SIZE):
+    """Builds a Distribution from a value table; KDE curves are scaled to the bin counts."""
+    edges = bin_edges(table, bins)
+    counts = histogram(table, edges)
+    x = table.index.to_numpy(dtype="float64")
+    support = np.linspace(x.min(), x.max(), support_size) if kde and len(x) else np.empty(0)
+    density = fft_kde(table, support) if kde else pd.DataFrame(columns=table.columns, dtype="float64")
+    if kde:
+        # seaborn scales each curve by the area of its histogram (count x bin width)
+        density = density * (counts.to_numpy().T @ np.diff(edges))
+    return Distribution(column=table.index.name, edges=edges, counts=counts, support=support, density=density)
+
+
+# One value table per (dataset version, column, grouping), shared by every chart binning that column
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _cached_table(_df, version, column, by):
+    def extend(table, rows):
+        # Appended rows add their counts to the previous version's table (see appends.extended)
+        if by is None:
+            levels = [ALL]
+        elif isinstance(rows[by].dtype, pd.CategoricalDtype):
+            levels = group_levels(rows[by])
+        else:
+            levels = list(table.columns) + [level for level in group_levels(rows[by]) if level not in table.columns]
+        return add_tables(table, value_table(rows, column, by), levels)
+
+    return appends.extended(_df, ("value_table", column, by), lambda df: value_table(df, column, by), extend)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _cached_distribution(_df, version, column, by, bins, kde):
+    return distribution(_cached_table(_df, version, column, by), bins=bins, kde=kde)
+
+
+def get_distribution(df, column, by=None, bins=20, kde=False):
+    """Returns the cached Distribution of df[column] (optionally per level of by)."""
+    return _cached_distribution(df, df.attrs.get("version", ""), column, by, bins, kde)
@@ -0,0 +1,178 @@
+import importlib
+import io
+import os
+import sys
+import threading
+import weakref
+
+import streamlit as st
+
+from profiling import register_gauge, span
+
+
+# --- Render-once Figure Cache ---
+# A chart is drawn and rasterized once per (chart id, dataset version, parameters);
+# reruns and page switches serve the stored PNG bytes instead of re-plotting.
+# Same output settings as st.pyplot so cached images look identical.
+SAVEFIG_OPTIONS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+# SLEEP_CHART_BACKEND=vega sends each chart as a Vega-Lite spec drawn in the browser
+# (see vega_charts.py) instead of a server-rendered PNG; "matplotlib" is the default.
+CHART_BACKENDS = ("matplotlib", "vega")
+
+
+def chart_backend():
+    """Returns the configured chart backend, "matplotlib" or "vega"."""
+    backend = os.environ.get("SLEEP_CHART_BACKEND", "matplotlib").strip().lower()
+    return backend if backend in CHART_BACKENDS else "matplotlib"
+
+
+# --- Deferred Plotting Imports ---
+# matplotlib, seaborn and charts.py are imported on the first render, not when a
+# page loads, so a rerun served from the figure cache never pays for them. Pages
+# name their chart (e.g. "age_distribution") instead of importing charts.py, and
+# the dashboard theme is applied once per process rather than on every rerun.
+_theme_lock = threading.Lock()
+_theme_applied = False
+
+
+def apply_plot_theme():
+    """Imports matplotlib and seaborn and applies the dashboard's light theme, once per process."""
+    global _theme_applied
+    with _theme_lock:
+        if _theme_applied:
+            return
+        with span("import_plotting"):
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
+            # Force light theme (no gridlines)
+            plt.style.use('default')
+            sns.set_theme(style="white")  # white background, no gridlines
+        _theme_applied = True
+
+
+def chart_function(draw, backend="matplotlib"):
+    """Returns the draw function (charts.py) or spec builder (vega_charts.py) for a chart name."""
+    name = draw if isinstance(draw, str) else draw.__name__
+    return getattr(importlib.import_module("vega_charts" if backend == "vega" else "charts"), name)
+
+
+# --- Figure Lifecycle ---
+# Charts are drawn on plain matplotlib Figure objects that pyplot's global figure
+# manager never sees, so nothing keeps them alive after rendering. The weak set
+# only observes them for the live-figure gauge.
+_live_figures = weakref.WeakSet()
+
+
+def new_figure(figsize=None):
+    """Creates a figure with one Axes outside pyplot's global state and returns (fig, ax)."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    _live_figures.add(fig)
+    return fig, fig.subplots()
+
+
+def release_figure(fig):
+    """Frees a figure's artists; also closes it if pyplot happens to manage it."""
+    plt = sys.modules.get("matplotlib.pyplot")
+    if plt is not None:
+        plt.close(fig)
+    fig.clear()
+
+
+def render_png(draw, *data, **params):
+    """Draws a figure with draw(*data, **params) and returns it as PNG bytes; draw may be a chart name."""
+    apply_plot_theme()
+    draw = chart_function(draw)
+    with span("draw"):
+        fig = draw(*data, **params)
+    try:
+        with span("rasterize"):
+            buffer = io.BytesIO()
+            fig.savefig(buffer, **SAVEFIG_OPTIONS)
+            return buffer.getvalue()
+    finally:
+        release_figure(fig)
+
+
+def render_spec(draw, *data, **params):
+    """Builds the Vega-Lite spec of the chart that draw would plot with matplotlib."""
+    with span("spec"):
+        return chart_function(draw, "vega")(*data, **params)
+
+
+def render_chart(draw, *data, **params):
+    """Returns the chart in the configured backend's payload: PNG bytes or a Vega-Lite spec."""
+    if chart_backend() == "vega":
+        return render_spec(draw, *data, **params)
+    return render_png(draw, *data, **params)
+
+
+# Only the chart id, version and parameters form the key; the draw function and
+# its data arguments are determined by them and are not hashed.
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_png(chart_id, version, params, _draw, _data):
+    return render_png(_draw, *_data, **dict(params))
+
+
+def figure_png(chart_id, version, draw, *data, **params):
+    """Returns cached PNG bytes for a chart, drawing it only on the first request.
+
+    data holds the inputs derived from the dataset version (DataFrame, summary
+    tables); params are chart options and are part of the cache key.
+    """
+    return _cached_png(chart_id, version, tuple(sorted(params.items())), draw, data)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _cached_spec(chart_id, version, params, _draw, _data):
+    return render_spec(_draw, *_data, **dict(params))
+
+
+def figure_spec(chart_id, version, draw, *data, **params):
+    """Returns the cached Vega-Lite spec for a chart, keyed like figure_png."""
+    return _cached_spec(chart_id, version, tuple(sorted(params.items())), draw, data)
+
+
+def show_figure(chart_id, version, draw, *data, **params):
+    """Displays a cached chart in place of st.pyplot(fig), as an image or a browser-drawn spec."""
+    if chart_backend() == "vega":
+        st.vega_lite_chart(figure_spec(chart_id, version, draw, *data, **params), width="stretch")
+        return
+    st.image(figure_png(chart_id, version, draw, *data, **params), width="stretch")
+
+
+# --- Memory Gauges ---
+
+def live_figure_count():
+    """Returns the number of figures still alive: pyplot-managed plus new_figure ones."""
+    plt = sys.modules.get("matplotlib.pyplot")
+    return (len(plt.get_fignums()) if plt is not None else 0) + len(_live_figures)
+
+
+def process_rss_bytes():
+    """Returns the current resident set size of this process, or None if unavailable."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def figure_gauges():
+    """Returns the live figure count and process RSS for load-test monitoring."""
+    return {
+        "live_figures": live_figure_count(),
+        "process_rss_bytes": process_rss_bytes(),
+    }
+
+
+register_gauge("sleep_live_figures", "Matplotlib figures still alive.", live_figure_count)
+register_gauge("sleep_process_rss_bytes", "Resident set size of the dashboard process.", process_rss_bytes)
@@ -0,0 +1,93 @@
+import os
+
+import streamlit as st
+
+import comparison
+import density
+import sleep_data
+import sql_backend
+import streaming
+
+
+# --- Chart Inputs from File Aggregates ---
+# With SLEEP_INGEST=stream or duckdb the chart pages never load the dataset's
+# rows. Every chart input is read from the file's summary (category counts,
+# correlations, sketches) or derived from row counts per (value, group) pair:
+# the density value tables of the Demographic page and the segment comparisons
+# and their intervals on the Comparison page. The pairs the pages show by
+# default come with the summary (aggregates.PAIR_COUNTS); any other pair, e.g.
+# one picked under Compare Segments, costs one more chunked pass over the file
+# (stream) or one GROUP BY (duckdb, see sql_backend.py) and is cached per file
+# version. The sidebar filters need the rows, so these pages always show the
+# whole file.
+class FileAggregates:
+    """Chart inputs of one local file, computed without loading its rows."""
+
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        self.version = sleep_data.data_version(path) if os.path.exists(path) else ""
+
+    @property
+    def empty(self):
+        return not self.version
+
+    def summary(self):
+        """Returns the file's DatasetSummary."""
+        if self.mode == "duckdb":
+            return sql_backend.sql_summary(self.path)
+        return streaming.stream_summary(self.path)
+
+    def pair_counts(self, column, by):
+        """Returns the row counts of each (column value, by value) pair as a Series."""
+        counts = self.summary().pair_counts.get((column, by))
+        if counts is None:
+            counts = _cached_pairs(self.path, self.version, self.mode, column, by)
+        return counts
+
+    def distribution(self, column, by, bins=20, kde=False):
+        """Returns the cached density.Distribution of column per level of by."""
+        return _cached_distribution(self, self.path, self.version, column, by, bins, kde)
+
+    def comparison(self, dimension, metric):
+        """Returns the cached comparison.SegmentComparison of metric across dimension."""
+        return _cached_comparison(self, self.path, self.version, dimension, metric)
+
+    def mean_intervals(self, dimension, metric, method="t"):
+        """Returns mean, low and high of metric per segment, like comparison.get_mean_intervals."""
+        if method == "bootstrap":
+            return _cached_bootstrap(self, self.path, self.version, dimension, metric)
+        return self.comparison(dimension, metric).mean_intervals(method)
+
+
+# Pairs outside PAIR_COUNTS are counted once per file version and shared by every session
+@st.cache_resource(show_spinner="Aggregating the data file...", max_entries=32)
+def _cached_pairs(path, version, mode, column, by):
+    if mode == "duckdb":
+        return sql_backend.file_pair_counts(path, column, by)
+    return streaming.stream_pair_counts(path, column, by)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _cached_distribution(_files, path, version, column, by, bins, kde):
+    table = density.count_table(_files.pair_counts(column, by), column, by)
+    return density.distribution(table, bins=bins, kde=kde)
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _cached_comparison(_files, path, version, dimension, metric):
+    return comparison.compare_counts(_files.pair_counts(comparison.dimension_column(dimension), metric),
+                                     dimension, metric)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _cached_bootstrap(_files, path, version, dimension, metric):
+    return _files.comparison(dimension, metric).bootstrap_intervals()
+
+
+def source():
+    """Returns the FileAggregates of the configured file in streaming and DuckDB modes, or None when pages load rows."""
+    mode = sleep_data.ingest_mode()
+    if mode not in ("stream", "duckdb"):
+        return None
+    return FileAggregates(sleep_data.data_path(), mode)
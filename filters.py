@@ -0,0 +1,186 @@
+import copy
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import appends
+from density import group_levels
+from sleep_data import load_data
+
+
+# --- Cross-filter Index ---
+# The sidebar filters (Gender, Occupation, BMI Category, Sleep Disorder and an
+# Age range) are answered from an index built once per dataset version: one
+# packed row bitmap per category label, and the row order sorted by Age so a
+# range is two binary searches. A selection is the bitwise AND of one OR of
+# label bitmaps per filtered column and the Age range bitmap, so a widget
+# change costs O(rows / 8) byte operations rather than a string comparison per
+# row and filter. The selected rows become a DataFrame with its own dataset
+# version, so the summary, distributions and figures of each filter
+# combination are cached like those of the full dataset, and the most recent
+# SUBSET_CACHE_SIZE combinations are kept. A page's column projection (see
+# sleep_data.load_data) is filtered with the index of the filter columns, since
+# the rows of every projection of a file line up.
+FILTER_COLUMNS = ["Gender", "Occupation", "BMI Category", "Sleep Disorder"]
+AGE_COLUMN = "Age"
+INDEX_COLUMNS = FILTER_COLUMNS + [AGE_COLUMN]
+SUBSET_CACHE_SIZE = 16
+
+# Session state key holding the current selection (set by the sidebar in Main.py)
+SELECTION_KEY = "row_filter"
+
+
+class FilterIndex:
+    """Packed per-label row bitmaps and the Age sort order of one DataFrame."""
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.levels = {}
+        self.bitmaps = {}
+        for column in FILTER_COLUMNS:
+            if column not in df:
+                continue
+            levels = group_levels(df[column])
+            codes = df[column].astype("category").cat.set_categories(levels).cat.codes.to_numpy()
+            # Sorting the codes once gives every label's rows as one contiguous slice
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(levels) + 1))
+            self.levels[column] = levels
+            self.bitmaps[column] = {
+                label: self._pack(order[bounds[i]:bounds[i + 1]]) for i, label in enumerate(levels)
+            }
+        if AGE_COLUMN in df:
+            ages = df[AGE_COLUMN].to_numpy(dtype="float64", na_value=np.nan)
+            self.age_order = np.argsort(ages, kind="stable")  # NaN sorts last, outside every range
+            self.sorted_ages = ages[self.age_order]
+        else:
+            self.age_order = self.sorted_ages = np.empty(0)
+
+    def _pack(self, positions):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[positions] = True
+        return np.packbits(mask)
+
+    def extend(self, rows):
+        """Returns the index of the indexed rows followed by rows (an appended batch, see appends.py).
+
+        Bitmaps gain the bits of the new rows and the new ages are merged into
+        the sorted ages, so the cost is O(rows indexed / 8 + new rows); returns
+        None when a filter column's labels were reordered rather than extended.
+        """
+        result = copy.copy(self)
+        result.n_rows = self.n_rows + len(rows)
+        result.levels, result.bitmaps = {}, {}
+        for column, levels in self.levels.items():
+            new_levels = group_levels(rows[column])
+            if not isinstance(rows[column].dtype, pd.CategoricalDtype):
+                new_levels = levels + [label for label in new_levels if label not in levels]
+            if new_levels[:len(levels)] != levels:
+                return None
+            codes = pd.Categorical(rows[column], categories=new_levels).codes
+            empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            result.levels[column] = new_levels
+            result.bitmaps[column] = {
+                label: self._append_bits(self.bitmaps[column].get(label, empty), codes == i)
+                for i, label in enumerate(new_levels)
+            }
+        if len(self.age_order):
+            ages = rows[AGE_COLUMN].to_numpy(dtype="float64", na_value=np.nan)
+            order = np.argsort(ages, kind="stable")
+            # Equal ages keep row order: the new rows come after the indexed ones
+            position = np.searchsorted(self.sorted_ages, ages[order], side="right")
+            result.sorted_ages = np.insert(self.sorted_ages, position, ages[order])
+            result.age_order = np.insert(self.age_order, position, order + self.n_rows)
+        return result
+
+    def _append_bits(self, bits, mask):
+        # The last byte of bits may be partly used, so it is unpacked and packed again with the new bits
+        used = self.n_rows % 8
+        head = bits[:self.n_rows // 8]
+        tail = np.unpackbits(bits[self.n_rows // 8:], count=used).astype(bool)
+        return np.concatenate([head, np.packbits(np.concatenate([tail, mask]))])
+
+    @property
+    def age_range(self):
+        """Returns the (min, max) Age of the indexed rows, or None without ages."""
+        ages = self.sorted_ages[~np.isnan(self.sorted_ages)]
+        return (int(ages[0]), int(ages[-1])) if len(ages) else None
+
+    def category_bits(self, column, labels):
+        """Returns the packed bitmap of rows whose column holds any of labels."""
+        bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for label in labels:
+            if label in self.bitmaps[column]:
+                bits |= self.bitmaps[column][label]
+        return bits
+
+    def age_bits(self, low, high):
+        """Returns the packed bitmap of rows with low <= Age <= high."""
+        start = np.searchsorted(self.sorted_ages, low, side="left")
+        stop = np.searchsorted(self.sorted_ages, high, side="right")
+        return self._pack(self.age_order[start:stop])
+
+    def select(self, selection):
+        """Returns the sorted row positions matching a selection from make_selection."""
+        bits = np.full((self.n_rows + 7) // 8, 0xFF, dtype=np.uint8)
+        for column, value in selection:
+            bits &= self.age_bits(*value) if column == AGE_COLUMN else self.category_bits(column, value)
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+    def make_selection(self, categories, age_range=None):
+        """Returns a hashable selection, leaving out filters that keep every row.
+
+        categories maps a filter column to the labels to keep; age_range is (low, high).
+        """
+        selection = []
+        for column, levels in self.levels.items():
+            labels = categories.get(column)
+            if labels is not None and set(labels) != set(levels):
+                selection.append((column, tuple(label for label in levels if label in labels)))
+        full_range = self.age_range
+        if age_range is not None and full_range is not None:
+            low, high = age_range
+            if low > full_range[0] or high < full_range[1]:
+                selection.append((AGE_COLUMN, (low, high)))
+        return tuple(selection)
+
+
+def selection_version(version, selection):
+    """Returns the dataset version of the rows a selection keeps."""
+    digest = hashlib.sha1(repr(selection).encode()).hexdigest()[:12]
+    return f"{version}-filter{digest}"
+
+
+# The index and the selected subsets are shared by every session of a dataset version
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_index(_df, version):
+    # An appended version extends the index of the previous one (see appends.extended)
+    return appends.extended(_df, "filter_index", FilterIndex, FilterIndex.extend)
+
+
+@st.cache_resource(show_spinner=False, max_entries=SUBSET_CACHE_SIZE)
+def _cached_subset(_df, version, selection, columns=None):
+    subset = _df.take(get_index(_df).select(selection))
+    subset.attrs = {**_df.attrs, "version": selection_version(version, selection), "filter": selection}
+    return subset
+
+
+def get_index(df):
+    """Returns the cached FilterIndex of a DataFrame loaded by sleep_data.load_data."""
+    if df.attrs.get("columns") and not all(col in df for col in INDEX_COLUMNS):
+        df = load_data(df.attrs["source"], columns=INDEX_COLUMNS)
+    return _cached_index(df, df.attrs.get("version", ""))
+
+
+def filter_frame(df, selection):
+    """Returns the rows of df matching selection (df itself when nothing is filtered)."""
+    if not selection:
+        return df
+    return _cached_subset(df, df.attrs.get("version", ""), selection, df.attrs.get("columns"))
+
+
+def filtered_data(df):
+    """Returns the rows of df matching the current session's sidebar filters."""
+    return filter_frame(df, st.session_state.get(SELECTION_KEY, ()))
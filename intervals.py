@@ -0,0 +1,151 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+import density
+
+
+# --- Group Means and Confidence Intervals ---
+# Bar charts show group means with error bars computed from per-group count,
+# sum and sum of squares (the same moments StreamingAggregates.group_stats
+# keeps), so no rows are resampled on a rerun. Methods:
+#   "t"         Student t-interval (default)
+#   "normal"    normal approximation
+#   "bootstrap" percentile bootstrap like seaborn's default, computed once per
+#               dataset version by resampling counts of the distinct values
+#   "none"      means only
+CI_METHODS = {
+    "t": "95% t-interval",
+    "normal": "95% normal interval",
+    "bootstrap": "95% bootstrap (cached)",
+    "none": "No error bars",
+}
+CONFIDENCE = 0.95
+N_BOOT = 1000
+BOOT_SEED = 0
+
+
+def group_moments(df, by, column):
+    """Returns count, sum and sum of squares of column per level of by."""
+    levels = density.group_levels(df[by])
+    codes = pd.Categorical(df[by], categories=levels).codes.astype("int64")
+    values = df[column].to_numpy(dtype="float64", na_value=np.nan)
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    moments = pd.DataFrame({
+        "count": np.bincount(codes, minlength=len(levels)),
+        "sum": np.bincount(codes, weights=values, minlength=len(levels)),
+        "sumsq": np.bincount(codes, weights=values ** 2, minlength=len(levels)),
+    }, index=pd.Index(levels, name=by))
+    return moments[moments["count"] > 0]
+
+
+# --- Student t quantiles (no SciPy dependency) ---
+
+def _betacf(a, b, x):
+    # Continued fraction for the incomplete beta function (modified Lentz's method)
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1) < 1e-15:
+            break
+    return result
+
+
+def _betainc(a, b, x):
+    # Regularized incomplete beta function I_x(a, b)
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _betacf(a, b, x) / a
+    return 1 - math.exp(log_front) * _betacf(b, a, 1 - x) / b
+
+
+def t_cdf(t, dof):
+    """Returns P(T <= t) for Student's t distribution with dof degrees of freedom."""
+    tail = 0.5 * _betainc(dof / 2, 0.5, dof / (dof + t * t))
+    return 1 - tail if t > 0 else tail
+
+
+def t_quantile(p, dof):
+    """Returns the p quantile of Student's t distribution (bisection on t_cdf)."""
+    if dof > 1e7:
+        return NormalDist().inv_cdf(p)
+    low, high = -1.0, 1.0
+    while t_cdf(low, dof) > p:
+        low *= 2
+    while t_cdf(high, dof) < p:
+        high *= 2
+    for _ in range(100):
+        middle = (low + high) / 2
+        if t_cdf(middle, dof) < p:
+            low = middle
+        else:
+            high = middle
+        if high - low < 1e-12 * max(1.0, abs(middle)):
+            break
+    return (low + high) / 2
+
+
+# --- Intervals ---
+
+def mean_intervals(moments, method="t", confidence=CONFIDENCE):
+    """Returns mean, low and high per group from count/sum/sumsq moments.
+
+    Groups with a single value get no interval (NaN), as seaborn draws none.
+    """
+    count = moments["count"].astype("float64")
+    mean = moments["sum"] / count
+    result = pd.DataFrame({"mean": mean, "low": np.nan, "high": np.nan})
+    if method == "none":
+        return result
+
+    variance = ((moments["sumsq"] - moments["sum"] ** 2 / count) / (count - 1)).clip(lower=0)
+    stderr = np.sqrt(variance / count).where(count > 1)
+    p = (1 + confidence) / 2
+    if method == "t":
+        critical = pd.Series([t_quantile(p, n - 1) if n > 1 else np.nan for n in count], index=count.index)
+    elif method == "normal":
+        critical = NormalDist().inv_cdf(p)
+    else:
+        raise ValueError(f"Unknown analytic CI method: {method!r}")
+    result["low"] = mean - critical * stderr
+    result["high"] = mean + critical * stderr
+    return result
+
+
+def bootstrap_intervals(table, confidence=CONFIDENCE, n_boot=N_BOOT, seed=BOOT_SEED):
+    """Returns percentile-bootstrap intervals of the mean per group of a density.value_table.
+
+    Resampling n rows with replacement is the same as drawing multinomial
+    counts over the distinct values, so each resample costs O(distinct values).
+    """
+    rng = np.random.default_rng(seed)
+    values = table.index.to_numpy(dtype="float64")
+    rows = {}
+    for group in table.columns:
+        counts = table[group].to_numpy(dtype="float64")
+        n = int(counts.sum())
+        mean = counts @ values / n
+        if n < 2:
+            rows[group] = (mean, np.nan, np.nan)
+            continue
+        means = rng.multinomial(n, counts / n, size=n_boot) @ values / n
+        low, high = np.percentile(means, [50 * (1 - confidence), 50 * (1 + confidence)])
+        rows[group] = (mean, low, high)
+    result = pd.DataFrame.from_dict(rows, orient="index", columns=["mean", "low", "high"])
+    return result.rename_axis(table.columns.name)
@@ -1,205 +1,69 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
+import density
+import file_aggregates
+from aggregates import get_summary
+from components import apply_theme, filter_caption, page_header
+from figure_cache import show_figure
+from filters import filtered_data
+from profiling import span
+from sleep_data import load_data
 
-# Force light theme (no gridlines)
-plt.style.use('default')
-sns.set_theme(style="white")  # white background, no gridlines
 
 st.set_page_config(
     page_title="Objective 2"
 )
 
-# Using HTML for styling with a smooth color box
-st.markdown(
-    """
-    <style>
-    .title {
-        /* Smooth, single background color (Lavender) */
-        background: #E6E6FA; 
-        color: #000000; /* Black text color for contrast */
-        padding: 10px;
-        border-radius: 5px;
-        /* Thick Black Border: 10px wide, solid style, black color */
-        border: 10px solid #000000;
-        text-align: center;
-        box-shadow: 0 4px 10px rgba(0, 0, 0, 0.5); /* Shadow for depth */
-    }
-    h1 {
-        margin: 0;
-    }
-    </style>
-    <div class="title">
-        <h1>Objective 1</h1>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-
-st.markdown(
-    """
-    <div style="
-        background-color:#BDB5D5;
-        color: #000000; /* Black text color for contrast */;
-        padding:15px 20px;
-        border-radius:10px;
-        border:1px solid #d1d5db;
-    ">
-   <b>The Visualization is counting population of Gender, Age and Occupation</b>
-    """,
-    unsafe_allow_html=True
-)
-
-# --- Configuration for Dark Mode / Purple Theme ---
-# Note: Streamlit theming is best done via .streamlit/config.toml, 
-# but we can set up the page layout here and use markdown for color accents.
-# Custom CSS for the Purple/Black theme
-# This targets the main title and applies a purple accent.
-st.markdown("""
-<style>
-    /* Main Header Styling */
-    .stApp {
-        background-color: #1a1a1a; /* Dark background */
-        color: #e0e0e0; /* Light text for contrast */
-    }
-    h1 {
-        color: #8A2BE2; /* Primary Purple for main title */
-        font-weight: 700;
-        text-shadow: 2px 2px 4px #000000;
-    }
-    h2 {
-        color: #BA55D3; /* Medium Purple for headers */
-        border-bottom: 2px solid #8A2BE2;
-        padding-bottom: 5px;
-    }
-    /* Ensure text in main sections is light */
-    .st-emotion-cache-nahz7x, 
-    .st-emotion-cache-163l4a8, 
-    .st-emotion-cache-12fm5so {
-        color: #e0e0e0 !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Shared theme and page banner (see components.py)
+apply_theme()
+page_header("Objective 1", 'The Visualization is counting population of Gender, Age and Occupation')
 
 
 # --- Data Loading and Caching ---
-DATA_URL = "https://raw.githubusercontent.com/KhadijahRijal/SleepHealthandLifestyle/refs/heads/main/cleaned_sleep_health_data.csv"
-
-@st.cache_data
-def load_data(url):
-    """Loads and returns the DataFrame from the specified URL."""
-    try:
-        data = pd.read_csv(url)
-        # Drop any unnamed columns that might result from CSV indexing
-        data = data.loc[:, ~data.columns.str.contains('^Unnamed')]
-        return data
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return pd.DataFrame()
-
-df = load_data(DATA_URL)
-
-# --- Dashboard Layout ---
-
-st.title("💜 Sleep Health and Lifestyle Dataset")
-
-if df.empty:
-    st.warning("Could not load the dataset. Please check the URL and internet connection.")
+# The dataset is read once per process and shared by every page (see sleep_data.py);
+# this page only reads the columns its charts use. In streaming and DuckDB modes no rows
+# are loaded and the charts are drawn from aggregates of the file (see file_aggregates.py).
+COLUMNS = ["Gender", "Age", "Occupation"]
+files = file_aggregates.source()
+if files is None:
+    with span("objective1.load"):
+        df = load_data(columns=COLUMNS)
+    empty = df.empty
 else:
-    
-    # --- DYNAMIC METRICS SECTION ---
-    total_respondents = len(df)
-    avg_age = df["Age"].mean()
-    male_percent = (df["Gender"].value_counts(normalize=True).get("Male", 0) * 100)
-    female_percent = (df["Gender"].value_counts(normalize=True).get("Female", 0) * 100)
-    most_common_occupation = df["Occupation"].mode()[0]
-    unique_occupations = df["Occupation"].nunique()
-
-    col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric(label="Total Respondents", value=total_respondents)
-    col2.metric(label="Average Age", value=f"{avg_age:.1f}")
-    col3.metric(label="Gender (Male)", value=f"{male_percent:.1f}%")
-    col4.metric(label="Gender (Female)", value=f"{female_percent:.1f}%")
-    col5.metric(label="Top Job", value=f"{most_common_occupation}")
-
-    
-    # --- Pandas Styler Definition for Purple/Black Theme ---
-    # Define styles for table (header and alternating rows)
-    table_styles = [
-        # Header style (Dark Purple Accent)
-        {'selector': 'thead th',
-         'props': [('background-color', '#3c1b50'), ('color', '#e0e0e0'), ('font-weight', 'bold')]},
-        # Even rows (Dark Gray/Black)
-        {'selector': 'tbody tr:nth-child(even)',
-         'props': [('background-color', '#2c2c2c'), ('color', '#e0e0e0')]},
-        # Odd rows (Slightly Lighter Dark Gray)
-        {'selector': 'tbody tr:nth-child(odd)',
-         'props': [('background-color', '#3a3a3a'), ('color', '#e0e0e0')]},
-    ]
-
-    
-    # 1. Full Dataset Display
-    st.header("Dataset")
-    st.write(f"The dataset contains **{len(df)}** rows and **{len(df.columns)}** columns.")
-    
-    # Apply styling to the full DataFrame
-    styled_df = df.style.set_table_styles(table_styles)
-    st.dataframe(styled_df, use_container_width=True)
-
-    # 2. Summary Statistics Display
-    st.header("Summary Statistics")
-    st.write("Descriptive statistics for all numerical columns in the dataset.")
-
-    # Calculate the summary DataFrame
-    summary_df = df.describe(include=np.number).transpose()
-    
-    # Format the summary and apply the table styles
-    styled_summary_df = summary_df.style.format("{:,.2f}").set_table_styles(table_styles)
-
-    # Display the summary DataFrame
-    st.dataframe(styled_summary_df, use_container_width=True)
-
-    # 3. Data Dictionary / Info (Using a basic info section)
-    st.header("Data Column Information")
-    st.write("Below is a quick look at the column names and their data types.")
-    
-    info_data = []
-    for col, dtype in df.dtypes.items():
-        info_data.append({
-            'Column Name': col,
-            'Data Type': str(dtype),
-            'Non-Null Count': df[col].count()
-        })
-    
-    info_df = pd.DataFrame(info_data)
-    
-    # Apply styling to the info DataFrame
-    styled_info_df = info_df.style.set_table_styles(table_styles)
-    st.dataframe(styled_info_df, use_container_width=True)
-
-# Footer for running the app
-st.markdown("""
----
-*To run this application, save the code as `sleep_data_dashboard.py` and execute:*
-`streamlit run sleep_data_dashboard.py`
-""", unsafe_allow_html=True)
-
+    empty = files.empty
+
+# The KPI metrics and dataset tables are on the Overview page (overview.py),
+# so this page only computes and ships its own charts.
+if empty:
+    st.warning("Could not load the dataset. Please check the data path (SLEEP_DATA_PATH).")
+    st.stop()
+
+if files is None:
+    # Rows kept by the sidebar filters; each filter combination is its own dataset version (see filters.py)
+    total_rows = len(df)
+    with span("objective1.filter"):
+        df = filtered_data(df)
+    if df.empty:
+        st.info("No respondents match the sidebar filters.")
+        st.stop()
+    filter_caption(df, total_rows)
+# Dataset version keys the cached summary and figures
+version = df.attrs.get("version", "") if files is None else files.version
+
+
+# Age bins and per-Gender KDE curves, computed once per dataset version and shared by Figures 1 and 2
+with span("objective1.density"):
+    if files is None:
+        age = density.get_distribution(df, "Age", by="Gender", bins=20, kde=True)
+    else:
+        age = files.distribution("Age", by="Gender", bins=20, kde=True)
 
 # Visualize age distribution by gender
 st.subheader("Age Distribution by Gender")
 
-fig, ax = plt.subplots(figsize=(10, 6))
-sns.histplot(data=df, x='Age', hue='Gender', multiple='stack', bins=20, kde=True, ax=ax)  # Replace DataFrame with df
-
-ax.set_title('Age Distribution by Gender')
-ax.set_xlabel('Age')
-ax.set_ylabel('Count')
-
-# Display the plot in Streamlit
-st.pyplot(fig)
+# Display the cached plot in Streamlit
+with span("objective1.figure1"):
+    show_figure("demographic.age_by_gender", version, "age_distribution_by_gender", age)
 
 # Add the main introduction paragraph
 st.markdown(
@@ -231,15 +95,9 @@ st.markdown(
 # Visualize the distribution of the 'Age' column
 st.subheader("Distribution of Age")
 
-fig, ax = plt.subplots(figsize=(8, 6))
-sns.histplot(data=df, x='Age', bins=20, kde=False, ax=ax)  # replace DataFrame with df
-
-ax.set_xlabel('Age')
-ax.set_ylabel('Frequency')
-ax.set_title('Distribution of Age')
-
-# Display the plot in Streamlit
-st.pyplot(fig)
+# Display the cached plot in Streamlit
+with span("objective1.figure2"):
+    show_figure("demographic.age", version, "age_distribution", age)
 
 # Add the main introduction paragraph
 st.markdown(
@@ -268,34 +126,15 @@ st.markdown(
 
 
 # Get the value counts for the 'Occupation' column
-occupation_counts = df['Occupation'].value_counts()  # Replace DataFrame with df
+with span("objective1.summary"):
+    occupation_counts = (get_summary(df) if files is None else files.summary()).occupation_counts
 
 # Streamlit title
 st.subheader("Distribution of Occupation")
 
-# Create a pie chart
-fig, ax = plt.subplots(figsize=(10, 8))
-wedges, texts, autotexts = ax.pie(
-    occupation_counts,
-    autopct='%1.1f%%',
-    startangle=140,
-    pctdistance=1.1
-)
-
-# Add a legend to display the occupation labels
-ax.legend(
-    wedges,
-    occupation_counts.index,
-    title="Occupation",
-    loc="center left",
-    bbox_to_anchor=(1, 0, 0.5, 1)
-)
-
-ax.set_title('Distribution of Occupation')
-ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-
-# Display the plot in Streamlit
-st.pyplot(fig)
+# Display the cached plot in Streamlit
+with span("objective1.figure3"):
+    show_figure("demographic.occupation", version, "occupation_distribution", occupation_counts)
 
 # Add the main introduction paragraph
 st.markdown(
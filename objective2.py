@@ -1,44 +1,84 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 
+import binning
+import comparison
+import file_aggregates
+import intervals
+from components import apply_theme, filter_caption, page_header
+from figure_cache import show_figure
+from filters import filtered_data
+from profiling import span
+from sleep_data import load_data
 
-# Force light theme (no gridlines)
-plt.style.use('default')
-sns.set_theme(style="white")  # white background, no gridlines
 
 st.set_page_config(
     page_title="Objective 2"
 )
 
-# Using HTML for styling with a smooth color box
+# Shared theme and page banner (see components.py)
+apply_theme()
+page_header("Objective 2", 'The graph illustrates comparison between Gender, Age, Occupation with theirs Quality of Sleep.')
+
+
+# --- Data Loading and Caching ---
+# The dataset is read once per process and shared by every page (see sleep_data.py);
+# this page only reads the columns its charts use. In streaming and DuckDB modes no rows
+# are loaded and the charts are drawn from aggregates of the file (see file_aggregates.py).
+COLUMNS = ["Gender", "Age", "Occupation", "Quality of Sleep"]
+files = file_aggregates.source()
+if files is None:
+    with span("objective2.load"):
+        df = load_data(columns=COLUMNS)
+    empty = df.empty
+else:
+    empty = files.empty
+
+# The KPI metrics and dataset tables are on the Overview page (overview.py),
+# so this page only computes and ships its own charts.
+if empty:
+    st.warning("Could not load the dataset. Please check the data path (SLEEP_DATA_PATH).")
+    st.stop()
+
+if files is None:
+    # Rows kept by the sidebar filters; each filter combination is its own dataset version (see filters.py)
+    total_rows = len(df)
+    with span("objective2.filter"):
+        df = filtered_data(df)
+    if df.empty:
+        st.info("No respondents match the sidebar filters.")
+        st.stop()
+    filter_caption(df, total_rows)
+# Dataset version keys the cached summary and figures
+version = df.attrs.get("version", "") if files is None else files.version
+
+
+# Streamlit section title
+st.subheader("Average Quality of Sleep by Gender")
+
+# Every comparison on this page is read from cached integer group codes (see comparison.py);
+# group means and error bars come from per-Gender count/sum/sum of squares (see intervals.py)
+ci_method = st.selectbox("Error bars", list(intervals.CI_METHODS), format_func=intervals.CI_METHODS.get,
+                         key="quality_by_gender_ci")
+with span("objective2.intervals"):
+    if files is None:
+        quality_by_gender = comparison.get_mean_intervals(df, "Gender", "Quality of Sleep", ci_method)
+    else:
+        quality_by_gender = files.mean_intervals("Gender", "Quality of Sleep", ci_method)
+
+# Display the cached plot in Streamlit
+with span("objective2.figure1"):
+    show_figure("comparison.quality_by_gender", version, "quality_by_gender", quality_by_gender,
+                method=ci_method)
+
+# Add the main introduction paragraph
 st.markdown(
     """
-    <style>
-    .title {
-        /* Smooth, single background color (Lavender) */
-        background: #E6E6FA; 
-        color: #000000; /* Black text color for contrast */
-        padding: 10px;
-        border-radius: 5px;
-        /* Thick Black Border: 10px wide, solid style, black color */
-        border: 10px solid #000000;
-        text-align: center;
-        box-shadow: 0 4px 10px rgba(0, 0, 0, 0.5); /* Shadow for depth */
-    }
-    h1 {
-        margin: 0;
-    }
-    </style>
-    <div class="title">
-        <h1>Objective 2</h1>
+    <div style='text-align: center;'>
+        Figure 1
     </div>
     """,
     unsafe_allow_html=True
 )
-
 st.markdown(
     """
     <div style="
@@ -48,163 +88,33 @@ st.markdown(
         border-radius:10px;
         border:1px solid #d1d5db;
     ">
-    <b>The graph illustrates comparison between Gender, Age, Occupation with theirs Quality of Sleep.</b>
+   The average sleep quality for male and female is compared in this bar graph.
+   The average sleep quality score is displayed on the y-axis, while gender is represented on the x-axis.
     </div>
     """,
     unsafe_allow_html=True
 )
 
-# --- Configuration for Dark Mode / Purple Theme ---
-# Note: Streamlit theming is best done via .streamlit/config.toml, 
-# but we can set up the page layout here and use markdown for color accents.
-# Custom CSS for the Purple/Black theme
-# This targets the main title and applies a purple accent.
-st.markdown("""
-<style>
-    /* Main Header Styling */
-    .stApp {
-        background-color: #1a1a1a; /* Dark background */
-        color: #e0e0e0; /* Light text for contrast */
-    }
-    h1 {
-        color: #8A2BE2; /* Primary Purple for main title */
-        font-weight: 700;
-        text-shadow: 2px 2px 4px #000000;
-    }
-    h2 {
-        color: #BA55D3; /* Medium Purple for headers */
-        border-bottom: 2px solid #8A2BE2;
-        padding-bottom: 5px;
-    }
-    /* Ensure text in main sections is light */
-    .st-emotion-cache-nahz7x, 
-    .st-emotion-cache-163l4a8, 
-    .st-emotion-cache-12fm5so {
-        color: #e0e0e0 !important;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-
-# --- Data Loading and Caching ---
-DATA_URL = "https://raw.githubusercontent.com/KhadijahRijal/SleepHealthandLifestyle/refs/heads/main/cleaned_sleep_health_data.csv"
-
-@st.cache_data
-def load_data(url):
-    """Loads and returns the DataFrame from the specified URL."""
-    try:
-        data = pd.read_csv(url)
-        # Drop any unnamed columns that might result from CSV indexing
-        data = data.loc[:, ~data.columns.str.contains('^Unnamed')]
-        return data
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return pd.DataFrame()
-
-df = load_data(DATA_URL)
-
-# --- Dashboard Layout ---
-
-st.title("💜 Sleep Health and Lifestyle Dataset")
-
-if df.empty:
-    st.warning("Could not load the dataset. Please check the URL and internet connection.")
-else:
-    
-    # --- DYNAMIC METRICS SECTION ---
-    total_respondents = len(df)
-    avg_age = df["Age"].mean()
-    male_percent = (df["Gender"].value_counts(normalize=True).get("Male", 0) * 100)
-    female_percent = (df["Gender"].value_counts(normalize=True).get("Female", 0) * 100)
-    most_common_occupation = df["Occupation"].mode()[0]
-    unique_occupations = df["Occupation"].nunique()
-
-    col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric(label="Total Respondents", value=total_respondents)
-    col2.metric(label="Average Age", value=f"{avg_age:.1f}")
-    col3.metric(label="Gender (Male)", value=f"{male_percent:.1f}%")
-    col4.metric(label="Gender (Female)", value=f"{female_percent:.1f}%")
-    col5.metric(label="Top Job", value=f"{most_common_occupation}")
-    
-    # --- Pandas Styler Definition for Purple/Black Theme ---
-    # Define styles for table (header and alternating rows)
-    table_styles = [
-        # Header style (Dark Purple Accent)
-        {'selector': 'thead th',
-         'props': [('background-color', '#3c1b50'), ('color', '#e0e0e0'), ('font-weight', 'bold')]},
-        # Even rows (Dark Gray/Black)
-        {'selector': 'tbody tr:nth-child(even)',
-         'props': [('background-color', '#2c2c2c'), ('color', '#e0e0e0')]},
-        # Odd rows (Slightly Lighter Dark Gray)
-        {'selector': 'tbody tr:nth-child(odd)',
-         'props': [('background-color', '#3a3a3a'), ('color', '#e0e0e0')]},
-    ]
-    
-    # 1. Full Dataset Display
-    st.header("Dataset")
-    st.write(f"The dataset contains **{len(df)}** rows and **{len(df.columns)}** columns.")
-    
-    # Apply styling to the full DataFrame
-    styled_df = df.style.set_table_styles(table_styles)
-    st.dataframe(styled_df, use_container_width=True)
-
-    # 2. Summary Statistics Display
-    st.header("Summary Statistics")
-    st.write("Descriptive statistics for all numerical columns in the dataset.")
-
-    # Calculate the summary DataFrame
-    summary_df = df.describe(include=np.number).transpose()
-    
-    # Format the summary and apply the table styles
-    styled_summary_df = summary_df.style.format("{:,.2f}").set_table_styles(table_styles)
-
-    # Display the summary DataFrame
-    st.dataframe(styled_summary_df, use_container_width=True)
-
-    # 3. Data Dictionary / Info (Using a basic info section)
-    st.header("Data Column Information")
-    st.write("Below is a quick look at the column names and their data types.")
-    
-    info_data = []
-    for col, dtype in df.dtypes.items():
-        info_data.append({
-            'Column Name': col,
-            'Data Type': str(dtype),
-            'Non-Null Count': df[col].count()
-        })
-    
-    info_df = pd.DataFrame(info_data)
-    
-    # Apply styling to the info DataFrame
-    styled_info_df = info_df.style.set_table_styles(table_styles)
-    st.dataframe(styled_info_df, use_container_width=True)
-
-# Footer for running the app
-st.markdown("""
----
-*To run this application, save the code as `sleep_data_dashboard.py` and execute:*
-`streamlit run sleep_data_dashboard.py`
-""", unsafe_allow_html=True)
-
 
 # Streamlit section title
-st.subheader("Average Quality of Sleep by Gender")
+st.subheader("Distribution of Quality of Sleep by Age Group")
 
-# Create the bar plot
-fig, ax = plt.subplots(figsize=(8, 6))
-sns.barplot(x='Gender', y='Quality of Sleep', data=df, ax=ax)  # Replace DataFrame with df
-ax.set_title('Average Quality of Sleep by Gender')
-ax.set_xlabel('Gender')
-ax.set_ylabel('Quality of Sleep')
+# Cross-tabulation of Age Group (binning.AGE_GROUPS) and Quality of Sleep
+with span("objective2.age_distribution"):
+    if files is None:
+        quality_by_age = comparison.get_comparison(df, "Age_Group", "Quality of Sleep").distribution
+    else:
+        quality_by_age = files.comparison("Age_Group", "Quality of Sleep").distribution
 
-# Display the plot in Streamlit
-st.pyplot(fig)
+# Display the cached plot in Streamlit
+with span("objective2.figure2"):
+    show_figure("comparison.quality_by_age_group", version, "quality_by_age_group", quality_by_age)
 
 # Add the main introduction paragraph
 st.markdown(
     """
     <div style='text-align: center;'>
-        Figure 1
+        Figure 2
     </div>
     """,
     unsafe_allow_html=True
@@ -218,8 +128,9 @@ st.markdown(
         border-radius:10px;
         border:1px solid #d1d5db;
     ">
-   The average sleep quality for male and female is compared in this bar graph.
-   The average sleep quality score is displayed on the y-axis, while gender is represented on the x-axis.
+    The distribution of sleep quality between different ages is displayed in this bar graph.
+    People are divided into four age categories on the x-axis which is, 20–29, 30–39, 40–49, and 50–59. 
+    The number of people in each category is shown on the y-axis.
     </div>
     """,
     unsafe_allow_html=True
@@ -227,35 +138,24 @@ st.markdown(
 
 
 # Streamlit section title
-st.subheader("Distribution of Quality of Sleep by Age Group")
-
-# Create age bins
-age_bins = [20, 30, 40, 50, 60]
-age_labels = ['20-29', '30-39', '40-49', '50-59']
-df['Age_Group'] = pd.cut(df['Age'], bins=age_bins, labels=age_labels, right=False)  # Replace DataFrame with df
-
-# Create a cross-tabulation of Age Group and Quality of Sleep
-quality_by_age = pd.crosstab(df['Age_Group'], df['Quality of Sleep'])
-
-# Create a stacked bar plot
-fig, ax = plt.subplots(figsize=(10, 7))
-quality_by_age.plot(kind='bar', stacked=True, ax=ax, colormap='viridis')
+st.subheader("Average Quality of Sleep by Occupation (Line Chart)")
 
-ax.set_title('Distribution of Quality of Sleep by Age Group')
-ax.set_xlabel('Age Group')
-ax.set_ylabel('Count')
-ax.legend(title='Quality of Sleep')
-plt.xticks(rotation=45)
-plt.tight_layout()
+# Average Quality of Sleep for each Occupation, sorted by Occupation
+with span("objective2.occupation_means"):
+    if files is None:
+        occupation_quality_mean = comparison.get_comparison(df, "Occupation", "Quality of Sleep").means()
+    else:
+        occupation_quality_mean = files.comparison("Occupation", "Quality of Sleep").means()
 
-# Display the plot in Streamlit
-st.pyplot(fig)
+# Display the cached plot in Streamlit
+with span("objective2.figure3"):
+    show_figure("comparison.quality_by_occupation", version, "quality_by_occupation", occupation_quality_mean)
 
 # Add the main introduction paragraph
 st.markdown(
     """
     <div style='text-align: center;'>
-        Figure 2
+        Figure 3
     </div>
     """,
     unsafe_allow_html=True
@@ -269,9 +169,8 @@ st.markdown(
         border-radius:10px;
         border:1px solid #d1d5db;
     ">
-    The distribution of sleep quality between different ages is displayed in this bar graph.
-    People are divided into four age categories on the x-axis which is, 20–29, 30–39, 40–49, and 50–59. 
-    The number of people in each category is shown on the y-axis.
+    The average sleep quality for different occupations is displayed in this line graph.
+    The y-axis, which ranges from 4.0 to 8.0, represents average sleep quality, while the x-axis displays different occupations.
     </div>
     """,
     unsafe_allow_html=True
@@ -279,34 +178,65 @@ st.markdown(
 
 
 # Streamlit section title
-st.subheader("Average Quality of Sleep by Occupation (Line Chart)")
-
-# Calculate the average Quality of Sleep for each Occupation and sort by Occupation
-occupation_quality_mean = (
-    df.groupby('Occupation')['Quality of Sleep']
-    .mean()
-    .reset_index()
-    .sort_values(by='Occupation')
-)  # Replace DataFrame with df
-
-# Create a line chart
-fig, ax = plt.subplots(figsize=(12, 8))
-sns.lineplot(x='Occupation', y='Quality of Sleep', data=occupation_quality_mean, marker='o', ax=ax)
-
-ax.set_title('Average Quality of Sleep by Occupation (Line Chart)')
-ax.set_xlabel('Occupation')
-ax.set_ylabel('Average Quality of Sleep')
-ax.grid(True)
-plt.xticks(rotation=90)
-
-# Display the plot in Streamlit
-st.pyplot(fig)
+st.subheader("Compare Segments")
+
+# Any dimension against any numeric metric; a new pair costs one bincount over the cached codes
+col1, col2 = st.columns(2)
+dimension = col1.selectbox("Dimension", comparison.DIMENSIONS, format_func=lambda name: name.replace("_", " "),
+                           key="comparison_dimension")
+metric = col2.selectbox("Metric", comparison.METRICS, key="comparison_metric")
+preset = comparison.bin_spec(dimension)
+if preset is not None:
+    # Numeric dimensions are binned by the preset edges, a chosen width or quantiles (see binning.py)
+    col1, col2 = st.columns(2)
+    bin_kind = col1.radio("Bins", list(binning.BIN_KINDS), format_func=binning.BIN_KINDS.get,
+                          horizontal=True, key="comparison_bins")
+    if bin_kind == "width":
+        # The narrowest width still gives at most binning.MAX_BINS bins over the column's range
+        if files is None:
+            values = load_data(columns=[preset.column])[preset.column]
+            low, high = float(values.min()), float(values.max())
+        else:
+            low, high = files.summary().describe.loc[preset.column, ["min", "max"]]
+        narrowest = max(binning.min_width(low, high), 0.01)
+        bin_value = col2.number_input("Bin width", min_value=narrowest,
+                                      value=max(binning.default_width(preset.column), narrowest),
+                                      key=f"comparison_width:{preset.column}",
+                                      help=f"At least {narrowest:g}, so {preset.column} gets at most "
+                                           f"{binning.MAX_BINS} bins")
+    elif bin_kind == "quantile":
+        bin_value = col2.slider("Number of bins", *binning.QUANTILE_RANGE, value=4, key="comparison_quantiles")
+    else:
+        bin_value = None
+    if bin_kind != "preset":
+        dimension = binning.make_spec(preset.column, bin_kind, bin_value)
+dimension_name = comparison.dimension_name(dimension)
+with span("objective2.segments"):
+    if files is None:
+        # Only the two compared columns are read, with the same sidebar filters (see sleep_data.load_data)
+        segments = filtered_data(load_data(columns=comparison.columns_for(dimension, metric)))
+        segment_intervals = comparison.get_mean_intervals(segments, dimension, metric, ci_method)
+        segment_stats = comparison.get_comparison(segments, dimension, metric).stats
+    else:
+        segment_intervals = files.mean_intervals(dimension, metric, ci_method)
+        segment_stats = files.comparison(dimension, metric).stats
+
+# Display the cached plot in Streamlit (error bars as chosen for Figure 1)
+with span("objective2.figure4"):
+    show_figure(f"comparison.segments:{dimension_name}:{metric}", version, "segment_means", segment_intervals,
+                dimension=dimension_name, metric=metric, method=ci_method)
+st.dataframe(
+    segment_stats[["count", "mean", "std"]],
+    column_config={"mean": st.column_config.NumberColumn(format="%.2f"),
+                   "std": st.column_config.NumberColumn(format="%.2f")},
+    width="stretch",
+)
 
 # Add the main introduction paragraph
 st.markdown(
     """
     <div style='text-align: center;'>
-        Figure 3
+        Figure 4
     </div>
     """,
     unsafe_allow_html=True
@@ -320,8 +250,8 @@ st.markdown(
         border-radius:10px;
         border:1px solid #d1d5db;
     ">
-    The average sleep quality for different occupations is displayed in this line graph.
-    The y-axis, which ranges from 4.0 to 8.0, represents average sleep quality, while the x-axis displays different occupations.
+    This bar graph compares the average of the selected metric across the segments of the selected dimension.
+    The table lists how many people are in each segment, with the mean and standard deviation of the metric.
     </div>
     """,
     unsafe_allow_html=True
@@ -0,0 +1,52 @@
+import streamlit as st
+
+from components import apply_theme, filter_caption, page_header, render_overview
+from filters import filtered_data
+from profiling import span
+from sleep_data import ingest_mode, load_data, load_preview
+from sql_backend import sql_summary
+from streaming import stream_summary
+
+
+st.set_page_config(
+    page_title="Overview"
+)
+
+# Shared theme and page banner (see components.py)
+apply_theme()
+page_header("Overview", "Key metrics, the full dataset and its summary statistics.")
+
+# --- Data Loading and Caching ---
+# The dataset is read once per process and shared by every page (see sleep_data.py).
+# In streaming and DuckDB modes only a preview is loaded; the summary is built
+# chunk by chunk or by SQL queries over the file.
+with span("overview.load"):
+    mode = ingest_mode()
+    if mode in ("stream", "duckdb"):
+        df = load_preview()
+        summary = None
+        if not df.empty:
+            summary = stream_summary() if mode == "stream" else sql_summary()
+        total_rows = len(df)
+    else:
+        # Rows kept by the sidebar filters (see filters.py)
+        data = load_data()
+        df = filtered_data(data)
+        summary = None
+        total_rows = len(data)
+
+# Filters that leave no rows are not a loading error
+if df.empty and df.attrs.get("filter"):
+    st.info("No respondents match the sidebar filters.")
+    st.stop()
+filter_caption(df, total_rows)
+
+# --- Dashboard Layout ---
+render_overview(df, summary)
+
+# Footer for running the app
+st.markdown("""
+---
+*To run this application, execute:*
+`streamlit run Main.py`
+""", unsafe_allow_html=True)
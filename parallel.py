@@ -0,0 +1,153 @@
+import dataclasses
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+import schema
+from streaming import DEFAULT_CHUNK_ROWS, StreamingAggregates
+
+
+# --- Multi-process Aggregation Engine ---
+# The rows are split into contiguous partitions, each partition is aggregated
+# in a worker process into a StreamingAggregates (counts, sums, sums of squares,
+# co-moments, histogram and crosstab cells), and the partials are merged in
+# partition order. SLEEP_WORKERS sets the pool size (default: all cores).
+# Counts, crosstabs, quartiles, group means and integer-column means equal the
+# single-process aggregates.build_summary exactly, for any number of partitions.
+# Float moments (std, float column means, correlations) are accumulated in
+# float64 on both paths and agree to about 1e-15 relative: a float sum depends
+# on the order its terms are added in, and pandas adds pairwise over the whole
+# column while partitions are merged with Chan et al.'s update, so bit-for-bit
+# equality would need exact (arbitrary-precision) sums on both paths.
+
+# Below this many rows, starting workers and pickling partitions costs more than it saves
+MIN_PARALLEL_ROWS = 2_000_000
+
+
+def worker_count():
+    """Returns the configured number of worker processes."""
+    return max(1, int(os.environ.get("SLEEP_WORKERS", os.cpu_count() or 1)))
+
+
+def _pool(workers):
+    # "spawn" keeps workers independent of the Streamlit server's threads and locks
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _merge(partials):
+    return reduce(lambda left, right: left.merge(right), partials, StreamingAggregates())
+
+
+def row_partitions(n_rows, parts):
+    """Returns (start, stop) row ranges splitting n_rows into at most parts pieces."""
+    bounds = np.linspace(0, n_rows, num=max(1, min(parts, n_rows)) + 1, dtype="int64")
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def _aggregate_frame(frame):
+    return StreamingAggregates().update(frame)
+
+
+def aggregate_frame(df, workers=None):
+    """Aggregates an in-memory DataFrame over row partitions in a process pool."""
+    workers = workers or worker_count()
+    if workers <= 1 or len(df) < MIN_PARALLEL_ROWS:
+        return _aggregate_frame(df)
+    partitions = [df.iloc[start:stop] for start, stop in row_partitions(len(df), workers)]
+    with _pool(workers) as pool:
+        return _merge(pool.map(_aggregate_frame, partitions))
+
+
+def summarize_frame(df, version="", workers=None):
+    """Returns the DatasetSummary of df computed by the process pool.
+
+    describe() quantiles of columns with too many distinct values for exact
+    mergeable counts (e.g. Person ID) are filled in from the frame directly.
+    """
+    return fill_quartiles(aggregate_frame(df, workers).to_summary(version), df)
+
+
+def fill_quartiles(summary, df):
+    """Returns summary with the describe() quartiles missing from its aggregates read from df.
+
+    Columns with more distinct values than exact mergeable counts allow (e.g.
+    Person ID past streaming.DISTINCT_LIMIT) have no quartiles in the aggregates.
+    """
+    describe = summary.describe.copy()
+    for col in describe.index[describe["50%"].isna() & (describe["count"] > 0)]:
+        describe.loc[col, ["25%", "50%", "75%"]] = df[col].quantile([0.25, 0.5, 0.75]).to_numpy()
+    return dataclasses.replace(summary, describe=describe)
+
+
+class _ByteRange:
+    """Read-only file object limited to the bytes [start, stop) of a file."""
+
+    def __init__(self, path, start, stop):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = stop - start
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def byte_partitions(path, parts):
+    """Splits a CSV file after its header into byte ranges that start on line boundaries.
+
+    Returns (column names, [(start, stop), ...]). Quoted fields containing
+    newlines are not supported, which holds for the sleep dataset exports.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        columns = pd.read_csv(io.BytesIO(header)).columns.tolist()
+        starts = [len(header)]
+        for k in range(1, parts):
+            f.seek(max(starts[-1], len(header) + (size - len(header)) * k // parts))
+            f.readline()  # advance to the start of the next full line
+            position = f.tell()
+            if position >= size:
+                break
+            if position > starts[-1]:
+                starts.append(position)
+    bounds = starts + [size]
+    return columns, list(zip(bounds[:-1], bounds[1:]))
+
+
+def _aggregate_byte_range(path, start, stop, columns, chunksize):
+    source = _ByteRange(path, start, stop)
+    try:
+        result = StreamingAggregates()
+        for chunk in schema.iter_csv(source, chunksize, header=None, names=columns):
+            result.update(chunk)
+        return result
+    finally:
+        source.close()
+
+
+def aggregate_file(path, workers=None, chunksize=DEFAULT_CHUNK_ROWS):
+    """Aggregates a CSV file in parallel, each worker streaming its own byte range.
+
+    Memory per worker is bounded by chunksize, so this also works for files
+    larger than memory.
+    """
+    workers = workers or worker_count()
+    columns, ranges = byte_partitions(path, workers)
+    if workers <= 1 or len(ranges) <= 1:
+        return _merge(_aggregate_byte_range(path, start, stop, columns, chunksize) for start, stop in ranges)
+    with _pool(workers) as pool:
+        futures = [pool.submit(_aggregate_byte_range, path, start, stop, columns, chunksize)
+                   for start, stop in ranges]
+        return _merge(future.result() for future in futures)
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sleep_data import env_flag
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Section Profiling ---
+# Each logical section of a page runs inside span("page.section"). A span records
+# wall time, CPU time of the calling thread (the session's script thread) and,
+# with SLEEP_PROFILE_MEMORY=1, the peak bytes allocated while it ran. tracemalloc
+# slows every allocation, so memory tracking is off by default, and its numbers
+# are approximate while several sessions rerun at once. Spans nest: a span opened
+# inside another is named "outer/inner".
+#
+# The spans of the current rerun feed the SLEEP_DEBUG sidebar. Process-wide totals
+# are served in Prometheus text format on SLEEP_PROFILE_PORT (GET /metrics), bound
+# to SLEEP_PROFILE_HOST (127.0.0.1 unless set, so only local scrapers see it), and
+# with SLEEP_PROFILE_LOG set every rerun is appended to that file as a JSON line.
+MAX_RUN_SPANS = 256
+
+_local = threading.local()
+_totals = {}
+_gauges = {}
+_lock = threading.Lock()
+_exporter = None
+_collectors = []
+
+
+def _run_spans():
+    if not hasattr(_local, "spans"):
+        _local.spans = deque(maxlen=MAX_RUN_SPANS)
+        _local.stack = []
+    return _local.spans
+
+
+def _record(record):
+    _run_spans().append(record)
+    with _lock:
+        for records in _collectors:
+            records.append(record)
+        total = _totals.setdefault(record["name"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                                    "last_wall_s": 0.0, "peak_alloc_bytes": 0})
+        total["calls"] += 1
+        total["wall_s"] += record["wall_s"]
+        total["cpu_s"] += record["cpu_s"]
+        total["last_wall_s"] = record["wall_s"]
+        if record["alloc_bytes"] is not None:
+            total["peak_alloc_bytes"] = max(total["peak_alloc_bytes"], record["alloc_bytes"])
+
+
+@contextmanager
+def span(name):
+    """Times the enclosed block as a named section of the current rerun."""
+    _run_spans()
+    stack = _local.stack
+    frame = {"name": f"{stack[-1]['name']}/{name}" if stack else name, "child_peak": 0}
+    trace = env_flag("SLEEP_PROFILE_MEMORY")
+    if trace:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        frame["start_current"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    stack.append(frame)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+        stack.pop()
+        alloc = None
+        if trace and tracemalloc.is_tracing() and "start_current" in frame:
+            # reset_peak() in nested spans hides their peaks from this one, so they report them up
+            peak = max(tracemalloc.get_traced_memory()[1], frame["child_peak"])
+            alloc = max(0, peak - frame["start_current"])
+            if stack:
+                stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak)
+        _record({"name": frame["name"], "wall_s": wall, "cpu_s": cpu, "alloc_bytes": alloc})
+
+
+@contextmanager
+def collect():
+    """Yields a list that receives the span records of every thread while the block runs."""
+    records = []
+    with _lock:
+        _collectors.append(records)
+    try:
+        yield records
+    finally:
+        with _lock:
+            _collectors.remove(records)
+
+
+def begin_run():
+    """Starts collecting the spans of a new rerun in this thread."""
+    _run_spans().clear()
+    _local.stack.clear()
+    _local.started = time.perf_counter()
+
+
+def end_run(page=None):
+    """Returns the spans of the finished rerun and appends them to SLEEP_PROFILE_LOG."""
+    spans = list(_run_spans())
+    started = getattr(_local, "started", None)
+    total = time.perf_counter() - started if started is not None else None
+    log_path = os.environ.get("SLEEP_PROFILE_LOG")
+    if log_path:
+        write_log(log_path, {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "page": page,
+            "total_s": total,
+            "spans": spans,
+        })
+    return spans
+
+
+def write_log(path, entry):
+    """Appends one JSON line to the profile log."""
+    line = json.dumps(entry) + "\n"
+    try:
+        with _lock, open(path, "a") as f:
+            f.write(line)
+    except OSError as exc:
+        logger.warning("Could not write profile log %s: %s", path, exc)
+
+
+# --- Prometheus Export ---
+
+def register_gauge(name, help_text, fn):
+    """Adds a gauge whose value is read from fn() on every scrape (None skips it)."""
+    _gauges[name] = (help_text, fn)
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Returns the section totals and registered gauges in Prometheus text format."""
+    with _lock:
+        totals = {name: dict(values) for name, values in _totals.items()}
+    metrics = [
+        ("sleep_section_calls_total", "counter", "Times each page section ran.", "calls"),
+        ("sleep_section_wall_seconds_total", "counter", "Wall time spent in each page section.", "wall_s"),
+        ("sleep_section_cpu_seconds_total", "counter", "Script-thread CPU time spent in each page section.", "cpu_s"),
+        ("sleep_section_last_wall_seconds", "gauge", "Wall time of the latest run of each page section.", "last_wall_s"),
+        ("sleep_section_peak_alloc_bytes", "gauge", "Largest allocation peak seen in each page section.",
+         "peak_alloc_bytes"),
+    ]
+    lines = []
+    for metric, kind, help_text, key in metrics:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{{section="{_label(name)}"}} {values[key]}' for name, values in sorted(totals.items())]
+    for name, (help_text, fn) in sorted(_gauges.items()):
+        value = fn()
+        if value is not None:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_exporter(port=None, host=None):
+    """Serves /metrics on SLEEP_PROFILE_HOST:SLEEP_PROFILE_PORT in a background thread, once per process."""
+    global _exporter
+    port = port or os.environ.get("SLEEP_PROFILE_PORT")
+    host = host or os.environ.get("SLEEP_PROFILE_HOST", "127.0.0.1")
+    if not port:
+        return None
+    with _lock:
+        if _exporter is None:
+            try:
+                _exporter = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+            except (OSError, ValueError) as exc:
+                logger.warning("Could not serve profile metrics on %s:%s: %s", host, port, exc)
+                _exporter = False  # do not retry on every rerun
+                return None
+            threading.Thread(target=_exporter.serve_forever, name="profile-exporter", daemon=True).start()
+    return _exporter or None
@@ -0,0 +1,271 @@
+"""Export the dashboard analyses as a static HTML/PNG/CSV report.
+
+Runs the Demographic, Comparison and Correlation analyses without a Streamlit
+server and writes, into the output directory:
+
+    index.html      self-contained report (figures embedded, tables inline)
+    figures/*.png   every dashboard figure
+    tables/*.csv    the tables behind the figures and the summary statistics
+    manifest.json   content hash of each artifact's inputs
+
+Figures whose inputs hash the same as in the previous run's manifest are not
+rendered again; the stale ones are rendered in parallel in a process pool
+(SLEEP_WORKERS or --workers processes). Run from the repository root:
+
+    python report.py --out report
+    python report.py --data /path/to/export.csv --out /srv/sleep-report
+"""
+import argparse
+import base64
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import aggregates
+import binary_cache
+import charts
+import density
+import intervals
+import parallel
+import schema
+import sleep_data
+from correlation import METHODS
+from figure_cache import SAVEFIG_OPTIONS, render_png
+
+
+MANIFEST = "manifest.json"
+DEFAULT_OUTPUT = "report"
+
+# (section title, [(artifact name, figure title)]) in page order
+SECTIONS = [
+    ("Demographic", [
+        ("age_distribution_by_gender", "Age Distribution by Gender"),
+        ("age_distribution", "Distribution of Age"),
+        ("occupation_distribution", "Distribution of Occupation"),
+    ]),
+    ("Comparison", [
+        ("quality_by_gender", "Average Quality of Sleep by Gender"),
+        ("quality_by_age_group", "Distribution of Quality of Sleep by Age Group"),
+        ("quality_by_occupation", "Average Quality of Sleep by Occupation"),
+    ]),
+    ("Correlation", [
+        ("correlation_heatmap", "Correlation Matrix of Quality of Sleep and Heart Rate"),
+        ("sleep_duration_by_disorder", "Sleep Duration Distribution by Sleep Disorder"),
+        ("activity_by_bmi", "Physical Activity Level Distribution by BMI Category"),
+    ]),
+]
+
+
+def load_frame(path):
+    """Reads the dataset like the dashboard does (binary cache when configured)."""
+    fmt = sleep_data.cache_format()
+    data = binary_cache.load_csv(path, fmt) if fmt else schema.read_csv(path)
+    return schema.drop_unnamed(data)
+
+
+def summarize(df):
+    """Returns the DatasetSummary, over row partitions in a process pool for large frames."""
+    if len(df) >= parallel.MIN_PARALLEL_ROWS and parallel.worker_count() > 1:
+        return parallel.summarize_frame(df)
+    return aggregates.build_summary(df)
+
+
+def figure_inputs(df, summary):
+    """Returns {artifact name: (draw, data, params)} with the dashboard's default chart options."""
+    age = density.distribution(density.value_table(df, "Age", "Gender"), bins=20, kde=True)
+    return {
+        "age_distribution_by_gender": (charts.age_distribution_by_gender, (age,), {}),
+        "age_distribution": (charts.age_distribution, (age,), {}),
+        "occupation_distribution": (charts.occupation_distribution, (summary.occupation_counts,), {}),
+        "quality_by_gender": (charts.quality_by_gender,
+                              (intervals.mean_intervals(intervals.group_moments(df, "Gender", "Quality of Sleep")),),
+                              {"method": "t"}),
+        "quality_by_age_group": (charts.quality_by_age_group, (summary.quality_by_age,), {}),
+        "quality_by_occupation": (charts.quality_by_occupation, (summary.occupation_quality_mean,), {}),
+        "correlation_heatmap": (charts.correlation_heatmap, (summary.quality_heart_rate_corr,), {}),
+        "sleep_duration_by_disorder": (charts.sleep_duration_by_disorder,
+                                       (summary.group_sketches[("Sleep Duration", "Sleep Disorder")],), {}),
+        "activity_by_bmi": (charts.activity_by_bmi,
+                            (summary.group_sketches[("Physical Activity Level", "BMI Category")],), {}),
+    }
+
+
+def _box_table(sketches, column):
+    rows = {group: {key: value for key, value in sketch.box_stats().items() if key != "fliers"}
+            for group, sketch in sketches.items()}
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis(column)
+
+
+def table_inputs(summary, figures):
+    """Returns {artifact name: DataFrame} for the CSV tables."""
+    age = figures["age_distribution_by_gender"][1][0]
+    age_bins = age.counts.copy()
+    age_bins.insert(0, "bin_start", age.edges[:-1])
+    age_bins.insert(1, "bin_end", age.edges[1:])
+    tables = {
+        "summary_statistics": summary.describe,
+        "column_info": summary.column_info.set_index("Column Name"),
+        "age_bins_by_gender": age_bins.set_index(["bin_start", "bin_end"]),
+        "occupation_counts": summary.occupation_counts.to_frame(),
+        "quality_by_gender": figures["quality_by_gender"][1][0],
+        "quality_by_age_group": summary.quality_by_age,
+        "quality_by_occupation": summary.occupation_quality_mean.set_index("Occupation"),
+        "sleep_duration_by_disorder": _box_table(summary.group_sketches[("Sleep Duration", "Sleep Disorder")],
+                                                 "Sleep Disorder"),
+        "activity_by_bmi": _box_table(summary.group_sketches[("Physical Activity Level", "BMI Category")],
+                                      "BMI Category"),
+    }
+    for method in METHODS:
+        tables[f"correlation_{method}"] = summary.correlation.matrix(method)
+    return tables
+
+
+def _code_hash():
+    """Hashes the chart code and image settings, so a changed chart is re-rendered too."""
+    digest = hashlib.sha256(json.dumps(SAVEFIG_OPTIONS, sort_keys=True).encode())
+    for module in (charts, density):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def input_hash(name, draw, data, params, code_hash=""):
+    """Returns the content hash of everything a figure is drawn from."""
+    payload = pickle.dumps((name, draw.__name__, data, sorted(params.items())), protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.sha256(code_hash.encode() + payload).hexdigest()
+
+
+def _render(draw, data, params):
+    return render_png(draw, *data, **params)
+
+
+def render_figures(jobs, workers):
+    """Renders {name: (draw, data, params)} to PNG bytes, in a process pool when there are several."""
+    if workers <= 1 or len(jobs) <= 1:
+        return {name: _render(*job) for name, job in jobs.items()}
+    # "spawn" workers start clean, like parallel.py's aggregation pool; render_png applies the theme
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context) as pool:
+        futures = {name: pool.submit(_render, *job) for name, job in jobs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _write_if_changed(path, content):
+    """Writes bytes to path unless it already holds exactly them."""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == content:
+                return False
+    with open(path, "wb") as f:
+        f.write(content)
+    return True
+
+
+def write_html(path, summary, images, tables, source, created):
+    """Writes the self-contained report page with embedded PNG figures."""
+    def table_html(frame):
+        return frame.to_html(float_format=lambda value: f"{value:.2f}", border=0, classes="table")
+
+    parts = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset='utf-8'><title>Sleep Health and Lifestyle Report</title>",
+        "<style>body{font-family:sans-serif;max-width:1100px;margin:auto;padding:1em;color:#222}"
+        "h1{color:#8A2BE2}h2{color:#BA55D3;border-bottom:2px solid #8A2BE2;padding-bottom:5px}"
+        "img{max-width:100%}.table{border-collapse:collapse;margin-bottom:1em}"
+        ".table td,.table th{padding:2px 8px;border-bottom:1px solid #ddd;text-align:right}"
+        ".metrics{display:flex;gap:2em;margin-bottom:1em}.metrics div{font-size:1.4em}</style>",
+        "</head><body>",
+        "<h1>Sleep Health and Lifestyle Dataset</h1>",
+        f"<p>Source: {html.escape(source)} · generated {html.escape(created)}</p>",
+        "<div class='metrics'>",
+        f"<div>Total Respondents<br><b>{summary.total_respondents:,}</b></div>",
+        f"<div>Average Age<br><b>{summary.avg_age:.1f}</b></div>",
+        f"<div>Gender (Male)<br><b>{summary.gender_share.get('Male', 0) * 100:.1f}%</b></div>",
+        f"<div>Gender (Female)<br><b>{summary.gender_share.get('Female', 0) * 100:.1f}%</b></div>",
+        f"<div>Top Job<br><b>{html.escape(summary.most_common_occupation)}</b></div>",
+        "</div>",
+        "<h2>Summary Statistics</h2>",
+        table_html(tables["summary_statistics"]),
+    ]
+    for section, figures in SECTIONS:
+        parts.append(f"<h2>{html.escape(section)}</h2>")
+        for name, title in figures:
+            encoded = base64.b64encode(images[name]).decode()
+            parts += [f"<h3>{html.escape(title)}</h3>",
+                      f"<img alt='{html.escape(title)}' src='data:image/png;base64,{encoded}'>"]
+            if name in tables:
+                parts.append(table_html(tables[name]))
+    parts.append("</body></html>")
+    return _write_if_changed(path, "\n".join(parts).encode())
+
+
+def build_report(data_path, output, workers=None, force=False):
+    """Writes the report for data_path into output; returns {"rendered", "reused", "seconds"}."""
+    started = time.perf_counter()
+    for directory in (output, os.path.join(output, "figures"), os.path.join(output, "tables")):
+        os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(output, MANIFEST)
+    previous = {}
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f).get("artifacts", {})
+
+    df = load_frame(data_path)
+    summary = summarize(df)
+    figures = figure_inputs(df, summary)
+    tables = table_inputs(summary, figures)
+
+    code_hash = _code_hash()
+    hashes = {name: input_hash(name, *job, code_hash=code_hash) for name, job in figures.items()}
+    image_paths = {name: os.path.join(output, "figures", f"{name}.png") for name in figures}
+    stale = {name: job for name, job in figures.items()
+             if previous.get(f"figures/{name}.png") != hashes[name] or not os.path.exists(image_paths[name])}
+
+    images = render_figures(stale, workers or parallel.worker_count())
+    for name, png in images.items():
+        _write_if_changed(image_paths[name], png)
+    for name in figures.keys() - images.keys():
+        with open(image_paths[name], "rb") as f:
+            images[name] = f.read()
+
+    # Tables are cheap to write; unchanged files are left untouched
+    artifacts = {f"figures/{name}.png": hashes[name] for name in figures}
+    for name, table in tables.items():
+        content = table.to_csv().encode()
+        _write_if_changed(os.path.join(output, "tables", f"{name}.csv"), content)
+        artifacts[f"tables/{name}.csv"] = hashlib.sha256(content).hexdigest()
+
+    created = datetime.now(timezone.utc).isoformat()
+    write_html(os.path.join(output, "index.html"), summary, images, tables, data_path, created)
+    with open(manifest_path, "w") as f:
+        json.dump({"created": created, "source": data_path, "rows": len(df), "artifacts": artifacts}, f, indent=2)
+        f.write("\n")
+    return {"rendered": sorted(images.keys() & stale.keys()), "reused": sorted(figures.keys() - stale.keys()),
+            "seconds": time.perf_counter() - started}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=sleep_data.data_path(), help="dataset CSV (default: SLEEP_DATA_PATH or the bundled file)")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="output directory")
+    parser.add_argument("--workers", type=int, help="render processes (default: SLEEP_WORKERS or all cores)")
+    parser.add_argument("--force", action="store_true", help="re-render every figure, ignoring the manifest")
+    args = parser.parse_args(argv)
+
+    result = build_report(args.data, args.out, workers=args.workers, force=args.force)
+    print(f"Report written to {os.path.join(args.out, 'index.html')}: {len(result['rendered'])} figures rendered, "
+          f"{len(result['reused'])} up to date ({result['seconds']:.1f}s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
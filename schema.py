@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Column Schema for the Sleep Health Dataset ---
+# Low-cardinality strings are parsed straight into pandas categoricals so that
+# groupby/value_counts/crosstab work on integer codes instead of Python strings.
+CATEGORY_COLUMNS = ["Gender", "Occupation", "BMI Category", "Sleep Disorder"]
+
+# Scores, levels and counts are stored in the smallest integer type that holds them.
+INTEGER_COLUMNS = {
+    "Person ID": "int32",
+    "Age": "int8",
+    "Quality of Sleep": "int8",
+    "Physical Activity Level": "int16",
+    "Stress Level": "int8",
+    "Heart Rate": "int16",
+    "Daily Steps": "int32",
+}
+
+FLOAT_COLUMNS = {
+    "Sleep Duration": "float32",
+}
+
+# "140/90" is split into two numeric columns and the original text column is dropped.
+BLOOD_PRESSURE_COLUMN = "Blood Pressure"
+SYSTOLIC_COLUMN = "Systolic BP"
+DIASTOLIC_COLUMN = "Diastolic BP"
+BLOOD_PRESSURE_DTYPE = "int16"
+
+# dtypes handed to pd.read_csv so categoricals never materialise as object strings
+CSV_DTYPES = {col: "category" for col in CATEGORY_COLUMNS + [BLOOD_PRESSURE_COLUMN]}
+
+# Bump when the conversion rules below change without touching the dtype tables above
+SCHEMA_REVISION = 2
+
+
+def schema_hash():
+    """Returns a short hash of the dtype tables and SCHEMA_REVISION, stored with typed caches."""
+    tables = [SCHEMA_REVISION, CATEGORY_COLUMNS, INTEGER_COLUMNS, FLOAT_COLUMNS,
+              [BLOOD_PRESSURE_COLUMN, SYSTOLIC_COLUMN, DIASTOLIC_COLUMN, BLOOD_PRESSURE_DTYPE]]
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _fit_integer(series, dtype):
+    """Casts an integer column to dtype, widening if values fall outside its range.
+
+    Missing values give the nullable counterpart (Int8, ...); a column holding
+    fractional values is kept as float64 instead of being truncated.
+    """
+    values = series.dropna()
+    if not (values % 1 == 0).all():
+        logger.warning("Column %s has fractional values; keeping it as float64", series.name)
+        return series.astype("float64")
+    info = np.iinfo(dtype)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        dtype = "int64"
+    if len(values) < len(series):
+        # Nullable integers keep missing values instead of forcing a float column
+        return series.astype(dtype.capitalize())
+    return series.astype(dtype)
+
+
+def _split_blood_pressure(series):
+    """Splits "systolic/diastolic" text into two numeric Series.
+
+    The work is done once per distinct reading (the categories) and broadcast
+    back to the rows through the category codes.
+    """
+    series = series.astype("category")
+    parts = pd.Series(series.cat.categories.astype(str)).str.split("/", n=1, expand=True)
+    parts = parts.reindex(columns=[0, 1])
+    codes = series.cat.codes.to_numpy()
+    missing = codes < 0
+
+    result = []
+    for part in (parts[0], parts[1]):
+        values = pd.to_numeric(part, errors="coerce").to_numpy(dtype="float64")
+        column = np.where(missing, np.nan, values[codes])
+        result.append(_fit_integer(pd.Series(column, index=series.index), BLOOD_PRESSURE_DTYPE))
+    return result
+
+
+def apply_schema(data):
+    """Returns a new DataFrame with the compact dashboard dtypes applied."""
+    columns = {}
+    for col in data.columns:
+        series = data[col]
+        if col == BLOOD_PRESSURE_COLUMN:
+            columns[SYSTOLIC_COLUMN], columns[DIASTOLIC_COLUMN] = _split_blood_pressure(series)
+        elif col in CATEGORY_COLUMNS:
+            columns[col] = series.astype("category")
+        elif col in INTEGER_COLUMNS:
+            columns[col] = _fit_integer(series, INTEGER_COLUMNS[col])
+        elif col in FLOAT_COLUMNS:
+            columns[col] = series.astype(FLOAT_COLUMNS[col])
+        else:
+            columns[col] = series
+    return pd.DataFrame(columns, index=data.index)
+
+
+def read_csv(source, **kwargs):
+    """Reads a CSV export and returns it in the typed dashboard schema."""
+    dtype = {**CSV_DTYPES, **kwargs.pop("dtype", {})}
+    return apply_schema(pd.read_csv(source, dtype=dtype, **kwargs))
+
+
+def drop_unnamed(data):
+    """Drops any unnamed columns that might result from CSV indexing."""
+    return data.loc[:, ~data.columns.str.contains('^Unnamed')]
+
+
+def iter_csv(source, chunksize, **kwargs):
+    """Yields typed chunks of at most chunksize rows from a CSV export."""
+    dtype = {**CSV_DTYPES, **kwargs.pop("dtype", {})}
+    for chunk in pd.read_csv(source, dtype=dtype, chunksize=chunksize, **kwargs):
+        yield drop_unnamed(apply_schema(chunk))
@@ -0,0 +1,49 @@
+"""Runs the dashboard with its cache warm-up started when the server boots.
+
+    python serve.py [streamlit run options, e.g. --server.port 8501]
+
+`streamlit run Main.py` only starts the warm-up (see warmup.py) once the first
+visitor's session runs Main.py, so that visitor still waits for the dataset and
+its aggregates. This launcher starts the warm-up thread and the /metrics
+exporter (when SLEEP_PROFILE_PORT is set) in the server process itself, then
+hands over to `streamlit run Main.py` in-process, so the caches it fills are the
+ones every session reads.
+
+Readiness: a deployment that should only receive traffic once the caches are
+warm can probe GET /metrics on SLEEP_PROFILE_PORT and wait for
+sleep_warmup_done 1; Streamlit's own /_stcore/health only reports that the
+server is up.
+"""
+import os
+import sys
+import threading
+import time
+
+from streamlit import runtime
+from streamlit.web import cli
+
+import profiling
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _start_warmup():
+    # st.cache_data picks its storage from the running Streamlit runtime, so wait until it exists
+    while not runtime.exists():
+        time.sleep(0.05)
+    # imported lazily: warmup -> figure_cache declares st.cache_data functions, which expect the runtime
+    import warmup
+
+    warmup.start()
+
+
+def main(argv=None):
+    threading.Thread(target=_start_warmup, name="warmup-start", daemon=True).start()
+    profiling.start_exporter()
+    args = sys.argv[1:] if argv is None else argv
+    return cli.main(["run", os.path.join(ROOT, "Main.py"), *args], prog_name="streamlit")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
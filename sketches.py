@@ -0,0 +1,216 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from density import fft_kde, group_levels
+
+
+# --- Mergeable Quantile Sketches ---
+# Violin and box plots are drawn from one QuantileSketch per group instead of
+# the raw column. A sketch is a sorted list of weighted centroids (value, count)
+# plus exact count, sum, sum of squares, min and max. While a group has at most
+# `compression` distinct values every value is its own centroid and quantiles,
+# box statistics and the KDE are exact. Beyond that, neighbouring centroids are
+# merged t-digest style (k1 scale function), which keeps at most `compression`
+# centroids; quantile rank error then stays within about 1/compression near the
+# median and shrinks towards the tails. SLEEP_SKETCH_COMPRESSION sets the bound (default 200).
+# Sketches merge across chunks and partitions and serialize to plain dicts.
+DEFAULT_COMPRESSION = 200
+
+# (value column, group column) pairs sketched for the Correlation page
+SKETCH_GROUPS = [("Sleep Duration", "Sleep Disorder"), ("Physical Activity Level", "BMI Category")]
+
+
+def configured_compression():
+    """Returns the configured sketch compression (SLEEP_SKETCH_COMPRESSION)."""
+    return max(10, int(os.environ.get("SLEEP_SKETCH_COMPRESSION", DEFAULT_COMPRESSION)))
+
+
+class QuantileSketch:
+    """Weighted-centroid quantile sketch; exact while distinct values fit in compression."""
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.exact = True
+
+    @classmethod
+    def from_counts(cls, values, counts, compression=DEFAULT_COMPRESSION):
+        """Builds a sketch from distinct values and how often each occurs."""
+        sketch = cls(compression)
+        values = np.asarray(values, dtype="float64")
+        counts = np.asarray(counts, dtype="float64")
+        keep = (counts > 0) & ~np.isnan(values)
+        values, counts = values[keep], counts[keep]
+        if len(values) == 0:
+            return sketch
+        order = np.argsort(values, kind="stable")
+        sketch.means, sketch.weights = values[order], counts[order]
+        sketch.count = int(counts.sum())
+        sketch.sum = float(counts @ values)
+        sketch.sumsq = float(counts @ values ** 2)
+        sketch.min, sketch.max = float(values.min()), float(values.max())
+        sketch._compress()
+        return sketch
+
+    @classmethod
+    def from_values(cls, values, compression=DEFAULT_COMPRESSION):
+        """Builds a sketch from raw values (NaN ignored)."""
+        values = np.asarray(values, dtype="float64")
+        distinct, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        return cls.from_counts(distinct, counts, compression)
+
+    def merge(self, other):
+        """Folds a sketch built over other rows into this one."""
+        if other.count == 0:
+            return self
+        means = np.concatenate([self.means, other.means])
+        weights = np.concatenate([self.weights, other.weights])
+        # Identical values from both sides become one centroid again
+        distinct, inverse = np.unique(means, return_inverse=True)
+        self.means, self.weights = distinct, np.bincount(inverse, weights=weights)
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.exact = self.exact and other.exact
+        self._compress()
+        return self
+
+    def _compress(self):
+        if len(self.means) <= self.compression:
+            return
+        # k1 scale: a centroid may span at most one unit of k(q) = delta/(2*pi) * asin(2q - 1)
+        total = self.weights.sum()
+        scale = self.compression / (2 * math.pi)
+        means, weights = [], []
+        mean, weight, cumulative = self.means[0], self.weights[0], 0.0
+        k_left = scale * math.asin(-1)
+        for value, w in zip(self.means[1:], self.weights[1:]):
+            q_right = min(1.0, (cumulative + weight + w) / total)
+            if scale * math.asin(2 * q_right - 1) - k_left <= 1:
+                mean += (value - mean) * w / (weight + w)
+                weight += w
+                continue
+            means.append(mean)
+            weights.append(weight)
+            cumulative += weight
+            k_left = scale * math.asin(2 * min(1.0, cumulative / total) - 1)
+            mean, weight = value, w
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = np.array(means), np.array(weights)
+        self.exact = False
+
+    # --- Queries ---
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else math.nan
+
+    def std(self):
+        """Returns the sample standard deviation (exact, from the running sums)."""
+        if self.count < 2:
+            return math.nan
+        return math.sqrt(max(0.0, (self.sumsq - self.sum ** 2 / self.count) / (self.count - 1)))
+
+    def quantile(self, q):
+        """Returns quantile(s) with numpy's linear interpolation, treating centroids as repeated values."""
+        q = np.asarray(q, dtype="float64")
+        if self.count == 0:
+            return np.full(q.shape, np.nan)
+        ends = np.cumsum(self.weights)
+        if not self.exact:
+            # Merged centroids: interpolate between centroid centres, anchored at the exact min and max
+            centres = ends - self.weights / 2
+            ranks = np.concatenate([[0.0], centres, [float(self.count)]])
+            values = np.concatenate([[self.min], self.means, [self.max]])
+            return np.interp(q * self.count, ranks, values)
+        # The 0-based rank r is the value at sorted position r; centroid i covers ranks [start_i, end_i)
+        position = q * (self.count - 1)
+        below, fraction = np.floor(position), position - np.floor(position)
+        lower = self.means[np.minimum(np.searchsorted(ends, below, side="right"), len(ends) - 1)]
+        upper = self.means[np.minimum(np.searchsorted(ends, below + 1, side="right"), len(ends) - 1)]
+        result = lower + (upper - lower) * fraction
+        return np.clip(result, self.min, self.max)
+
+    def box_stats(self, whis=1.5):
+        """Returns matplotlib.cbook.boxplot_stats-style statistics for Axes.bxp."""
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = (self.means >= q1 - whis * iqr) & (self.means <= q3 + whis * iqr)
+        whislo = self.means[inside].min() if inside.any() else q1
+        whishi = self.means[inside].max() if inside.any() else q3
+        return {
+            "med": median, "q1": q1, "q3": q3, "iqr": iqr, "mean": self.mean,
+            "whislo": min(whislo, q1), "whishi": max(whishi, q3), "fliers": self.means[~inside],
+        }
+
+    def kde(self, cut=2, points=100):
+        """Returns (support, density) of seaborn's violin KDE (Scott bandwidth), or None without spread."""
+        bandwidth = self.std() * self.count ** (-1 / 5) if self.count else math.nan
+        if not bandwidth > 0:
+            return None
+        support = np.linspace(self.min - cut * bandwidth, self.max + cut * bandwidth, points)
+        return support, fft_kde(self.table(), support, bandwidths=[bandwidth]).iloc[:, 0].to_numpy()
+
+    def table(self):
+        """Returns the centroids as a one-column value table (see density.value_table)."""
+        return pd.DataFrame({"count": self.weights}, index=pd.Index(self.means))
+
+    # --- Serialization ---
+
+    def to_dict(self):
+        return {
+            "compression": self.compression, "means": self.means.tolist(), "weights": self.weights.tolist(),
+            "count": self.count, "sum": self.sum, "sumsq": self.sumsq,
+            "min": self.min, "max": self.max, "exact": self.exact,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["compression"])
+        sketch.means = np.asarray(data["means"], dtype="float64")
+        sketch.weights = np.asarray(data["weights"], dtype="float64")
+        for key in ("count", "sum", "sumsq", "min", "max", "exact"):
+            setattr(sketch, key, data[key])
+        return sketch
+
+
+def group_sketches(df, column, by, compression=DEFAULT_COMPRESSION):
+    """Returns {group: QuantileSketch of df[column]} in the group column's level order."""
+    counts = df.groupby([df[by], df[column]], observed=True).size()
+    sketches = {}
+    for group in group_levels(df[by]):
+        if group in counts.index.get_level_values(0):
+            part = counts.xs(group, level=0)
+            sketches[str(group)] = QuantileSketch.from_counts(part.index.to_numpy(dtype="float64"),
+                                                              part.to_numpy(), compression)
+    return sketches
+
+
+def merge_group_sketches(left, right):
+    """Merges two {group: QuantileSketch} dicts, ordered by group like the sorted categories of a chunk."""
+    for group, sketch in right.items():
+        if group in left:
+            left[group].merge(sketch)
+        else:
+            left[group] = sketch
+    return dict(sorted(left.items()))
+
+
+def sketch_groups(df, compression=None):
+    """Returns {(column, by): {group: QuantileSketch}} for every SKETCH_GROUPS pair present in df."""
+    compression = compression or configured_compression()
+    return {
+        (column, by): group_sketches(df, column, by, compression)
+        for column, by in SKETCH_GROUPS if column in df and by in df
+    }
@@ -0,0 +1,188 @@
+import importlib.util
+import logging
+import os
+import threading
+
+import pandas as pd
+import streamlit as st
+
+import appends
+import binary_cache
+import schema
+
+
+logger = logging.getLogger(__name__)
+
+# --- Data Source Configuration ---
+# The bundled CSV is read first so the dashboard works without outbound network.
+# SLEEP_DATA_PATH points the app at another local export of the same schema, and
+# SLEEP_DATA_ALLOW_URL=1 allows falling back to the GitHub copy when no local file exists.
+# SLEEP_DATA_CACHE picks the binary cache written next to the CSV: "feather" (default),
+# "parquet", or "off" to always parse the CSV text.
+# SLEEP_INGEST=stream aggregates the CSV in SLEEP_CHUNK_ROWS-row chunks (see streaming.py)
+# for datasets that do not fit in memory, and every page draws its charts from those
+# aggregates (see file_aggregates.py); the default "memory" loads one DataFrame.
+# SLEEP_INGEST=duckdb computes the summary and the chart inputs with SQL over the file (see sql_backend.py).
+# SLEEP_APPEND_DIR adds rows from CSV files dropped into a directory (see appends.py).
+# Pages pass the columns they read to load_data (see "Column Projection" below).
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.path.join(BASE_DIR, "cleaned_sleep_health_data.csv")
+DATA_URL = "https://raw.githubusercontent.com/KhadijahRijal/SleepHealthandLifestyle/refs/heads/main/cleaned_sleep_health_data.csv"
+
+
+def env_flag(name, default=False):
+    """Reads a boolean flag such as "1", "true" or "yes" from the environment."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def data_path():
+    """Returns the configured local CSV path, defaulting to the bundled dataset."""
+    return os.environ.get("SLEEP_DATA_PATH") or DATA_FILE
+
+
+def cache_format():
+    """Returns the configured binary cache format, or None when disabled."""
+    fmt = os.environ.get("SLEEP_DATA_CACHE", "feather").strip().lower()
+    return fmt if fmt in binary_cache.FORMATS else None
+
+
+def ingest_mode():
+    """Returns the configured ingestion mode: "stream", "duckdb" or the default "memory"."""
+    mode = os.environ.get("SLEEP_INGEST", "memory").strip().lower()
+    if mode == "duckdb" and importlib.util.find_spec("duckdb") is None:
+        logger.warning("SLEEP_INGEST=duckdb needs the duckdb package; loading the dataset into memory")
+        return "memory"
+    return mode if mode in ("stream", "duckdb") else "memory"
+
+
+def data_version(path):
+    """Returns a version string for a local file based on its mtime and size."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+# --- Column Projection ---
+# Each page declares the columns it reads and calls load_data(columns=[...]).
+# One ColumnStore per file version reads only the columns no page has asked for
+# yet (a column projection of the binary cache, or CSV usecols) and keeps each
+# typed column once; the frames handed to pages are assembled from those shared
+# columns without copying, and load_data() without columns assembles all of
+# them. A projected frame records its columns in attrs["columns"].
+class ColumnStore:
+    """The typed columns of one local file, each read at most once and shared by every frame."""
+
+    def __init__(self, path):
+        self.path = path
+        self.series = {}
+        self.lock = threading.Lock()
+        self.columns = []
+        for col in pd.read_csv(path, nrows=0).columns:
+            if col == schema.BLOOD_PRESSURE_COLUMN:
+                self.columns += [schema.SYSTOLIC_COLUMN, schema.DIASTOLIC_COLUMN]
+            elif not col.startswith("Unnamed"):
+                self.columns.append(col)
+
+    def _read(self, columns):
+        fmt = cache_format()
+        if fmt:
+            data = binary_cache.read_cached(self.path, fmt, columns=columns)
+            # The first read of a file version converts it to the binary cache
+            return data if data is not None else binary_cache.load_csv(self.path, fmt)
+        split = (schema.SYSTOLIC_COLUMN, schema.DIASTOLIC_COLUMN)
+        usecols = {schema.BLOOD_PRESSURE_COLUMN if col in split else col for col in columns}
+        return schema.read_csv(self.path, usecols=list(usecols))
+
+    def frame(self, columns=None):
+        """Returns a DataFrame of the given columns (default: all), in file order."""
+        if columns is None:
+            wanted = self.columns
+        else:
+            unknown = set(columns).difference(self.columns)
+            if unknown:
+                raise KeyError(f"{self.path} has no column(s) {', '.join(sorted(unknown))}")
+            wanted = [col for col in self.columns if col in columns]
+        with self.lock:
+            missing = [col for col in wanted if col not in self.series]
+            if missing:
+                data = self._read(missing)
+                for col in missing:
+                    # Own buffer per column, so the parsed frame's blocks are freed
+                    self.series[col] = data[col].copy()
+        return pd.DataFrame({col: self.series[col] for col in wanted}, copy=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _column_store(path, version):
+    return ColumnStore(path)
+
+
+# The frames are shared by every page and session in the process.
+# The mtime/size version is part of the cache key, so editing the file triggers a re-read.
+# Callers must treat the returned frame as read-only.
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _read_local(path, version, columns=None):
+    store = _column_store(path, version)
+    if columns is not None and set(columns) >= set(store.columns):
+        columns = None
+    data = store.frame(columns)
+    data.attrs["source"] = path
+    data.attrs["version"] = version
+    if columns is not None:
+        data.attrs["columns"] = tuple(data.columns)
+    return data
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _read_url(url):
+    data = schema.drop_unnamed(schema.read_csv(url))
+    data.attrs["source"] = url
+    data.attrs["version"] = url
+    return data
+
+
+def load_data(path=None, allow_url=None, columns=None):
+    """Loads the shared DataFrame from the local dataset, falling back to DATA_URL only when allowed.
+
+    With columns, only those columns are read (the URL copy and appended datasets are always complete).
+    """
+    path = path or data_path()
+    if allow_url is None:
+        allow_url = env_flag("SLEEP_DATA_ALLOW_URL")
+
+    try:
+        if os.path.exists(path):
+            appending = bool(os.environ.get("SLEEP_APPEND_DIR"))
+            # Appended rows extend the complete frame, so projections are not used
+            projection = tuple(sorted(columns)) if columns and not appending else None
+            data = _read_local(path, data_version(path), projection)
+            if appending:
+                # New rows dropped into SLEEP_APPEND_DIR are added incrementally (see appends.py)
+                data = appends.get_store(data).refresh()
+            return data
+        if allow_url:
+            return _read_url(DATA_URL)
+        raise FileNotFoundError(f"No dataset found at {path}")
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return pd.DataFrame()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _read_preview(path, version, rows):
+    data = schema.drop_unnamed(schema.read_csv(path, nrows=rows))
+    data.attrs["source"] = path
+    data.attrs["version"] = f"{version}-head{rows}"
+    return data
+
+
+def load_preview(rows=1000, path=None):
+    """Loads only the first rows of the local dataset, for streaming mode's table preview."""
+    path = path or data_path()
+    try:
+        return _read_preview(path, data_version(path), rows)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,344 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import binary_cache
+import parallel
+import schema
+import sketches
+import sleep_data
+from aggregates import AGE_LABELS, PAIR_COUNTS, DatasetSummary, mode_label
+from binning import AGE_GROUPS
+from correlation import CORRELATION_COLUMNS, PAIR_CELL_LIMIT, CoMoments, CorrelationEngine
+
+try:
+    import duckdb
+except ImportError:  # optional: without it SLEEP_INGEST=duckdb falls back to "memory" (see sleep_data.py)
+    duckdb = None
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Embedded SQL Backend ---
+# With SLEEP_INGEST=duckdb the DatasetSummary is computed by an in-process
+# DuckDB database straight from the local file: the KPI metrics, category
+# counts, mean Quality of Sleep per Occupation, the Age_Group x Quality of
+# Sleep crosstab, describe(), the correlation co-moments and pair counts and
+# the violin/box sketches are each a SQL aggregate, and only those small result
+# sets come back into pandas. A CSV is parsed once into a temporary columnar
+# table (its fresh Parquet cache or a .parquet SLEEP_DATA_PATH is scanned
+# directly); the Blood Pressure split and the numeric casts of schema.py are
+# done in SQL. Queries run on SLEEP_WORKERS threads, and state that outgrows
+# SLEEP_DUCKDB_MEMORY (e.g. "4GB"; DuckDB's default is 80% of RAM) spills to
+# SLEEP_DUCKDB_TEMP, so files larger than memory are summarized out of core.
+# The chart pages read the same database through file_aggregates.py: one
+# connection per file version stays open, and each (value, group) pair count a
+# page asks for is one GROUP BY on it.
+TABLE = "survey"
+
+# pandas' default missing-value markers, so both backends see the same nulls
+NULL_STRINGS = ["", "#N/A", "N/A", "NA", "NULL", "NaN", "n/a", "nan", "null", "None", "<NA>"]
+
+
+def available():
+    """Returns True when the duckdb package is installed."""
+    return duckdb is not None
+
+
+def _identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def source_relation(path):
+    """Returns the table function reading path: a Parquet file, the CSV's fresh Parquet cache, or the CSV."""
+    if path.endswith(".parquet"):
+        return f"read_parquet({_literal(path)})"
+    if sleep_data.cache_format() == "parquet":
+        cached = binary_cache.fresh_cache_path(path, "parquet")
+        if cached:
+            return f"read_parquet({_literal(cached)})"
+    nulls = ", ".join(_literal(value) for value in NULL_STRINGS)
+    return f"read_csv({_literal(path)}, header = true, nullstr = [{nulls}])"
+
+
+def typed_columns(raw_columns):
+    """Returns [(column, SQL expression)] applying the dashboard schema (see schema.apply_schema) in SQL."""
+    columns = []
+    for col in raw_columns:
+        # Unnamed index columns: "Unnamed: 0" in pandas, "column0" in DuckDB
+        if col.startswith("Unnamed") or re.fullmatch(r"column\d+", col):
+            continue
+        quoted = _identifier(col)
+        if col == schema.BLOOD_PRESSURE_COLUMN:
+            for part, name in enumerate((schema.SYSTOLIC_COLUMN, schema.DIASTOLIC_COLUMN), start=1):
+                columns.append((name, f"TRY_CAST(split_part(CAST({quoted} AS VARCHAR), '/', {part}) AS BIGINT)"))
+        elif col in schema.CATEGORY_COLUMNS:
+            columns.append((col, f"CAST({quoted} AS VARCHAR)"))
+        elif col in schema.INTEGER_COLUMNS or col in (schema.SYSTOLIC_COLUMN, schema.DIASTOLIC_COLUMN):
+            columns.append((col, f"TRY_CAST({quoted} AS BIGINT)"))
+        elif col in schema.FLOAT_COLUMNS:
+            # Same precision as the pandas dtype, so aggregates see the values the in-memory path stores
+            sql_type = "FLOAT" if schema.FLOAT_COLUMNS[col] == "float32" else "DOUBLE"
+            columns.append((col, f"TRY_CAST({quoted} AS {sql_type})"))
+        else:
+            columns.append((col, quoted))
+    return columns
+
+
+def connect():
+    """Returns an in-memory DuckDB connection configured from the environment."""
+    if duckdb is None:
+        raise ImportError("SLEEP_INGEST=duckdb needs the duckdb package (pip install duckdb)")
+    con = duckdb.connect()
+    con.execute(f"SET threads = {parallel.worker_count()}")
+    con.execute(f"SET temp_directory = {_literal(os.environ.get('SLEEP_DUCKDB_TEMP') or tempfile.gettempdir())}")
+    # Aggregates do not depend on row order, and dropping it lets large scans stream
+    con.execute("SET preserve_insertion_order = false")
+    memory_limit = os.environ.get("SLEEP_DUCKDB_MEMORY")
+    if memory_limit:
+        con.execute(f"SET memory_limit = {_literal(memory_limit)}")
+    return con
+
+
+def register_source(con, path):
+    """Exposes path as the typed TABLE relation; returns its column names in schema order."""
+    relation = source_relation(path)
+    raw_columns = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {relation}").fetchall()]
+    columns = typed_columns(raw_columns)
+    select = ", ".join(f"{expression} AS {_identifier(name)}" for name, expression in columns)
+    # Parquet is already columnar; CSV text is parsed once instead of once per query
+    kind = "VIEW" if relation.startswith("read_parquet") else "TEMP TABLE"
+    con.execute(f"CREATE OR REPLACE {kind} {TABLE} AS SELECT {select} FROM {relation}")
+    return [name for name, _ in columns]
+
+
+# --- Queries ---
+
+def _frame(con, sql):
+    return con.execute(sql).df()
+
+
+def describe_columns(con, numeric):
+    """Returns (row count, describe(include=np.number).transpose()) from one scan."""
+    parts = ["count(*)"]
+    for col in numeric:
+        c = _identifier(col)
+        parts += [f"count({c})", f"avg({c})", f"stddev_samp({c})", f"min({c})",
+                  f"quantile_cont({c}, [0.25, 0.5, 0.75])", f"max({c})"]
+    row = con.execute(f"SELECT {', '.join(parts)} FROM {TABLE}").fetchone()
+    rows, values = row[0], row[1:]
+    describe = {}
+    for i, col in enumerate(numeric):
+        count, mean, std, minimum, quartiles, maximum = values[i * 6:(i + 1) * 6]
+        quartiles = quartiles or [None] * 3
+        describe[col] = [count, mean, std, minimum, *quartiles, maximum]
+    index = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+    table = pd.DataFrame(describe, index=index, dtype="float64").transpose()
+    return rows, table
+
+
+def non_null_counts(con, columns):
+    """Returns {column: non-null count}."""
+    row = con.execute(f"SELECT {', '.join(f'count({_identifier(col)})' for col in columns)} FROM {TABLE}").fetchone()
+    return dict(zip(columns, row))
+
+
+def value_counts(con, column):
+    """Returns counts per label, most frequent first like Series.value_counts()."""
+    c = _identifier(column)
+    counts = _frame(con, f"SELECT {c} AS label, count(*) AS n FROM {TABLE} WHERE {c} IS NOT NULL "
+                         f"GROUP BY {c} ORDER BY n DESC, label")
+    return pd.Series(counts["n"].to_numpy(dtype="int64"), index=pd.Index(counts["label"], name=column), name="count")
+
+
+def occupation_quality_mean(con):
+    """Returns the mean Quality of Sleep per Occupation, sorted by Occupation."""
+    result = _frame(con, f'SELECT "Occupation", avg("Quality of Sleep") AS "Quality of Sleep" FROM {TABLE} '
+                         f'WHERE "Occupation" IS NOT NULL GROUP BY "Occupation" ORDER BY "Occupation"')
+    return result.astype({"Quality of Sleep": "float64"})
+
+
+def bin_expression(spec):
+    """Returns the SQL CASE equivalent of binning.bin_codes for a fixed-edge BinSpec (labels instead of codes)."""
+    c = _identifier(spec.column)
+    edges, labels = list(spec.edges), spec.labels()
+    cases = [f"WHEN {c} < {edges[0]} THEN {_literal(labels[0])}"]
+    cases += [f"WHEN {c} < {high} THEN {_literal(label)}" for high, label in zip(edges[1:], labels[1:])]
+    return f"CASE {' '.join(cases)} WHEN {c} IS NOT NULL THEN {_literal(labels[-1])} END"
+
+
+def quality_by_age(con):
+    """Returns the Age_Group x Quality of Sleep crosstab with integer counts."""
+    cells = _frame(con, f'SELECT {bin_expression(AGE_GROUPS)} AS age_group, "Quality of Sleep" AS quality, '
+                        f'count(*) AS n FROM {TABLE} WHERE age_group IS NOT NULL AND quality IS NOT NULL GROUP BY ALL')
+    table = cells.pivot(index="age_group", columns="quality", values="n").fillna(0)
+    table = table.reindex([label for label in AGE_LABELS if label in table.index])
+    table = table.reindex(sorted(table.columns), axis=1)
+    table.columns = pd.Index(table.columns.astype("int64"), name="Quality of Sleep")
+    table.index = pd.CategoricalIndex(table.index, categories=AGE_LABELS, ordered=True, name="Age_Group")
+    return table.astype("int64")
+
+
+def pair_counts(con, column, by):
+    """Returns the row count of each (column value, by value) pair, like streaming.pair_counts."""
+    x, y = _identifier(column), _identifier(by)
+    cells = _frame(con, f"SELECT {x} AS x, {y} AS y, count(*) AS n FROM {TABLE} "
+                        f"WHERE {x} IS NOT NULL AND {y} IS NOT NULL GROUP BY ALL ORDER BY x, y")
+    index = pd.MultiIndex.from_arrays([cells["x"].to_numpy(), cells["y"].to_numpy()], names=[column, by])
+    return pd.Series(cells["n"].to_numpy(dtype="int64"), index=index)
+
+
+def correlation_engine(con, columns):
+    """Returns a CorrelationEngine filled from SQL co-moments and pair counts."""
+    quoted = [_identifier(col) for col in columns]
+    # Each pair over the rows where both columns are present, like CoMoments.from_array
+    k = len(columns)
+    cells = [(i, j) for i in range(k) for j in range(i, k)]
+    parts = []
+    for i, j in cells:
+        both = f"FILTER (WHERE {quoted[i]} IS NOT NULL AND {quoted[j]} IS NOT NULL)"
+        parts += [f"count(*) {both}", f"avg({quoted[i]}) {both}", f"avg({quoted[j]}) {both}",
+                  f"var_pop({quoted[i]}) {both}", f"var_pop({quoted[j]}) {both}",
+                  f"covar_pop({quoted[i]}, {quoted[j]}) {both}"]
+    row = iter(con.execute(f"SELECT {', '.join(parts)} FROM {TABLE}").fetchone())
+    comoments = CoMoments(columns)
+    for i, j in cells:
+        n, mean_i, mean_j, var_i, var_j, cov = (next(row) for _ in range(6))
+        if n:
+            comoments.n[i, j] = comoments.n[j, i] = n
+            comoments.mean[i, j], comoments.mean[j, i] = mean_i, mean_j
+            comoments.ss[i, j], comoments.ss[j, i] = var_i * n, var_j * n
+            comoments.m2[i, j] = comoments.m2[j, i] = cov * n
+
+    # Pairwise value counts for Spearman; a pair past PAIR_CELL_LIMIT cells is not tracked
+    pairs = {}
+    for i, a in enumerate(columns):
+        for b in columns[i + 1:]:
+            x, y = _identifier(a), _identifier(b)
+            cells = _frame(con, f"SELECT {x} AS x, {y} AS y, count(*) AS n FROM {TABLE} "
+                                f"WHERE {x} IS NOT NULL AND {y} IS NOT NULL GROUP BY ALL LIMIT {PAIR_CELL_LIMIT + 1}")
+            if len(cells) > PAIR_CELL_LIMIT:
+                pairs[(a, b)] = None
+            else:
+                index = pd.MultiIndex.from_arrays([cells["x"].to_numpy(), cells["y"].to_numpy()])
+                pairs[(a, b)] = pd.Series(cells["n"].to_numpy(dtype="float64"), index=index)
+    return CorrelationEngine.from_parts(comoments, pairs)
+
+
+def group_sketches(con, column, by, compression):
+    """Returns {group: QuantileSketch of column} from per-group value counts, groups in sorted order."""
+    value, group = _identifier(column), _identifier(by)
+    counts = _frame(con, f"SELECT {group} AS grp, {value} AS value, count(*) AS n FROM {TABLE} "
+                         f"WHERE {group} IS NOT NULL AND {value} IS NOT NULL GROUP BY ALL ORDER BY grp, value")
+    return {
+        str(label): sketches.QuantileSketch.from_counts(part["value"].to_numpy(dtype="float64"),
+                                                        part["n"].to_numpy(), compression)
+        for label, part in counts.groupby("grp", sort=True)
+    }
+
+
+def pandas_dtype(column, non_null, rows, minimum=None, maximum=None):
+    """Returns the dtype schema.apply_schema gives the column, for the Column Information table."""
+    if column in schema.CATEGORY_COLUMNS:
+        return "category"
+    if column in schema.FLOAT_COLUMNS:
+        return schema.FLOAT_COLUMNS[column]
+    if column in (schema.SYSTOLIC_COLUMN, schema.DIASTOLIC_COLUMN):
+        dtype = schema.BLOOD_PRESSURE_DTYPE
+    elif column in schema.INTEGER_COLUMNS:
+        dtype = schema.INTEGER_COLUMNS[column]
+    else:
+        return "object"
+    info = np.iinfo(dtype)
+    if minimum is not None and (minimum < info.min or maximum > info.max):
+        dtype = "int64"
+    return dtype.capitalize() if non_null < rows else dtype
+
+
+def build_summary(con, version=""):
+    """Computes the DatasetSummary of the registered TABLE with SQL aggregates."""
+    columns = [row[0] for row in con.execute(f"DESCRIBE {TABLE}").fetchall()]
+    numeric = [col for col in columns if col in schema.INTEGER_COLUMNS or col in schema.FLOAT_COLUMNS
+               or col in (schema.SYSTOLIC_COLUMN, schema.DIASTOLIC_COLUMN)]
+    rows, describe = describe_columns(con, numeric)
+    non_null = non_null_counts(con, columns)
+
+    column_info = pd.DataFrame({
+        'Column Name': columns,
+        'Data Type': [pandas_dtype(col, non_null[col], rows,
+                                   *(describe.loc[col, ["min", "max"]] if col in describe.index else ()))
+                      for col in columns],
+        'Non-Null Count': [int(non_null[col]) for col in columns],
+    })
+
+    gender_counts = value_counts(con, "Gender")
+    occupation_counts = value_counts(con, "Occupation")
+    correlation = correlation_engine(con, [col for col in CORRELATION_COLUMNS if col in columns])
+    compression = sketches.configured_compression()
+
+    return DatasetSummary(
+        version=version,
+        total_respondents=int(rows),
+        avg_age=float(describe.loc["Age", "mean"]),
+        gender_share=(gender_counts / gender_counts.sum()).to_dict(),
+        most_common_occupation=mode_label(occupation_counts),
+        unique_occupations=int((occupation_counts > 0).sum()),
+        occupation_counts=occupation_counts,
+        describe=describe,
+        column_info=column_info,
+        occupation_quality_mean=occupation_quality_mean(con),
+        quality_by_age=quality_by_age(con),
+        quality_heart_rate_corr=correlation.pearson(['Quality of Sleep', 'Heart Rate']),
+        correlation=correlation,
+        group_sketches={(column, by): group_sketches(con, column, by, compression)
+                        for column, by in sketches.SKETCH_GROUPS if column in columns and by in columns},
+        pair_counts={(column, by): pair_counts(con, column, by)
+                     for column, by in PAIR_COUNTS if column in columns and by in columns},
+    )
+
+
+def summarize_file(path, version=""):
+    """Returns the DatasetSummary of a local CSV or Parquet file, computed by DuckDB."""
+    with connect() as con:
+        register_source(con, path)
+        return build_summary(con, version)
+
+
+# One open database per file version, so the summary and every later page query share the parsed table
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_database(path, version):
+    con = connect()
+    register_source(con, path)
+    # A DuckDB connection runs one statement at a time; sessions take turns
+    return con, threading.Lock()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_sql(path, version):
+    con, lock = _cached_database(path, version)
+    with lock:
+        return build_summary(con, version)
+
+
+def file_pair_counts(path, column, by):
+    """Returns pair_counts of column and by for a local file, from its open database."""
+    con, lock = _cached_database(path, sleep_data.data_version(path))
+    with lock:
+        return pair_counts(con, column, by)
+
+
+def sql_summary(path=None):
+    """Returns the SQL-computed DatasetSummary of the configured file, cached per file version."""
+    path = path or sleep_data.data_path()
+    return _cached_sql(path, sleep_data.data_version(path))
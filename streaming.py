@@ -0,0 +1,351 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import schema
+import sketches
+import sleep_data
+from aggregates import AGE_LABELS, PAIR_COUNTS, DatasetSummary, mode_label
+from binning import AGE_GROUPS, binned
+from correlation import CORRELATION_COLUMNS, CorrelationEngine
+
+
+# --- Streaming / Chunked Ingestion ---
+# The CSV is read in chunks and every dashboard aggregate is updated chunk by
+# chunk, so peak memory is bounded by the chunk size rather than the dataset.
+# All partial results are mergeable: two aggregates built over disjoint rows
+# combine into the aggregate of their union.
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Exact value counts are kept per numeric column for describe() quantiles while
+# the column has at most this many distinct values (ages, scores, steps, ...).
+DISTINCT_LIMIT = 10_000
+
+GROUP_COLUMNS = ["Gender", "Occupation"]
+GROUP_METRIC = "Quality of Sleep"
+
+
+class ColumnStats:
+    """Mergeable count/sum/variance/min/max for one numeric column.
+
+    Exact value counts are kept while the column stays under DISTINCT_LIMIT
+    distinct values, which makes describe()'s quantiles exact as well.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.value_counts = pd.Series(dtype="int64")
+
+    @classmethod
+    def from_series(cls, series):
+        result = cls()
+        series = series.dropna()
+        values = series.to_numpy(dtype="float64")
+        if len(values):
+            result.count = len(values)
+            # Integer columns keep an exact integer total, so the mean does not
+            # depend on how rows were split into chunks or partitions
+            if pd.api.types.is_integer_dtype(series.dtype):
+                result.total = int(series.to_numpy(dtype="int64").sum())
+            else:
+                result.total = math.fsum(values)
+            result.m2 = float(((values - result.mean) ** 2).sum())
+            result.min = values.min()
+            result.max = values.max()
+            result.value_counts = series.value_counts()
+        return result
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other):
+        """Folds another ColumnStats into this one."""
+        if other.count == 0:
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.total += other.total
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.value_counts is None or other.value_counts is None:
+            self.value_counts = None
+        else:
+            merged = self.value_counts.add(other.value_counts, fill_value=0)
+            self.value_counts = merged if len(merged) <= DISTINCT_LIMIT else None
+        return self
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+    def quantile(self, q):
+        """Returns the q-quantile with pandas' linear interpolation, or NaN without value counts."""
+        if self.value_counts is None or self.count == 0:
+            return math.nan
+        counts = self.value_counts.sort_index()
+        values = counts.index.to_numpy(dtype="float64")
+        cumulative = np.cumsum(counts.to_numpy())
+        position = q * (self.count - 1)
+        lower = int(math.floor(position))
+        upper = min(lower + 1, self.count - 1)
+        low_value = values[np.searchsorted(cumulative, lower, side="right")]
+        high_value = values[np.searchsorted(cumulative, upper, side="right")]
+        return low_value + (position - lower) * (high_value - low_value)
+
+    def describe(self):
+        """Returns the same statistics, in the same order, as Series.describe()."""
+        return {
+            "count": float(self.count),
+            "mean": self.mean if self.count else math.nan,
+            "std": self.std,
+            "min": self.min if self.count else math.nan,
+            "25%": self.quantile(0.25),
+            "50%": self.quantile(0.5),
+            "75%": self.quantile(0.75),
+            "max": self.max if self.count else math.nan,
+        }
+
+
+def _add(left, right):
+    """Adds two count tables, treating labels missing on one side as zero."""
+    if left is None:
+        return right
+    # Cells whose row and column each appear on only one side are still NaN after add()
+    return left.add(right, fill_value=0).fillna(0)
+
+
+def _merge_dtypes(left, right):
+    """Returns the dtype names schema.apply_schema gives the union of two typed chunks.
+
+    A chunk only sees its own values, so one chunk may keep int8 where another
+    widened to int64, turned nullable (Int8) or fell back to float64.
+    """
+    if left is None:
+        return dict(right)
+    merged = dict(left)
+    for col, dtype in right.items():
+        current = merged.setdefault(col, dtype)
+        if current == dtype:
+            continue
+        try:
+            promoted = np.result_type(current.lower(), dtype.lower()).name
+        except TypeError:
+            merged[col] = "object"
+            continue
+        # Nullable integers stay nullable when widened, as in schema._fit_integer
+        nullable = current[0].isupper() or dtype[0].isupper()
+        merged[col] = promoted.capitalize() if nullable and promoted.startswith("int") else promoted
+    return merged
+
+
+def _count_table(rows, columns):
+    """Returns crosstab-style counts of (rows, columns) pairs via one groupby."""
+    return rows.groupby([rows, columns], observed=True).size().unstack(fill_value=0)
+
+
+def pair_counts(chunk, column, by):
+    """Returns the row count of each (column value, by value) pair, category labels as strings."""
+    counts = chunk.groupby([column, by], observed=True).size()
+    counts.index = pd.MultiIndex.from_arrays(
+        [level.astype(str) if isinstance(level.dtype, pd.CategoricalDtype) else level
+         for level in (counts.index.get_level_values(i) for i in range(2))], names=[column, by])
+    return counts
+
+
+class StreamingAggregates:
+    """Every dashboard aggregate, built incrementally from typed chunks."""
+
+    def __init__(self):
+        self.rows = 0
+        self.dtypes = None
+        self.non_null = None
+        self.category_counts = {}
+        self.group_stats = {}
+        self.pair_counts = {}
+        self.quality_by_age = None
+        self.column_stats = {}
+        self.correlation = None
+        self.sketches = {}
+
+    def update(self, chunk):
+        """Adds one typed chunk (see schema.iter_csv) to the aggregates."""
+        self.dtypes = _merge_dtypes(self.dtypes, {col: str(dtype) for col, dtype in chunk.dtypes.items()})
+        self.rows += len(chunk)
+        self.non_null = _add(self.non_null, chunk.count())
+
+        # Counts per category (Gender, Occupation, BMI Category, Sleep Disorder)
+        for col in schema.CATEGORY_COLUMNS:
+            if col in chunk:
+                counts = chunk[col].value_counts()
+                counts.index = counts.index.astype(str)
+                self.category_counts[col] = _add(self.category_counts.get(col), counts)
+
+        # Per-group count, sum and sum of squares of Quality of Sleep
+        metric = chunk[GROUP_METRIC].astype("float64")
+        moments = pd.DataFrame({"count": metric.notna().astype("int64"), "sum": metric, "sumsq": metric ** 2})
+        for col in GROUP_COLUMNS:
+            # Group on the category codes and only turn the few labels into strings
+            part = moments.groupby(chunk[col], observed=True).sum()
+            part.index = part.index.astype(str)
+            self.group_stats[col] = _add(self.group_stats.get(col), part)
+
+        # Pair counts behind the chart pages' default views (see file_aggregates.py);
+        # any Age histogram is derived from the Age per Gender counts
+        for column, by in PAIR_COUNTS:
+            self.pair_counts[(column, by)] = _add(self.pair_counts.get((column, by)), pair_counts(chunk, column, by))
+
+        # Age_Group x Quality of Sleep crosstab cells
+        age_group = binned(chunk['Age'], AGE_GROUPS)
+        self.quality_by_age = _add(self.quality_by_age, _count_table(age_group, chunk['Quality of Sleep']))
+
+        numeric = chunk.select_dtypes(include=np.number)
+        for col in numeric.columns:
+            stats = self.column_stats.setdefault(col, ColumnStats())
+            stats.merge(ColumnStats.from_series(numeric[col]))
+
+        # Co-moments and pairwise value counts for the correlation heatmap (all numeric measurements)
+        if self.correlation is None:
+            self.correlation = CorrelationEngine([col for col in CORRELATION_COLUMNS if col in numeric])
+        self.correlation.update(numeric)
+
+        # Per-group quantile sketches for the violin and box plots
+        for key, groups in sketches.sketch_groups(chunk).items():
+            self.sketches[key] = sketches.merge_group_sketches(self.sketches.get(key, {}), groups)
+        return self
+
+    def merge(self, other):
+        """Folds aggregates built over other rows into this one."""
+        if other.rows == 0:
+            return self
+        if self.rows == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        self.rows += other.rows
+        self.dtypes = _merge_dtypes(self.dtypes, other.dtypes)
+        self.non_null = _add(self.non_null, other.non_null)
+        for col, counts in other.category_counts.items():
+            self.category_counts[col] = _add(self.category_counts.get(col), counts)
+        for col, stats in other.group_stats.items():
+            self.group_stats[col] = _add(self.group_stats.get(col), stats)
+        for key, counts in other.pair_counts.items():
+            self.pair_counts[key] = _add(self.pair_counts.get(key), counts)
+        self.quality_by_age = _add(self.quality_by_age, other.quality_by_age)
+        for col, stats in other.column_stats.items():
+            self.column_stats.setdefault(col, ColumnStats()).merge(stats)
+        self.correlation.merge(other.correlation)
+        for key, groups in other.sketches.items():
+            self.sketches[key] = sketches.merge_group_sketches(self.sketches.get(key, {}), groups)
+        return self
+
+    # --- Derived results ---
+
+    def value_counts(self, column):
+        """Returns counts per category, most frequent first like Series.value_counts()."""
+        counts = self.category_counts[column].astype("int64")
+        return counts.sort_values(ascending=False, kind="stable").rename("count").rename_axis(column)
+
+    def group_means(self, column):
+        """Returns the mean Quality of Sleep per group of column."""
+        stats = self.group_stats[column]
+        return (stats["sum"] / stats["count"]).rename(GROUP_METRIC).rename_axis(column)
+
+    def age_histogram(self, bins=20):
+        """Returns (counts, edges) of the Age histogram, as np.histogram would on the raw column."""
+        ages = self.pair_counts[("Age", "Gender")].groupby(level=0).sum()
+        return np.histogram(ages.index.to_numpy(dtype="float64"), bins=bins, weights=ages.to_numpy())
+
+    def describe(self):
+        """Returns describe(include=np.number).transpose() for the streamed rows."""
+        return pd.DataFrame({col: stats.describe() for col, stats in self.column_stats.items()}).transpose()
+
+    def crosstab_quality_by_age(self):
+        """Returns the Age_Group x Quality of Sleep crosstab with integer counts."""
+        table = self.quality_by_age
+        table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        table = table.reindex([label for label in AGE_LABELS if label in table.index])
+        table = table.reindex(sorted(table.columns), axis=1)
+        table.index = pd.CategoricalIndex(table.index, categories=AGE_LABELS, ordered=True, name='Age_Group')
+        return table.astype("int64")
+
+    def to_summary(self, version=""):
+        """Returns a DatasetSummary equivalent to aggregates.build_summary on the full data."""
+        gender_counts = self.value_counts("Gender")
+        occupation_counts = self.value_counts("Occupation")
+
+        column_info = pd.DataFrame({
+            'Column Name': list(self.dtypes),
+            'Data Type': list(self.dtypes.values()),
+            'Non-Null Count': [int(self.non_null.get(col, 0)) for col in self.dtypes],
+        })
+
+        occupation_quality_mean = (
+            self.group_means('Occupation')
+            .reset_index()
+            .sort_values(by='Occupation')
+        )
+
+        return DatasetSummary(
+            version=version,
+            total_respondents=self.rows,
+            avg_age=self.column_stats["Age"].mean,
+            gender_share=(gender_counts / gender_counts.sum()).to_dict(),
+            most_common_occupation=mode_label(occupation_counts),
+            unique_occupations=int((occupation_counts > 0).sum()),
+            occupation_counts=occupation_counts,
+            describe=self.describe(),
+            column_info=column_info,
+            occupation_quality_mean=occupation_quality_mean,
+            quality_by_age=self.crosstab_quality_by_age(),
+            quality_heart_rate_corr=self.correlation.pearson(['Quality of Sleep', 'Heart Rate']),
+            correlation=self.correlation,
+            group_sketches=self.sketches,
+            pair_counts={key: counts.astype("int64").sort_index() for key, counts in self.pair_counts.items()},
+        )
+
+
+def stream_csv(path, chunksize=DEFAULT_CHUNK_ROWS):
+    """Reads a CSV export chunk by chunk and returns its StreamingAggregates."""
+    result = StreamingAggregates()
+    for chunk in schema.iter_csv(path, chunksize):
+        result.update(chunk)
+    return result
+
+
+def stream_pair_counts(path, column, by, chunksize=DEFAULT_CHUNK_ROWS):
+    """Returns the (column value, by value) row counts of a CSV export in one chunked pass."""
+    # Systolic and Diastolic BP are split from the Blood Pressure text column
+    raw = {schema.SYSTOLIC_COLUMN: schema.BLOOD_PRESSURE_COLUMN, schema.DIASTOLIC_COLUMN: schema.BLOOD_PRESSURE_COLUMN}
+    usecols = list(dict.fromkeys(raw.get(col, col) for col in (column, by)))
+    result = None
+    for chunk in schema.iter_csv(path, chunksize, usecols=usecols):
+        result = _add(result, pair_counts(chunk, column, by))
+    if result is None:
+        return pd.Series(dtype="int64", index=pd.MultiIndex.from_arrays([[], []], names=[column, by]))
+    return result.astype("int64").sort_index()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _cached_stream(path, version, chunksize):
+    import parallel  # imported lazily: parallel imports this module
+
+    if parallel.worker_count() > 1:
+        # Each worker streams its own byte range of the file
+        return parallel.aggregate_file(path, chunksize=chunksize).to_summary(version)
+    return stream_csv(path, chunksize).to_summary(version)
+
+
+def stream_summary(path=None):
+    """Returns the DatasetSummary of the configured CSV without ever loading it whole, cached per version."""
+    path = path or sleep_data.data_path()
+    chunksize = int(os.environ.get("SLEEP_CHUNK_ROWS", DEFAULT_CHUNK_ROWS))
+    return _cached_stream(path, sleep_data.data_version(path), chunksize)
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+
+def assert_summary_equal(result, expected, rtol=1e-12):
+    """Asserts that two DatasetSummary objects of the same rows agree, floats to rtol."""
+    assert result.total_respondents == expected.total_respondents
+    assert result.avg_age == pytest.approx(expected.avg_age, rel=rtol, nan_ok=True)
+    assert result.gender_share.keys() == expected.gender_share.keys()
+    for label, share in expected.gender_share.items():
+        assert result.gender_share[label] == pytest.approx(share, rel=rtol)
+    assert result.most_common_occupation == expected.most_common_occupation
+    assert result.unique_occupations == expected.unique_occupations
+    pd.testing.assert_series_equal(result.occupation_counts, expected.occupation_counts, check_dtype=False,
+                                   check_index_type=False, check_categorical=False)
+    pd.testing.assert_frame_equal(result.describe, expected.describe, rtol=rtol)
+    pd.testing.assert_frame_equal(result.column_info, expected.column_info, check_dtype=False)
+    pd.testing.assert_frame_equal(result.occupation_quality_mean, expected.occupation_quality_mean, rtol=rtol,
+                                  check_dtype=False, check_categorical=False)
+    pd.testing.assert_frame_equal(result.quality_by_age, expected.quality_by_age, check_dtype=False,
+                                  check_categorical=False, check_index_type=False, check_column_type=False)
+    pd.testing.assert_frame_equal(result.quality_heart_rate_corr, expected.quality_heart_rate_corr, rtol=rtol)
+    for method in ("pearson", "spearman"):
+        pd.testing.assert_frame_equal(result.correlation.matrix(method), expected.correlation.matrix(method),
+                                      rtol=rtol)
+
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregates
+import appends
+import binning
+import comparison
+import density
+import filters
+import schema
+from tests.helpers import assert_summary_equal
+
+DATA = "cleaned_sleep_health_data.csv"
+
+
+@pytest.fixture
+def base():
+    df = schema.read_csv(DATA)
+    df.attrs["version"] = "test-base"
+    return df
+
+
+def raw_rows(ids, changes=None):
+    rows = pd.read_csv(DATA, dtype=str).iloc[:len(ids)].copy()
+    rows["Person ID"] = [str(i) for i in ids]
+    for (column, position), value in (changes or {}).items():
+        rows.loc[rows.index[position], column] = value
+    return rows
+
+
+def test_invalid_rows_are_rejected_and_new_labels_kept(base):
+    store = appends.AppendStore(base)
+    added = store.append(raw_rows([1001, 1002, 1003, 1004, 1005], {("Age", 0): "300", ("Occupation", 1): "Pilot"}))
+    assert added == 4 and store.rejected == 1
+    assert len(store.frame) == 159
+    assert isinstance(store.frame["Occupation"].dtype, pd.CategoricalDtype)
+    assert list(store.frame["Occupation"].cat.categories) == sorted(store.frame["Occupation"].cat.categories)
+    assert store.frame["Occupation"].iloc[-4] == "Pilot"
+    assert store.frame["Age"].dtype == base["Age"].dtype
+
+
+def test_known_person_ids_are_skipped(base):
+    store = appends.AppendStore(base)
+    assert store.append(raw_rows([4, 5, 1001])) == 1
+    assert store.append(raw_rows([1001, 1002])) == 1
+    assert store.frame["Person ID"].is_unique and len(store.frame) == len(base) + 2
+
+
+def test_incremental_summary_matches_a_rebuild(base):
+    store = appends.AppendStore(base)
+    store.append(raw_rows([1001, 1002, 1003, 1004, 1005], {("Age", 0): "300", ("Occupation", 1): "Pilot"}))
+    store.append(raw_rows([1006, 1007], {("Sleep Duration", 0): ""}))
+    assert_summary_equal(appends.incremental_summary(store.version), aggregates.build_summary(store.frame))
+
+
+def test_grown_file_is_read_from_its_last_offset(base, tmp_path):
+    store = appends.AppendStore(base)
+    path = tmp_path / "batch.csv"
+    raw_rows([1001, 1002], {("Age", 0): "300"}).to_csv(path, index=False)
+    store.refresh(str(tmp_path))
+    with open(path, "a") as f:
+        f.write(raw_rows([1003]).to_csv(index=False, header=False))
+    store.refresh(str(tmp_path))
+    assert len(store.frame) == len(base) + 2 and store.rejected == 1
+
+
+def test_derived_state_extends_like_a_rebuild(base):
+    store = appends.AppendStore(base)
+    version = store.version
+    specs = [binning.AGE_GROUPS, binning.make_spec("Daily Steps", "width", 1000)]
+    filters._cached_index(store.frame, version)
+    density._cached_table(store.frame, version, "Age", "Occupation")
+    for spec in specs:
+        binning._cached_codes(store.frame, version, spec)
+    comparison._cached_comparison(store.frame, version, "Occupation", "Sleep Duration")
+
+    store.append(raw_rows([1001, 1002, 1003], {("Occupation", 0): "Pilot", ("Age", 1): "17"}))
+    df, version = store.frame, store.version
+    rebuilt = df.copy()
+
+    index, expected = filters._cached_index(df, version), filters.FilterIndex(rebuilt)
+    assert index.levels == expected.levels
+    for column, bitmaps in expected.bitmaps.items():
+        for label, bits in bitmaps.items():
+            np.testing.assert_array_equal(index.bitmaps[column][label], bits)
+    np.testing.assert_array_equal(index.age_order, expected.age_order)
+    pd.testing.assert_frame_equal(density._cached_table(df, version, "Age", "Occupation"),
+                                  density.value_table(rebuilt, "Age", "Occupation"))
+    for spec in specs:
+        codes, labels, _ = binning._cached_codes(df, version, spec)
+        expected_codes, expected_labels, _ = binning.bin_codes(rebuilt[spec.column].to_numpy(dtype="float64"), spec)
+        np.testing.assert_array_equal(codes, expected_codes)
+        assert labels == expected_labels
+    result = comparison._cached_comparison(df, version, "Occupation", "Sleep Duration")
+    expected = comparison.compare(comparison.code_dimension(rebuilt, "Occupation"),
+                                  comparison.code_metric(rebuilt, "Sleep Duration"), "Occupation", "Sleep Duration")
+    pd.testing.assert_frame_equal(result.stats, expected.stats, rtol=1e-12)
+    pd.testing.assert_frame_equal(result.distribution, expected.distribution)
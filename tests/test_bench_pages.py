@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from benchmarks.bench_pages import compare, peak_rss_bytes, reset_peak_rss, span_stats
+
+
+def _report(sections, pages=None):
+    return {"results": {"1k": {"sections": {name: {"wall_s": wall} for name, wall in sections.items()},
+                               "pages": pages or {}}}}
+
+
+def test_short_sections_need_an_absolute_slowdown():
+    baseline = _report({"overview.metrics": 0.001, "objective1.figure1": 0.2})
+    current = _report({"overview.metrics": 0.003, "objective1.figure1": 0.3})
+    assert compare(current, baseline, tolerance=0.25) == ["1k objective1.figure1.wall_s: 0.200s -> 0.300s (+50%)"]
+
+
+def test_span_stats_take_the_median_run():
+    runs = [[{"name": "a", "wall_s": wall, "cpu_s": wall}] for wall in (0.1, 5.0, 0.2)]
+    runs[0].append({"name": "a", "wall_s": 0.1, "cpu_s": 0.1})
+    stats = span_stats(runs)
+    assert stats["a"]["wall_s"] == 0.2 and stats["a"]["min_wall_s"] == 0.2
+
+
+def test_peak_rss_covers_allocations_since_reset():
+    if not reset_peak_rss() or peak_rss_bytes() is None:
+        pytest.skip("peak RSS cannot be reset on this platform")
+    before = peak_rss_bytes()
+    block = np.ones(64 * 2 ** 20 // 8)
+    assert peak_rss_bytes() >= before + block.nbytes // 2
+    del block
+    reset_peak_rss()
+    assert peak_rss_bytes() < before + 32 * 2 ** 20
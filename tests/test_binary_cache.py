@@ -0,0 +1,19 @@
+import os
+import shutil
+
+import binary_cache
+import schema
+
+DATA = os.path.join(os.path.dirname(__file__), os.pardir, "cleaned_sleep_health_data.csv")
+
+
+def test_cache_is_rebuilt_after_a_schema_change(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "data.csv")
+    shutil.copy(DATA, csv_path)
+    binary_cache.load_csv(csv_path)
+    assert binary_cache.read_cached(csv_path) is not None
+
+    monkeypatch.setitem(schema.INTEGER_COLUMNS, "Age", "int16")
+    assert binary_cache.read_cached(csv_path) is None
+    assert binary_cache.load_csv(csv_path)["Age"].dtype == "int16"
+    assert binary_cache.read_cached(csv_path)["Age"].dtype == "int16"
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+import binning
+
+
+@pytest.mark.parametrize("width", [0.1, 1, 37, 2000])
+def test_no_overflow_bin_holds_in_range_values(width):
+    values = np.arange(3000, 10001, 100, dtype="float64")
+    codes, labels, edges = binning.bin_codes(values, binning.make_spec("Daily Steps", "width", width))
+    assert len(labels) <= binning.MAX_BINS
+    counts = np.bincount(codes, minlength=len(labels))
+    # Code 0 is below the first edge and the last code at or above the last edge
+    assert counts[0] == 0 and counts[-1] == 0
+    assert edges[0] <= values.min() and values.max() < edges[-1]
+
+
+def test_min_width_keeps_bins_within_limit():
+    width = binning.min_width(5.8, 8.5)
+    codes, labels, _ = binning.bin_codes(np.linspace(5.8, 8.5, 50), binning.make_spec("Sleep Duration", "width", width))
+    assert len(labels) <= binning.MAX_BINS
+    assert np.bincount(codes, minlength=len(labels))[-1] == 0
+
+
+def test_ages_outside_the_groups_are_kept():
+    codes, labels, _ = binning.bin_codes(np.array([17, 25, 64, np.nan]), binning.AGE_GROUPS)
+    assert [labels[code] for code in codes[:3]] == ["<20", "20-29", "60+"]
+    assert codes[3] == -1
+
+
+def test_weighted_quantiles_match_repeated_values():
+    values, weights = np.array([3.0, 1.0, 2.0, 5.0]), np.array([2, 1, 4, 3])
+    q = [0.2, 0.5, 0.9]
+    np.testing.assert_allclose(binning.weighted_quantiles(values, weights, q),
+                               np.quantile(np.repeat(values, weights), q))
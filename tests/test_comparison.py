@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+import comparison
+
+
+def test_bootstrap_past_distinct_limit():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"Gender": np.repeat(["Female", "Male"], 20_000),
+                       "Daily Steps": rng.normal(7000, 1500, 40_000)})
+    result = comparison.compare(comparison.code_dimension(df, "Gender"), comparison.code_metric(df, "Daily Steps"),
+                                "Gender", "Daily Steps")
+    assert result.distribution is None
+
+    boot = result.bootstrap_intervals()
+    t = result.mean_intervals("t")
+    np.testing.assert_allclose(boot["mean"], t["mean"])
+    np.testing.assert_allclose(boot[["low", "high"]], t[["low", "high"]], rtol=1e-3)
+
+
+def test_weighted_counts_match_rows():
+    df = pd.DataFrame({"Gender": ["Female", "Male", "Male", "Female", "Male"],
+                       "Quality of Sleep": [6, 7, 7, 8, 9]})
+    counts = df.groupby(["Gender", "Quality of Sleep"]).size()
+    expected = comparison.compare(comparison.code_dimension(df, "Gender"),
+                                  comparison.code_metric(df, "Quality of Sleep"), "Gender", "Quality of Sleep")
+    result = comparison.compare_counts(counts, "Gender", "Quality of Sleep")
+    pd.testing.assert_frame_equal(result.stats, expected.stats)
+    pd.testing.assert_frame_equal(result.distribution, expected.distribution)
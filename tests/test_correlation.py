@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import correlation
+import schema
+
+
+@pytest.fixture(scope="module")
+def frame():
+    df = schema.read_csv("cleaned_sleep_health_data.csv")
+    df = df.astype({col: "float64" for col in correlation.CORRELATION_COLUMNS})
+    df.loc[df.index[:31], "Daily Steps"] = np.nan
+    df.loc[df.index[-5:], "Heart Rate"] = np.nan
+    return df
+
+
+def test_pearson_matches_pandas_with_missing_values(frame):
+    engine = correlation.CorrelationEngine.from_frame(frame)
+    expected = frame[correlation.CORRELATION_COLUMNS].corr()
+    pd.testing.assert_frame_equal(engine.pearson(), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_merged_chunks_match_pandas(frame):
+    engine = correlation.CorrelationEngine.from_frame(frame.iloc[:20])
+    for start in range(20, len(frame), 45):
+        engine.merge(correlation.CorrelationEngine.from_frame(frame.iloc[start:start + 45]))
+    columns = correlation.CORRELATION_COLUMNS
+    pd.testing.assert_frame_equal(engine.pearson(), frame[columns].corr(), rtol=1e-12, atol=1e-12)
+    pd.testing.assert_frame_equal(engine.comoments.covariance(), frame[columns].cov(), rtol=1e-10)
+
+
+def test_spearman_matches_pandas(frame):
+    engine = correlation.CorrelationEngine.from_frame(frame)
+    expected = frame[correlation.CORRELATION_COLUMNS].corr("spearman")
+    pd.testing.assert_frame_equal(engine.spearman(), expected, rtol=1e-12, atol=1e-12)
+
+
+def test_mostly_missing_column_keeps_other_pairs(frame):
+    sparse = frame.copy()
+    sparse.loc[sparse.index[:151], "Daily Steps"] = np.nan
+    engine = correlation.CorrelationEngine.from_frame(sparse)
+    expected = sparse[correlation.CORRELATION_COLUMNS].corr()
+    assert engine.pearson().loc["Quality of Sleep", "Heart Rate"] == pytest.approx(
+        expected.loc["Quality of Sleep", "Heart Rate"], rel=1e-12)
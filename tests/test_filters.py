@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import filters
+import schema
+from benchmarks.synthetic import dataset_path
+
+
+@pytest.fixture(scope="module")
+def frame(tmp_path_factory):
+    df = schema.read_csv(dataset_path(5_003, str(tmp_path_factory.mktemp("data"))))
+    # Missing ages fall outside every age range, as with Series.between
+    df.loc[df.index[::50], "Age"] = None
+    return df
+
+
+def pandas_mask(df, categories, age_range):
+    mask = np.ones(len(df), dtype=bool)
+    for column, labels in categories.items():
+        mask &= df[column].isin(labels).to_numpy()
+    if age_range is not None:
+        mask &= df["Age"].between(*age_range).fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+@pytest.mark.parametrize("categories, age_range", [
+    ({}, None),
+    ({"Gender": ["Female"]}, None),
+    ({"Occupation": ["Nurse", "Doctor", "Engineer"], "BMI Category": ["Normal"]}, None),
+    ({}, (30, 45)),
+    ({"Gender": ["Male"], "Sleep Disorder": ["Insomnia", "Sleep Apnea"]}, (18, 40)),
+    ({"Occupation": []}, None),
+])
+def test_select_matches_pandas_mask(frame, categories, age_range):
+    index = filters.FilterIndex(frame)
+    selection = index.make_selection(categories, age_range)
+    rows = index.select(selection)
+    np.testing.assert_array_equal(rows, np.flatnonzero(pandas_mask(frame, categories, age_range)))
+
+
+@pytest.mark.parametrize("split", [8, 2_501, 4_999])
+def test_extended_index_matches_rebuilt_index(frame, split):
+    index = filters.FilterIndex(frame.iloc[:split]).extend(frame.iloc[split:])
+    rebuilt = filters.FilterIndex(frame)
+    categories, age_range = {"Gender": ["Female"], "BMI Category": ["Overweight", "Obese"]}, (25, 50)
+    selection = rebuilt.make_selection(categories, age_range)
+    np.testing.assert_array_equal(index.select(selection), rebuilt.select(selection))
+    np.testing.assert_array_equal(index.sorted_ages, rebuilt.sorted_ages)
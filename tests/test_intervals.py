@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import intervals
+
+
+# Reference values of the Student t quantile function (scipy.stats.t.ppf)
+@pytest.mark.parametrize("p, dof, expected", [
+    (0.975, 1, 12.706204736174698),
+    (0.975, 2, 4.302652729749464),
+    (0.975, 5, 2.570581835636314),
+    (0.975, 10, 2.2281388519862744),
+    (0.975, 30, 2.0422724563012378),
+    (0.975, 100, 1.9839715185235556),
+    (0.995, 10, 3.169272672616947),
+    (0.95, 20, 1.7247182429207857),
+    (0.025, 10, -2.2281388519862744),
+])
+def test_t_quantile_matches_reference(p, dof, expected):
+    assert intervals.t_quantile(p, dof) == pytest.approx(expected, rel=1e-9)
+
+
+@pytest.mark.parametrize("p", [0.6, 0.9, 0.975, 0.999])
+def test_t_quantile_closed_forms(p):
+    # One degree of freedom is the Cauchy distribution; two have an algebraic inverse
+    assert intervals.t_quantile(p, 1) == pytest.approx(math.tan(math.pi * (p - 0.5)), rel=1e-9)
+    assert intervals.t_quantile(p, 2) == pytest.approx((2 * p - 1) / math.sqrt(2 * p * (1 - p)), rel=1e-9)
+
+
+def test_mean_intervals_single_value_has_no_interval():
+    df = pd.DataFrame({"Gender": ["Male", "Male", "Male", "Female"], "Stress Level": [3, 5, 7, 4]})
+    result = intervals.mean_intervals(intervals.group_moments(df, "Gender", "Stress Level"))
+    assert result.loc["Male", "mean"] == 5
+    half_width = intervals.t_quantile(0.975, 2) * 2 / math.sqrt(3)
+    assert result.loc["Male", "high"] - 5 == pytest.approx(half_width)
+    assert np.isnan(result.loc["Female", "low"]) and np.isnan(result.loc["Female", "high"])
@@ -0,0 +1,26 @@
+import pytest
+
+import aggregates
+import parallel
+import schema
+from benchmarks.synthetic import dataset_path
+from tests.helpers import assert_summary_equal
+
+
+@pytest.fixture(scope="module")
+def frame(tmp_path_factory):
+    # Past streaming.DISTINCT_LIMIT rows, so Person ID quartiles come from fill_quartiles
+    return schema.read_csv(dataset_path(20_000, str(tmp_path_factory.mktemp("data"))))
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 7])
+def test_partitioned_merge_matches_build_summary(frame, parts):
+    partials = [parallel._aggregate_frame(frame.iloc[start:stop])
+                for start, stop in parallel.row_partitions(len(frame), parts)]
+    summary = parallel.fill_quartiles(parallel._merge(partials).to_summary(""), frame)
+    assert_summary_equal(summary, aggregates.build_summary(frame, ""))
+
+
+def test_process_pool_matches_build_summary(frame, monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_PARALLEL_ROWS", 0)
+    assert_summary_equal(parallel.summarize_frame(frame, "", workers=2), aggregates.build_summary(frame, ""))
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+import schema
+
+
+def test_missing_and_out_of_range_values_widen():
+    result = schema._fit_integer(pd.Series([30.0, np.nan, 300.0], name="Age"), "int8")
+    assert str(result.dtype) == "Int64"
+    assert result.tolist()[0] == 30 and result.tolist()[2] == 300 and pd.isna(result.iloc[1])
+
+
+def test_missing_values_in_range_stay_narrow():
+    result = schema._fit_integer(pd.Series([30.0, np.nan, 59.0], name="Age"), "int8")
+    assert str(result.dtype) == "Int8"
+
+
+def test_out_of_range_values_widen():
+    result = schema._fit_integer(pd.Series([30, 300], name="Age"), "int8")
+    assert result.dtype == "int64"
+    assert result.tolist() == [30, 300]
+
+
+def test_fractional_values_are_not_truncated():
+    result = schema._fit_integer(pd.Series([1.5, 7.0, np.nan], name="Quality of Sleep"), "int8")
+    assert result.dtype == "float64"
+    assert result.iloc[0] == 1.5
+
+
+def test_read_csv_keeps_dataset_loadable(tmp_path):
+    path = tmp_path / "ages.csv"
+    path.write_text("Person ID,Age,Quality of Sleep,Blood Pressure\n1,300,1.5,120/80\n2,,7,\n")
+    df = schema.read_csv(path)
+    assert df["Age"].tolist()[0] == 300
+    assert df["Quality of Sleep"].tolist()[0] == 1.5
+    assert df["Systolic BP"].tolist()[0] == 120 and pd.isna(df["Diastolic BP"].iloc[1])
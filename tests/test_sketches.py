@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import sketches
+
+QUANTILES = np.linspace(0, 1, 41)
+
+
+def merged(values, parts, compression):
+    result = sketches.QuantileSketch(compression)
+    for part in np.array_split(values, parts):
+        result.merge(sketches.QuantileSketch.from_values(part, compression))
+    return result
+
+
+@pytest.mark.parametrize("parts", [1, 3, 8])
+def test_quantiles_are_exact_below_compression(parts):
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 150, 10_000).astype("float64")
+    values[::97] = np.nan
+    sketch = merged(values, parts, compression=200)
+    assert sketch.exact
+    np.testing.assert_array_equal(sketch.quantile(QUANTILES), np.nanquantile(values, QUANTILES))
+    assert sketch.count == np.count_nonzero(~np.isnan(values))
+    assert sketch.std() == pytest.approx(np.nanstd(values, ddof=1), rel=1e-12)
+
+
+@pytest.mark.parametrize("parts", [1, 7])
+def test_quantile_rank_error_above_compression(parts):
+    rng = np.random.default_rng(1)
+    values = rng.normal(7, 1.2, 50_000)
+    compression = 100
+    sketch = merged(values, parts, compression)
+    assert not sketch.exact and len(sketch.means) <= compression
+    estimates = sketch.quantile(QUANTILES)
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+    # Rank error stays within about 1/compression
+    np.testing.assert_allclose(ranks, QUANTILES, atol=1 / compression)
+    assert estimates[0] == values.min() and estimates[-1] == values.max()
+
+
+def test_sketch_round_trips_through_dict():
+    sketch = sketches.QuantileSketch.from_values(np.random.default_rng(2).normal(size=5_000), 50)
+    restored = sketches.QuantileSketch.from_dict(sketch.to_dict())
+    np.testing.assert_array_equal(restored.quantile(QUANTILES), sketch.quantile(QUANTILES))
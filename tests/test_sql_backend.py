@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+import aggregates
+import schema
+from benchmarks.synthetic import dataset_path
+from tests.helpers import assert_summary_equal
+
+pytest.importorskip("duckdb")
+import sql_backend  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def csv_path(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("data")
+    raw = pd.read_csv(dataset_path(3_000, str(directory)))
+    # Missing values make nullable integer columns and pairwise correlations
+    raw.loc[::37, "Heart Rate"] = None
+    raw.loc[::53, "Sleep Duration"] = None
+    path = directory / "survey.csv"
+    raw.to_csv(path, index=False)
+    return str(path)
+
+
+def test_sql_summary_matches_build_summary(csv_path):
+    expected = aggregates.build_summary(schema.read_csv(csv_path), "")
+    assert_summary_equal(sql_backend.summarize_file(csv_path, ""), expected, rtol=1e-10)
+
+
+def test_sql_pair_counts_match_pandas(csv_path):
+    df = schema.read_csv(csv_path)
+    with sql_backend.connect() as con:
+        sql_backend.register_source(con, csv_path)
+        counts = sql_backend.pair_counts(con, "Age", "Gender")
+    expected = df.groupby(["Age", "Gender"], observed=True).size()
+    assert counts.astype("int64").to_dict() == {(int(age), gender): n for (age, gender), n in expected.items()}
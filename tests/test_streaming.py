@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+import aggregates
+import schema
+import streaming
+from benchmarks.synthetic import dataset_path
+from tests.helpers import assert_summary_equal
+
+
+@pytest.fixture(scope="module")
+def csv_path(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("data")
+    raw = pd.read_csv(dataset_path(2_000, str(directory)))
+    # Only the last chunk needs a nullable Heart Rate and a wider Age
+    raw.loc[1_900:1_950, "Heart Rate"] = None
+    raw.loc[1_990, "Age"] = 300
+    path = directory / "widened.csv"
+    raw.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunksize", [500, 1_000, 5_000])
+def test_stream_csv_matches_build_summary(csv_path, chunksize):
+    expected = aggregates.build_summary(schema.read_csv(csv_path), "")
+    assert_summary_equal(streaming.stream_csv(csv_path, chunksize).to_summary(""), expected)
+
+
+def test_merged_streams_widen_dtypes(csv_path):
+    chunks = list(schema.iter_csv(csv_path, 500))
+    left = streaming.StreamingAggregates().update(chunks[0])
+    right = streaming.StreamingAggregates()
+    for chunk in chunks[1:]:
+        right.update(chunk)
+    dtypes = left.merge(right).dtypes
+    assert dtypes["Heart Rate"] == "Int16"
+    assert dtypes["Age"] == "int64"
+    assert dtypes == {col: str(dtype) for col, dtype in schema.read_csv(csv_path).dtypes.items()}
@@ -0,0 +1,304 @@
+import colorsys
+import dataclasses
+import json
+
+import numpy as np
+import pandas as pd
+
+
+# --- Client-side Chart Specs ---
+# With SLEEP_CHART_BACKEND=vega every dashboard figure is sent as a Vega-Lite
+# spec instead of a PNG. Each function below takes the same precomputed data
+# as its namesake in charts.py (histogram bins, group means and intervals,
+# crosstab cells, box statistics, correlation matrices) and embeds only those
+# few rows in the spec, so the browser draws the chart and the server never
+# runs matplotlib. Colors follow the seaborn "deep" palette the PNG charts use.
+DEEP_PALETTE = ["#4C72B0", "#DD8452", "#55A868", "#C44E52", "#8172B3",
+                "#937860", "#DA8BC3", "#8C8C8C", "#CCB974", "#64B5CD"]
+ERROR_BAR_COLOR = "#424242"
+HEIGHT = 400
+
+
+def _hex(rgb):
+    return "#" + "".join(f"{round(channel * 255):02x}" for channel in rgb)
+
+
+def _fill_color():
+    """Returns seaborn's desaturated first palette color used by categorical charts."""
+    h, l, s = colorsys.rgb_to_hls(*(int(DEEP_PALETTE[0][i:i + 2], 16) / 255 for i in (1, 3, 5)))
+    return _hex(colorsys.hls_to_rgb(h, l, s * .75))
+
+
+def _line_color(fill):
+    """Returns seaborn's "auto" outline gray for a fill color."""
+    lightness = colorsys.rgb_to_hls(*(int(fill[i:i + 2], 16) / 255 for i in (1, 3, 5)))[1] * .6
+    return _hex((lightness, lightness, lightness))
+
+
+def _records(frame):
+    """Returns JSON-ready rows, with missing values as null."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def _palette(labels):
+    return {"domain": [str(label) for label in labels],
+            "range": [DEEP_PALETTE[i % len(DEEP_PALETTE)] for i in range(len(labels))]}
+
+
+def _spec(title, layers, data=None, **extra):
+    spec = {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "title": title,
+        "height": HEIGHT,
+        **extra,
+    }
+    if data is not None:
+        spec["data"] = {"values": data}
+    if len(layers) == 1:
+        spec.update(layers[0])
+    else:
+        spec["layer"] = layers
+    return spec
+
+
+def _position_axis(labels, title):
+    """Returns an x encoding placing groups at 0..n-1, for marks positioned by computed offsets."""
+    return {
+        "type": "quantitative",
+        "title": title,
+        "scale": {"domain": [-.5, len(labels) - .5], "nice": False, "zero": False},
+        "axis": {"values": list(range(len(labels))), "grid": False,
+                 "labelExpr": f"{json.dumps([str(label) for label in labels])}[datum.value]"},
+    }
+
+
+# --- Histograms ---
+
+def _histogram(dist, groups, title, y_title, kde=False, legend_title=None):
+    opacity = .5 if kde else .75
+    # Like seaborn, the last group sits at the bottom of the stack
+    bars = pd.DataFrame([
+        {"start": start, "end": end, "group": str(group), "count": count, "stack": len(groups) - i}
+        for i, group in enumerate(groups)
+        for start, end, count in zip(dist.edges[:-1], dist.edges[1:], dist.counts[group])
+    ])
+    color = {"field": "group", "type": "nominal", "scale": _palette(groups),
+             "legend": {"title": legend_title} if legend_title else None}
+    layers = [{
+        "data": {"values": _records(bars)},
+        "mark": {"type": "bar", "opacity": opacity, "stroke": "white", "strokeWidth": .5},
+        "encoding": {
+            "x": {"field": "start", "type": "quantitative", "title": dist.column, "scale": {"zero": False}},
+            "x2": {"field": "end"},
+            "y": {"field": "count", "type": "quantitative", "title": y_title, "stack": "zero"},
+            "color": color,
+            "order": {"field": "stack"},
+        },
+    }]
+    if kde:
+        bottom, curves = np.zeros(len(dist.support)), []
+        for group in reversed(groups):
+            if group not in dist.density or dist.density[group].isna().any():
+                continue
+            bottom = bottom + dist.density[group].to_numpy()
+            curves += [{"x": x, "y": y, "group": str(group)} for x, y in zip(dist.support, bottom)]
+        layers.append({
+            "data": {"values": curves},
+            "mark": {"type": "line"},
+            "encoding": {
+                "x": {"field": "x", "type": "quantitative"},
+                "y": {"field": "y", "type": "quantitative", "stack": None},
+                "color": color,
+            },
+        })
+    return _spec(title, layers)
+
+
+# Objective 1 (Demographic)
+
+def age_distribution_by_gender(age):
+    """Figure 1: stacked Age histogram per Gender with KDE curves."""
+    return _histogram(age, list(age.counts.columns), "Age Distribution by Gender", "Count",
+                      kde=True, legend_title="Gender")
+
+
+def age_distribution(age):
+    """Figure 2: Age histogram, summed over the groups of the same Distribution."""
+    # Same bins as Figure 1, so the counts are the per-Gender counts added together
+    return _histogram(dataclasses.replace(age, counts=age.total.to_frame("All")), ["All"],
+                      "Distribution of Age", "Frequency")
+
+
+def occupation_distribution(occupation_counts):
+    """Figure 3: pie chart of Occupation value counts."""
+    counts = occupation_counts[occupation_counts > 0]
+    rows = pd.DataFrame({
+        "Occupation": counts.index.astype(str),
+        "count": counts.to_numpy(),
+        "share": counts.to_numpy() / counts.sum(),
+        "order": np.arange(len(counts)),
+    })
+    return _spec("Distribution of Occupation", [{
+        "mark": {"type": "arc", "tooltip": True},
+        "encoding": {
+            "theta": {"field": "count", "type": "quantitative", "stack": True},
+            "color": {"field": "Occupation", "type": "nominal", "scale": _palette(rows["Occupation"]),
+                      "sort": None},
+            "order": {"field": "order"},
+            "tooltip": [{"field": "Occupation"}, {"field": "count", "title": "Count"},
+                        {"field": "share", "title": "Share", "format": ".1%"}],
+        },
+    }], data=_records(rows), view={"stroke": None})
+
+
+def _mean_bars(title, intervals, x_title, y_title, label_angle=0):
+    rows = intervals.rename_axis(x_title).reset_index()
+    rows[x_title] = rows[x_title].astype(str)
+    x = {"field": x_title, "type": "nominal", "sort": None, "axis": {"labelAngle": label_angle}}
+    return _spec(title, [
+        {"mark": {"type": "bar", "color": _fill_color()},
+         "encoding": {"x": x, "y": {"field": "mean", "type": "quantitative", "title": y_title}}},
+        {"mark": {"type": "rule", "color": ERROR_BAR_COLOR, "strokeWidth": 2.25},
+         "encoding": {"x": x, "y": {"field": "low", "type": "quantitative"}, "y2": {"field": "high"}}},
+    ], data=_records(rows))
+
+
+# Objective 2 (Comparison)
+
+def quality_by_gender(intervals, method="t"):
+    """Figure 1: bars of mean Quality of Sleep per Gender with precomputed error bars."""
+    return _mean_bars("Average Quality of Sleep by Gender", intervals, "Gender", "Quality of Sleep")
+
+
+def quality_by_age_group(quality_by_age):
+    """Figure 2: stacked bars of the Age_Group x Quality of Sleep crosstab."""
+    rows = quality_by_age.stack().rename("count").reset_index()
+    rows.columns = ["Age Group", "Quality of Sleep", "count"]
+    rows["Age Group"] = rows["Age Group"].astype(str)
+    return _spec("Distribution of Quality of Sleep by Age Group", [{
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "Age Group", "type": "nominal", "sort": [str(label) for label in quality_by_age.index],
+                  "axis": {"labelAngle": -45}},
+            "y": {"field": "count", "type": "quantitative", "title": "Count"},
+            "color": {"field": "Quality of Sleep", "type": "ordinal", "scale": {"scheme": "viridis"}},
+            "order": {"field": "Quality of Sleep"},
+        },
+    }], data=_records(rows))
+
+
+def quality_by_occupation(occupation_quality_mean):
+    """Figure 3: line chart of mean Quality of Sleep per Occupation."""
+    rows = occupation_quality_mean[["Occupation", "Quality of Sleep"]].copy()
+    rows["Occupation"] = rows["Occupation"].astype(str)
+    return _spec("Average Quality of Sleep by Occupation (Line Chart)", [{
+        "mark": {"type": "line", "point": True, "color": DEEP_PALETTE[0]},
+        "encoding": {
+            "x": {"field": "Occupation", "type": "nominal", "sort": None, "axis": {"labelAngle": -90, "grid": True}},
+            "y": {"field": "Quality of Sleep", "type": "quantitative", "title": "Average Quality of Sleep",
+                  "scale": {"zero": False}, "axis": {"grid": True}},
+        },
+    }], data=_records(rows))
+
+
+def segment_means(intervals, dimension, metric, method="t"):
+    """Figure 4: bars of the mean metric per segment of any dimension (see comparison.py)."""
+    label = dimension.replace("_", " ")
+    return _mean_bars(f"Average {metric} by {label}", intervals, label, metric,
+                      label_angle=-45 if len(intervals) > 5 else 0)
+
+
+# Objective 3 (Correlation)
+
+def correlation_heatmap(correlation_matrix, title="Correlation Matrix of Quality of Sleep and Heart Rate"):
+    """Figure 1: annotated heatmap of a correlation matrix."""
+    labels = [str(label) for label in correlation_matrix.columns]
+    rows = correlation_matrix.rename_axis(index="row", columns="column").stack().rename("value").reset_index()
+    rows[["row", "column"]] = rows[["row", "column"]].astype(str)
+    x = {"field": "column", "type": "nominal", "sort": labels, "title": None}
+    y = {"field": "row", "type": "nominal", "sort": labels, "title": None}
+    return _spec(title, [
+        {"mark": {"type": "rect"},
+         "encoding": {"x": x, "y": y, "color": {"field": "value", "type": "quantitative", "title": None,
+                                                 "scale": {"scheme": "redblue", "reverse": True}}}},
+        {"mark": {"type": "text"},
+         "encoding": {"x": x, "y": y, "text": {"field": "value", "type": "quantitative", "format": ".2f"}}},
+    ], data=_records(rows))
+
+
+def sleep_duration_by_disorder(sketches):
+    """Figure 2: violin plot of Sleep Duration per Sleep Disorder from quantile sketches."""
+    labels = list(sketches)
+    fill = _fill_color()
+    line = _line_color(fill)
+    curves = [sketch.kde(cut=2) for sketch in sketches.values()]
+    # density_norm="area": every violin shares the largest density's scale
+    peak = max((curve[1].max() for curve in curves if curve is not None), default=1)
+
+    outlines, flat, boxes = [], [], []
+    for position, (group, sketch), curve in zip(range(len(labels)), sketches.items(), curves):
+        if curve is None:
+            # A group without spread is a single line at its value
+            flat.append({"left": position - .4, "right": position + .4, "y": sketch.mean})
+            continue
+        support, values = curve
+        half_width = values / peak * .4
+        outlines += [{"group": str(group), "y": y, "left": position - w, "right": position + w}
+                     for y, w in zip(support, half_width)]
+        stats = sketch.box_stats()
+        boxes.append({"position": position, **{key: float(stats[key]) for key in ("whislo", "whishi", "q1", "q3", "med")}})
+
+    x = _position_axis(labels, "Sleep Disorder")
+    y = {"type": "quantitative", "title": "Sleep Duration", "scale": {"zero": False}}
+    layers = [
+        {"data": {"values": outlines},
+         "mark": {"type": "area", "orient": "horizontal", "color": fill, "stroke": line, "strokeWidth": 1.25},
+         "encoding": {"y": {"field": "y", **y}, "x": {"field": "left", **x}, "x2": {"field": "right"},
+                      "detail": {"field": "group"}}},
+        {"data": {"values": boxes},
+         "mark": {"type": "rule", "color": line, "strokeWidth": 1.9},
+         "encoding": {"x": {"field": "position", **x}, "y": {"field": "whislo", **y}, "y2": {"field": "whishi"}}},
+        {"data": {"values": boxes},
+         "mark": {"type": "rule", "color": line, "strokeWidth": 5.6},
+         "encoding": {"x": {"field": "position", **x}, "y": {"field": "q1", **y}, "y2": {"field": "q3"}}},
+        {"data": {"values": boxes},
+         "mark": {"type": "point", "filled": True, "color": "white", "size": 20},
+         "encoding": {"x": {"field": "position", **x}, "y": {"field": "med", **y}}},
+    ]
+    if flat:
+        layers.append({"data": {"values": flat},
+                       "mark": {"type": "rule", "color": line, "strokeWidth": 1.25},
+                       "encoding": {"x": {"field": "left", **x}, "x2": {"field": "right"}, "y": {"field": "y", **y}}})
+    return _spec("Sleep Duration Distribution by Sleep Disorder", layers)
+
+
+def activity_by_bmi(sketches):
+    """Figure 3: box plot of Physical Activity Level per BMI Category from quantile sketches."""
+    labels = [str(label) for label in sketches]
+    fill = _fill_color()
+    line = _line_color(fill)
+    boxes, fliers = [], []
+    for group, sketch in sketches.items():
+        stats = sketch.box_stats()
+        boxes.append({"BMI Category": str(group), **{key: float(stats[key])
+                                                     for key in ("whislo", "whishi", "q1", "q3", "med")}})
+        fliers += [{"BMI Category": str(group), "value": float(value)} for value in stats["fliers"]]
+
+    x = {"field": "BMI Category", "type": "nominal", "sort": labels, "axis": {"labelAngle": 0}}
+    y = {"type": "quantitative", "title": "Physical Activity Level", "scale": {"zero": False}}
+    layers = [
+        {"data": {"values": boxes},
+         "mark": {"type": "rule", "color": line},
+         "encoding": {"x": x, "y": {"field": "whislo", **y}, "y2": {"field": "whishi"}}},
+        {"data": {"values": boxes},
+         "mark": {"type": "bar", "color": fill, "stroke": line, "width": {"band": .8}},
+         "encoding": {"x": x, "y": {"field": "q1", **y}, "y2": {"field": "q3"}}},
+        {"data": {"values": boxes},
+         "mark": {"type": "tick", "color": line, "thickness": 1.5},
+         "encoding": {"x": x, "y": {"field": "med", **y}}},
+    ]
+    if fliers:
+        layers.append({"data": {"values": fliers},
+                       "mark": {"type": "point", "color": line},
+                       "encoding": {"x": x, "y": {"field": "value", **y}}})
+    return _spec("Physical Activity Level Distribution by BMI Category", layers)
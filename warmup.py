@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+import comparison
+import density
+import filters
+from aggregates import get_summary
+from figure_cache import apply_plot_theme, chart_backend, chart_function
+from profiling import register_gauge, span
+from sleep_data import env_flag, ingest_mode, load_data
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Server Warm-up ---
+# serve.py starts one background thread as the server process boots; under a
+# plain `streamlit run Main.py` the first run of Main.py starts it instead. It
+# fills the process-wide caches while the first visitor's page is still loading:
+# the dataset, its summary, filter index, Age distribution and Gender intervals
+# (or the streamed or SQL summary in streaming and DuckDB modes), then the
+# plotting imports and theme. A page that needs a cache being filled waits for
+# that entry instead of computing it again. Each step runs as a "warmup.<step>"
+# profiling span, so its timing appears on /metrics and in SLEEP_PROFILE_LOG,
+# and timings() feeds the SLEEP_DEBUG sidebar. The sleep_warmup_done gauge on /metrics
+# turns 1 once the warm-up has finished, for readiness probes. SLEEP_WARMUP=0 turns the warm-up off.
+_lock = threading.Lock()
+_thread = None
+_timings = {}
+
+
+def _steps():
+    if ingest_mode() == "stream":
+        from streaming import stream_summary
+
+        steps = [("stream_summary", stream_summary)]
+    elif ingest_mode() == "duckdb":
+        from sql_backend import sql_summary
+
+        steps = [("sql_summary", sql_summary)]
+    else:
+        state = {}
+        steps = [
+            ("load_data", lambda: state.update(df=load_data())),
+            ("summary", lambda: get_summary(state["df"])),
+            ("filter_index", lambda: filters.get_index(state["df"])),
+            ("age_distribution", lambda: density.get_distribution(state["df"], "Age", by="Gender", bins=20, kde=True)),
+            ("quality_intervals", lambda: comparison.get_mean_intervals(state["df"], "Gender", "Quality of Sleep")),
+        ]
+    if chart_backend() == "vega":
+        steps.append(("import_charts", lambda: chart_function("age_distribution", "vega")))
+    else:
+        steps += [("import_plotting", apply_plot_theme), ("import_charts", lambda: chart_function("age_distribution"))]
+    return steps
+
+
+def _run():
+    started = time.perf_counter()
+    for name, step in _steps():
+        step_started = time.perf_counter()
+        try:
+            with span(f"warmup.{name}"):
+                step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+            break
+        _timings[name] = time.perf_counter() - step_started
+    _timings["total"] = time.perf_counter() - started
+    logger.info("Warm-up finished in %.2fs: %s", _timings["total"],
+                ", ".join(f"{name} {seconds:.2f}s" for name, seconds in _timings.items() if name != "total"))
+
+
+def start():
+    """Starts the warm-up thread once per process (unless SLEEP_WARMUP=0); returns it."""
+    global _thread
+    if not env_flag("SLEEP_WARMUP", default=True):
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name="warmup", daemon=True)
+            # Cached functions expect a script context; borrow the first session's
+            # (there is none when serve.py starts the warm-up before any session)
+            ctx = get_script_run_ctx(suppress_warning=True)
+            if ctx is not None:
+                add_script_run_ctx(_thread, ctx)
+            _thread.start()
+    return _thread
+
+
+def timings():
+    """Returns the seconds each finished warm-up step took (plus "total" once done)."""
+    return dict(_timings)
+
+
+def done():
+    """Returns 1 once the warm-up has finished, 0 while it runs, or None if it never started."""
+    if _thread is None:
+        return None
+    return int("total" in _timings)
+
+
+register_gauge("sleep_warmup_done", "1 once the server warm-up has filled the caches.", done)